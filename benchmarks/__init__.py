@@ -0,0 +1,19 @@
+# Benchmarks Module
+# Reproducible benchmarks of the create-video pipeline (run with python -m benchmarks)
+
+from .fixtures import (
+    FIXTURES,
+    FIXTURE_VERSION
+)
+
+from .cases import (
+    BENCHMARKS,
+    Benchmark,
+    SkipBenchmark
+)
+
+from .runner import (
+    run_benchmark,
+    run_benchmarks,
+    compare_results
+)
@@ -0,0 +1,241 @@
+import os
+import shutil
+import random
+from pathlib import Path
+from unittest import mock
+from typing import Optional, Dict, List, Callable
+
+from .fixtures import FIXTURES, STANDIN_SAMPLE_RATE, get_fixture_texts, render_standin_speech, \
+    write_standin_audio, create_audio_standin
+
+
+# Allowed slowdown of the fastest sample before a result counts as a regression, per benchmark group
+DEFAULT_THRESHOLDS = {
+    'text': 0.15,
+    'tts': 0.25,
+    'audio': 0.20,
+    'render': 0.25
+}
+
+# Directories the pipeline caches into; removed before every cold run
+CACHE_DIRECTORIES = ('temp', 'output')
+
+# Stand-in narration is rendered here, outside the caches the cold runs clear
+STANDIN_DIRECTORY = Path("bench_audio")
+
+RENDER_CONFIG = {
+    'encoder_preset': 'draft',
+    'resolution': '720p',
+    'aspect_ratios': '9:16',
+    'fps': 30,
+    'incremental': 'false',
+    'render_workers': 1
+}
+
+
+class SkipBenchmark(Exception):
+    """Raised by a benchmark's setup when it cannot run on this machine"""
+
+
+class Benchmark:
+    """
+    One measured operation on one fixture
+
+    setup() runs in the benchmark's scratch directory and returns a dict
+    with 'run' (the timed callable), 'units' (how much work one call is,
+    in the benchmark's unit) and optionally 'reset' (called untimed before
+    every sample, for benchmarks that must start from cold caches).
+    """
+
+    def __init__(self, group: str, operation: str, fixture: str, unit: str,
+                 setup: Callable[[Dict[str, any]], Dict[str, any]], repeat: Optional[int] = None):
+        """repeat overrides the samples per process for slow benchmarks"""
+        self.group = group
+        self.operation = operation
+        self.fixture = fixture
+        self.unit = unit
+        self.setup_function = setup
+        self.repeat = repeat
+        self.threshold = DEFAULT_THRESHOLDS[group]
+
+    @property
+    def name(self) -> str:
+        return f"{self.group}.{self.operation}[{self.fixture}]"
+
+    def setup(self) -> Dict[str, any]:
+        return self.setup_function(FIXTURES[self.fixture])
+
+
+def _create_video_page():
+    """Import pages.create_video, skipping benchmarks that need it when its dependencies are missing"""
+    try:
+        from pages import create_video
+    except ImportError as e:
+        raise SkipBenchmark(f"pages.create_video cannot be imported: {str(e)}")
+    return create_video
+
+
+def _require_numpy():
+    from tts import test_numpy_availability
+    if not test_numpy_availability():
+        raise SkipBenchmark("NumPy is not installed")
+
+
+def _clear_caches():
+    for directory in CACHE_DIRECTORIES:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def _get_content(create_video_page, fixture: Dict[str, any]) -> Dict[str, any]:
+    """Select a fixture's content the way the pipeline does, with the top-10 shuffle made repeatable"""
+    from pipeline.runner import VIDEO_TYPES
+    random.seed(0)
+    return create_video_page.process_video_content(fixture['post_data'], VIDEO_TYPES[fixture['video_type']])
+
+
+def _get_segments(fixture: Dict[str, any]) -> List[Dict[str, any]]:
+    """Get a fixture's narration segments"""
+    create_video_page = _create_video_page()
+    return create_video_page.prepare_audio_segments(_get_content(create_video_page, fixture))
+
+
+def _get_standin_files(fixture: Dict[str, any]) -> List[Dict[str, any]]:
+    """Write stand-in narration for a fixture's segments, as generate_tts_audio's 'files' list"""
+    from tts import get_audio_duration
+    _require_numpy()
+    STANDIN_DIRECTORY.mkdir(exist_ok=True)
+    files = []
+    for segment in _get_segments(fixture):
+        path = STANDIN_DIRECTORY / f"{segment['filename_suffix']}.wav"
+        if not path.exists() and not write_standin_audio(segment['text'], str(path)):
+            raise SkipBenchmark("Could not write stand-in audio")
+        files.append({
+            'segment_type': segment['type'],
+            'filename': str(path),
+            'text': segment['text'],
+            'duration': get_audio_duration(str(path)),
+            'card': segment.get('card')
+        })
+    return files
+
+
+def setup_clean_text(fixture: Dict[str, any]) -> Dict[str, any]:
+    create_video_page = _create_video_page()
+    texts = get_fixture_texts(fixture)
+
+    def run():
+        for text in texts:
+            create_video_page.clean_text_for_tts(text)
+    return {'run': run, 'units': sum(len(text) for text in texts)}
+
+
+def setup_prepare_segments(fixture: Dict[str, any]) -> Dict[str, any]:
+    create_video_page = _create_video_page()
+
+    def run():
+        create_video_page.prepare_audio_segments(_get_content(create_video_page, fixture))
+    return {'run': run, 'units': sum(len(text) for text in get_fixture_texts(fixture))}
+
+
+def setup_pyttsx3(fixture: Dict[str, any]) -> Dict[str, any]:
+    from tts import create_audio_pyttsx3, test_pyttsx3_availability
+    if not test_pyttsx3_availability():
+        raise SkipBenchmark("pyttsx3 is not installed or has no speech engine")
+    segments = _get_segments(fixture)
+    os.makedirs("output", exist_ok=True)
+
+    def run():
+        for segment in segments:
+            create_audio_pyttsx3(segment['text'], os.path.join("output", f"{segment['filename_suffix']}.wav"))
+    return {'run': run, 'units': sum(len(segment['text']) for segment in segments), 'reset': _clear_caches}
+
+
+def setup_tts_stage(fixture: Dict[str, any]) -> Dict[str, any]:
+    """The whole TTS stage (synthesis, caching, stretching, alignment, captions) with offline synthesis"""
+    create_video_page = _create_video_page()
+    _require_numpy()
+    if not shutil.which('ffmpeg'):
+        raise SkipBenchmark("FFmpeg is not in PATH (needed to write MP3 stand-in audio)")
+    content = _get_content(create_video_page, fixture)
+    segments = create_video_page.prepare_audio_segments(content)
+
+    def run():
+        with mock.patch.multiple(
+            create_video_page,
+            load_tts_config=lambda: {'service': 'gtts', 'speed': '1.25', 'voice': 'en'},
+            test_gtts_availability=lambda: True,
+            create_audio_gtts=create_audio_standin
+        ):
+            success, result = create_video_page.generate_tts_audio(content, segments=segments)
+        if not success or result['failed_count']:
+            raise RuntimeError(result if not success else result['message'])
+    return {'run': run, 'units': sum(len(segment['text']) for segment in segments), 'reset': _clear_caches}
+
+
+def setup_stretch(fixture: Dict[str, any]) -> Dict[str, any]:
+    from tts import stretch_audio_file
+    files = _get_standin_files(fixture)
+    os.makedirs("output", exist_ok=True)
+
+    def run():
+        for file_info in files:
+            stretch_audio_file(file_info['filename'], os.path.join("output", Path(file_info['filename']).name), 1.25)
+    return {'run': run, 'units': sum(file_info['duration'] for file_info in files)}
+
+
+def setup_align(fixture: Dict[str, any]) -> Dict[str, any]:
+    from tts import align_words
+    _require_numpy()
+    segments = [(render_standin_speech(segment['text']), segment['text']) for segment in _get_segments(fixture)]
+
+    def run():
+        for samples, text in segments:
+            align_words(samples, STANDIN_SAMPLE_RATE, text)
+    return {'run': run, 'units': sum(len(samples) for samples, _ in segments) / STANDIN_SAMPLE_RATE}
+
+
+def setup_narration(fixture: Dict[str, any]) -> Dict[str, any]:
+    from video import build_timeline, get_timeline_duration, build_narration_track
+    files = _get_standin_files(fixture)
+    timeline = build_timeline(files)
+    os.makedirs("output", exist_ok=True)
+
+    def run():
+        if not build_narration_track(timeline, os.path.join("output", "narration.wav")):
+            raise RuntimeError("Failed to assemble narration audio")
+    return {'run': run, 'units': get_timeline_duration(timeline)}
+
+
+def setup_render(fixture: Dict[str, any]) -> Dict[str, any]:
+    """A cold, non-incremental render of one aspect ratio at the draft preset over the fallback background"""
+    from video import render_video_aspects, test_pil_availability, build_timeline, get_timeline_duration
+    from video.presets import get_encoder_preset, get_preset_fps
+    if not shutil.which('ffmpeg'):
+        raise SkipBenchmark("FFmpeg is not in PATH")
+    if not test_pil_availability():
+        raise SkipBenchmark("Pillow is not installed")
+    files = _get_standin_files(fixture)
+    fps = get_preset_fps(get_encoder_preset(RENDER_CONFIG), RENDER_CONFIG['fps'])
+    frames = int(-(-get_timeline_duration(build_timeline(files)) * fps // 1))
+
+    def run():
+        success, result = render_video_aspects(files, RENDER_CONFIG, {'9:16': os.path.join("output", "bench.mp4")})
+        if not success:
+            raise RuntimeError(result)
+    return {'run': run, 'units': frames, 'reset': _clear_caches}
+
+
+BENCHMARKS = [
+    *(Benchmark('text', 'clean_text', fixture, 'characters', setup_clean_text) for fixture in FIXTURES),
+    *(Benchmark('text', 'prepare_segments', fixture, 'characters', setup_prepare_segments) for fixture in FIXTURES),
+    Benchmark('tts', 'pyttsx3', 'short', 'characters', setup_pyttsx3, repeat=1),
+    Benchmark('tts', 'stage', 'short', 'characters', setup_tts_stage),
+    Benchmark('tts', 'stage', 'carousel', 'characters', setup_tts_stage, repeat=1),
+    Benchmark('tts', 'stage', 'unicode', 'characters', setup_tts_stage, repeat=1),
+    Benchmark('audio', 'stretch', 'long_selftext', 'audio seconds', setup_stretch, repeat=1),
+    Benchmark('audio', 'align', 'long_selftext', 'audio seconds', setup_align),
+    Benchmark('audio', 'align', 'carousel', 'audio seconds', setup_align),
+    Benchmark('audio', 'narration', 'carousel', 'audio seconds', setup_narration),
+    Benchmark('render', 'draft', 'short', 'frames', setup_render, repeat=2),
+    Benchmark('render', 'draft', 'carousel', 'frames', setup_render, repeat=1),
+]
@@ -0,0 +1,184 @@
+import random
+import hashlib
+from typing import Dict, List
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+# Bump when a fixture changes, so results are only compared between identical inputs
+FIXTURE_VERSION = 1
+
+STANDIN_SAMPLE_RATE = 24000
+
+# Narration pace of the stand-in voice, matching video.timeline's fallback estimate
+STANDIN_CHARACTERS_PER_SECOND = 15.0
+
+WORDS = (
+    "the so my and we was it that when she he they but then at just like really my friend work "
+    "apartment landlord neighbour manager coffee weekend email meeting dog cat car phone bank "
+    "told asked said decided realised thought went came left found called texted laughed "
+    "never always finally suddenly honestly literally actually probably completely absolutely "
+    "story update advice question problem situation reason answer mistake lesson"
+).split()
+
+MARKDOWN = (
+    "**{}**", "*{}*", "***{}***", "__{}__", "_{}_", "~~{}~~", "`{}`",
+    "[{}](https://example.com/page)", "u/throwaway_{}", "r/AskReddit {}", "{} &amp; more", "&quot;{}&quot;"
+)
+
+UNICODE_PHRASES = (
+    "café naïve résumé", "Ünïcödé façade", "日本語のテキスト", "中文评论很长", "한국어 댓글",
+    "Русский текст", "Ελληνικά γράμματα", "עברית מימין לשמאל", "العربية من اليمين",
+    "हिन्दी वाक्य", "ไทยภาษา", "emoji 😂🔥👀🙏🏽", "flags 🇺🇸🇯🇵", "family 👨‍👩‍👧‍👦",
+    "combining a\u0301e\u0300o\u0302", "zero\u200bwidth\u200djoiner", "math ∑∫√∞≠", "“smart quotes” — dashes…"
+)
+
+
+def _sentence(rng: random.Random, words: int, markdown: bool = False, unicode: bool = False) -> str:
+    """Build one deterministic sentence"""
+    parts = [rng.choice(WORDS) for _ in range(words)]
+    if markdown and words > 3:
+        index = rng.randrange(words)
+        parts[index] = rng.choice(MARKDOWN).format(parts[index])
+    if unicode:
+        parts.insert(rng.randrange(len(parts) + 1), rng.choice(UNICODE_PHRASES))
+    sentence = " ".join(parts)
+    return sentence[0].upper() + sentence[1:] + rng.choice(".!?")
+
+
+def _paragraphs(rng: random.Random, count: int, sentences: int, **options) -> str:
+    """Build deterministic Reddit-style markdown paragraphs"""
+    paragraphs = []
+    for _ in range(count):
+        paragraphs.append(" ".join(_sentence(rng, rng.randint(6, 18), **options) for _ in range(sentences)))
+    return "\n\n".join(paragraphs)
+
+
+def _comment(rng: random.Random, number: int, paragraphs: int, **options) -> Dict[str, any]:
+    return {
+        'id': f"c{number:03d}",
+        'author': f"commenter_{number}",
+        'body': _paragraphs(rng, paragraphs, rng.randint(1, 3), **options),
+        'score': 5000 - number * 137,
+        'created_utc': 1700000000 + number * 60,
+        'is_submitter': False,
+        'parent_id': "t3_bench"
+    }
+
+
+def _post(post_id: str, title: str, selftext: str, comments: List[Dict[str, any]]) -> Dict[str, any]:
+    """Build post data in the shape fetch_reddit_post_data returns"""
+    return {
+        'post_id': post_id,
+        'title': title,
+        'author': "bench_author",
+        'subreddit': "AskReddit",
+        'selftext': selftext,
+        'url': f"https://www.reddit.com/r/AskReddit/comments/{post_id}/bench/",
+        'score': 12345,
+        'upvote_ratio': 0.97,
+        'num_comments': len(comments),
+        'created_utc': 1700000000,
+        'is_self': bool(selftext),
+        'comments': comments
+    }
+
+
+def build_fixtures() -> Dict[str, Dict[str, any]]:
+    """
+    Build the benchmark posts
+
+    Every fixture is generated from a fixed seed, so the same inputs are
+    benchmarked on every machine and commit.
+
+    Returns:
+        Dict of fixture name to {'post_data', 'video_type'} (video_type as
+        in pipeline.runner.VIDEO_TYPES)
+    """
+    rng = random.Random(20240601)
+    fixtures = {}
+
+    # A one-line question answered by a single short comment
+    fixtures['short'] = {
+        'video_type': 'top_comment',
+        'post_data': _post("short1", "What is a small thing that made your day better?", "",
+                           [_comment(rng, 1, 1)])
+    }
+
+    # A long story with the markdown, quotes and edits clean_text_for_tts strips
+    selftext = _paragraphs(rng, 24, 6, markdown=True)
+    selftext += "\n\n> quoted line from another post\n&gt; and another\n\nEDIT: thanks for the gold!\n"
+    selftext += "\n\n```\nsome code block\n```\n\nTL;DR: " + _sentence(rng, 14)
+    fixtures['long_selftext'] = {
+        'video_type': 'post_description',
+        'post_data': _post("long1", "My landlord tried to keep my deposit and it backfired (long)", selftext, [])
+    }
+
+    # Twelve comments, of which the top ten are narrated one card each
+    fixtures['carousel'] = {
+        'video_type': 'top_10_comments',
+        'post_data': _post("carousel1", "What is the best advice you ignored?", "",
+                           [_comment(rng, number, rng.randint(1, 3), markdown=True) for number in range(1, 13)])
+    }
+
+    # Non-Latin scripts, emoji sequences, combining marks and zero-width characters
+    fixtures['unicode'] = {
+        'video_type': 'top_10_comments',
+        'post_data': _post("unicode1", "Ünïcödé 日本語 😂🔥 what's the weirdest word in your language?",
+                           _paragraphs(rng, 4, 3, unicode=True),
+                           [_comment(rng, number, 2, unicode=True, markdown=True) for number in range(1, 11)])
+    }
+    return fixtures
+
+
+FIXTURES = build_fixtures()
+
+
+def get_fixture_texts(fixture: Dict[str, any]) -> List[str]:
+    """Get every raw text of a fixture post (title, selftext and comment bodies)"""
+    post_data = fixture['post_data']
+    texts = [post_data['title']]
+    if post_data['selftext']:
+        texts.append(post_data['selftext'])
+    texts.extend(comment['body'] for comment in post_data['comments'])
+    return texts
+
+
+def render_standin_speech(text: str, sample_rate: int = STANDIN_SAMPLE_RATE) -> "np.ndarray":
+    """
+    Synthesise deterministic speech-like audio for a text
+
+    Every word becomes a voiced burst as long as the word would take to say,
+    separated by short pauses, so duration measurement and word alignment
+    behave as they do on real TTS output. Stands in for the network TTS
+    backends so benchmarks run offline and repeatably.
+    """
+    seed = int(hashlib.md5(text.encode('utf-8')).hexdigest()[:8], 16)
+    noise = np.random.RandomState(seed)
+    pause = np.zeros(int(0.08 * sample_rate), dtype=np.float32)
+
+    pieces = [pause]
+    for word in text.split():
+        length = max(int(len(word) / STANDIN_CHARACTERS_PER_SECOND * sample_rate), int(0.06 * sample_rate))
+        t = np.arange(length, dtype=np.float32) / sample_rate
+        pitch = 110.0 + (len(word) * 17) % 90
+        envelope = np.sin(np.pi * np.arange(length) / length).astype(np.float32)
+        voiced = 0.4 * np.sin(2 * np.pi * pitch * t) + 0.05 * noise.standard_normal(length).astype(np.float32)
+        pieces.append((voiced * envelope).astype(np.float32))
+        pieces.append(pause)
+    return np.concatenate(pieces)
+
+
+def write_standin_audio(text: str, output_path: str, sample_rate: int = STANDIN_SAMPLE_RATE) -> bool:
+    """Write stand-in speech for a text (WAV natively, other formats through FFmpeg)"""
+    from tts import write_audio
+    return write_audio(output_path, render_standin_speech(text, sample_rate), sample_rate)
+
+
+def create_audio_standin(text: str, output_path: str, language: str = 'en', slow: bool = False) -> bool:
+    """Offline replacement for tts.create_audio_gtts with the same signature"""
+    return write_standin_audio(text, output_path)
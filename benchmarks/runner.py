@@ -0,0 +1,384 @@
+import io
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import statistics
+import contextlib
+import subprocess
+from pathlib import Path
+from datetime import datetime
+from typing import Optional, Dict, List
+
+from .fixtures import FIXTURE_VERSION
+from .cases import BENCHMARKS, DEFAULT_THRESHOLDS, Benchmark, SkipBenchmark
+
+
+RESULTS_VERSION = 1
+RESULTS_DIRECTORY = Path("temp") / "benchmarks"
+
+DEFAULT_REPEAT = 5
+DEFAULT_PROCESSES = 3
+
+# Fast operations are looped until one sample takes at least this long, as timeit does
+MIN_SAMPLE_SECONDS = 0.2
+
+EXIT_OK = 0
+EXIT_REGRESSION = 1
+
+
+def get_commit() -> Optional[str]:
+    """Get the git commit the benchmarks run against, with a + suffix for a dirty tree"""
+    root = Path(__file__).resolve().parent.parent
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=root, capture_output=True, text=True, timeout=10)
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                               cwd=root, capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if commit.returncode != 0:
+        return None
+    return commit.stdout.strip() + ('+' if dirty.stdout.strip() else '')
+
+
+@contextlib.contextmanager
+def scratch_directory():
+    """Run a block in a fresh working directory, so caches and outputs never leak between benchmarks"""
+    previous = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="bench-") as directory:
+        os.chdir(directory)
+        try:
+            yield Path(directory)
+        finally:
+            os.chdir(previous)
+
+
+def _calibrate(run, reset) -> int:
+    """Find how many calls make one sample last at least MIN_SAMPLE_SECONDS"""
+    if reset is not None:
+        return 1
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            run()
+        if time.perf_counter() - started >= MIN_SAMPLE_SECONDS or number >= 1 << 16:
+            return number
+        number *= 2
+
+
+def measure_benchmark(benchmark: Benchmark, repeat: int) -> Dict[str, any]:
+    """
+    Time one benchmark in this process, in its own scratch directory
+
+    Fast operations are looped so every sample lasts long enough to time
+    reliably; cold benchmarks (those with a reset) clear their caches
+    before every sample and run once per sample.
+
+    Returns:
+        Dict with 'timings' (seconds per call, one per sample), 'units' and
+        'loops', or {'skipped': reason} / {'error': message}
+    """
+    output = io.StringIO()
+    with scratch_directory(), contextlib.redirect_stdout(output):
+        try:
+            case = benchmark.setup()
+        except SkipBenchmark as e:
+            return {'skipped': str(e)}
+        run, reset = case['run'], case.get('reset')
+
+        try:
+            if reset is not None:
+                reset()
+            number = _calibrate(run, reset)
+
+            timings = []
+            for _ in range(repeat):
+                if reset is not None:
+                    reset()
+                started = time.perf_counter()
+                for _ in range(number):
+                    run()
+                timings.append((time.perf_counter() - started) / number)
+        except Exception as e:
+            return {'error': f"{type(e).__name__}: {str(e)}"}
+    return {'timings': timings, 'units': case['units'], 'loops': number}
+
+
+def _measure_in_process(benchmark: Benchmark, repeat: int) -> Dict[str, any]:
+    """Run measure_benchmark in a fresh interpreter (see --measure)"""
+    root = Path(__file__).resolve().parent.parent
+    command = [sys.executable, '-m', 'benchmarks', '--measure', benchmark.name, '--repeat', str(repeat)]
+    completed = subprocess.run(command, cwd=root, capture_output=True, text=True)
+    lines = completed.stdout.strip().splitlines()
+    try:
+        return json.loads(lines[-1])
+    except (IndexError, ValueError):
+        error = (completed.stderr.strip().splitlines() or ["no output"])[-1]
+        return {'error': f"Benchmark process failed: {error}"}
+
+
+def run_benchmark(benchmark: Benchmark, repeat: Optional[int] = None,
+                  processes: int = DEFAULT_PROCESSES) -> Dict[str, any]:
+    """
+    Measure one benchmark and summarise its timings
+
+    Timings vary between interpreter processes (memory layout, CPU
+    placement) more than within one, so the samples are taken in several
+    fresh processes and pooled. With processes=1 they are taken in this
+    process instead.
+
+    Args:
+        benchmark: Benchmark to run
+        repeat: Samples per process (optional, defaults to the benchmark's or DEFAULT_REPEAT)
+        processes: Fresh interpreter processes to sample in
+
+    Returns:
+        Result dict with per-call latency statistics in seconds and the
+        throughput in units per second, or {'skipped': reason} / {'error': message}
+    """
+    repeat = repeat or benchmark.repeat or DEFAULT_REPEAT
+    if processes <= 1:
+        measurements = [measure_benchmark(benchmark, repeat)]
+    else:
+        measurements = [_measure_in_process(benchmark, repeat) for _ in range(processes)]
+    for measurement in measurements:
+        if 'timings' not in measurement:
+            return measurement
+
+    samples = sorted(timing for measurement in measurements for timing in measurement['timings'])
+    median = statistics.median(samples)
+    return {
+        'group': benchmark.group,
+        'fixture': benchmark.fixture,
+        'unit': benchmark.unit,
+        'units': measurements[0]['units'],
+        'samples': len(samples),
+        'processes': len(measurements),
+        'loops': max(measurement['loops'] for measurement in measurements),
+        'min': samples[0],
+        'median': median,
+        'mean': statistics.fmean(samples),
+        'max': samples[-1],
+        'stdev': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        'throughput': measurements[0]['units'] / median if median > 0 else None,
+        'threshold': benchmark.threshold
+    }
+
+
+def select_benchmarks(patterns: List[str]) -> List[Benchmark]:
+    """Get the benchmarks whose name contains any of the patterns (all without patterns)"""
+    if not patterns:
+        return list(BENCHMARKS)
+    return [benchmark for benchmark in BENCHMARKS if any(pattern in benchmark.name for pattern in patterns)]
+
+
+def run_benchmarks(benchmarks: List[Benchmark], repeat: Optional[int] = None,
+                   processes: int = DEFAULT_PROCESSES, progress=sys.stderr) -> Dict[str, any]:
+    """
+    Run benchmarks and collect their results with the environment they ran in
+
+    Returns:
+        Results document as written by --output (see compare_results)
+    """
+    results = {}
+    for benchmark in benchmarks:
+        if progress:
+            print(f"{benchmark.name} ...", end=" ", file=progress, flush=True)
+        result = run_benchmark(benchmark, repeat, processes)
+        results[benchmark.name] = result
+        if progress:
+            if 'skipped' in result:
+                print(f"skipped ({result['skipped']})", file=progress)
+            elif 'error' in result:
+                print(f"error ({result['error']})", file=progress)
+            else:
+                print(f"{result['median'] * 1000:.2f} ms", file=progress)
+
+    return {
+        'version': RESULTS_VERSION,
+        'fixture_version': FIXTURE_VERSION,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'commit': get_commit(),
+        'environment': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'machine': platform.machine(),
+            'cpu_count': os.cpu_count()
+        },
+        'results': results
+    }
+
+
+def compare_results(baseline: Dict[str, any], current: Dict[str, any],
+                    threshold: Optional[float] = None) -> List[Dict[str, any]]:
+    """
+    Compare the fastest sample of every benchmark both runs measured
+
+    The fastest sample is the one least disturbed by other load on the
+    machine, which makes it steadier between runs than the median. A
+    benchmark regresses when it is more than its threshold (or the
+    threshold given) slower than the baseline's.
+
+    Returns:
+        List of {'name', 'baseline', 'current', 'change', 'threshold', 'status'}
+        with status 'regression', 'improvement' or 'ok'
+    """
+    comparisons = []
+    for name, result in current['results'].items():
+        before = baseline.get('results', {}).get(name)
+        if not before or 'min' not in before or 'min' not in result or not before['min']:
+            continue
+        limit = threshold if threshold is not None else result['threshold']
+        change = result['min'] / before['min'] - 1
+        if change > limit:
+            status = 'regression'
+        elif change < -limit:
+            status = 'improvement'
+        else:
+            status = 'ok'
+        comparisons.append({
+            'name': name,
+            'baseline': before['min'],
+            'current': result['min'],
+            'change': change,
+            'threshold': limit,
+            'status': status
+        })
+    return comparisons
+
+
+def format_results(document: Dict[str, any]) -> str:
+    """Format a results document as a plain-text table"""
+    rows = document['results']
+    width = max([len(name) for name in rows] + [9])
+    lines = [
+        f"{'Benchmark':<{width}}  {'Median ms':>10}  {'Min ms':>10}  {'Stdev %':>7}  Throughput",
+        "-" * (width + 60)
+    ]
+    for name, result in rows.items():
+        if 'skipped' in result:
+            lines.append(f"{name:<{width}}  skipped: {result['skipped']}")
+            continue
+        if 'error' in result:
+            lines.append(f"{name:<{width}}  error: {result['error']}")
+            continue
+        spread = result['stdev'] / result['median'] * 100 if result['median'] else 0.0
+        throughput = f"{result['throughput']:,.1f} {result['unit']}/s" if result['throughput'] else "-"
+        lines.append(f"{name:<{width}}  {result['median'] * 1000:>10.2f}  {result['min'] * 1000:>10.2f}  "
+                     f"{spread:>7.1f}  {throughput}")
+    return "\n".join(lines)
+
+
+def format_comparison(comparisons: List[Dict[str, any]]) -> str:
+    """Format a comparison as a plain-text table"""
+    width = max([len(row['name']) for row in comparisons] + [9])
+    lines = [
+        f"{'Benchmark':<{width}}  {'Before ms':>10}  {'After ms':>10}  {'Change':>8}  {'Limit':>6}  Status",
+        "-" * (width + 56)
+    ]
+    for row in comparisons:
+        lines.append(f"{row['name']:<{width}}  {row['baseline'] * 1000:>10.2f}  {row['current'] * 1000:>10.2f}  "
+                     f"{row['change'] * 100:>+7.1f}%  {row['threshold'] * 100:>5.0f}%  {row['status']}")
+    return "\n".join(lines)
+
+
+def load_results(path: str) -> Dict[str, any]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command line parser"""
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks',
+        description="Benchmark the create-video pipeline on fixed fixture posts, offline. "
+                    "Results are written as JSON and can be compared between commits."
+    )
+    parser.add_argument('patterns', nargs='*',
+                        help="Only run benchmarks whose name contains one of these, e.g. text. or [carousel]")
+    parser.add_argument('-o', '--output', help=f"Results file (default {RESULTS_DIRECTORY}/<commit>.json)")
+    parser.add_argument('-b', '--baseline', help="Compare against an earlier results file")
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CURRENT'),
+                        help="Compare two results files without running anything")
+    parser.add_argument('-r', '--repeat', type=int,
+                        help=f"Timed samples per process (default {DEFAULT_REPEAT}, fewer for slow benchmarks)")
+    parser.add_argument('-p', '--processes', type=int, default=DEFAULT_PROCESSES,
+                        help="Fresh interpreter processes each benchmark is sampled in (1 samples in this one)")
+    parser.add_argument('--threshold', type=float,
+                        help="Allowed slowdown as a fraction, e.g. 0.1, for every benchmark "
+                             "(default per group: " +
+                             ", ".join(f"{group} {limit}" for group, limit in DEFAULT_THRESHOLDS.items()) + ")")
+    parser.add_argument('--list', action='store_true', help="List the benchmarks and exit")
+    # Used by run_benchmark to sample a benchmark in a fresh process
+    parser.add_argument('--measure', metavar='NAME', help=argparse.SUPPRESS)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the benchmarks, returning EXIT_REGRESSION if any regressed against the baseline"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for benchmark in select_benchmarks(args.patterns):
+            print(f"{benchmark.name}  ({benchmark.unit}, threshold {benchmark.threshold:.0%})")
+        return EXIT_OK
+
+    if args.repeat is not None and args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+
+    if args.measure:
+        benchmark = next((benchmark for benchmark in BENCHMARKS if benchmark.name == args.measure), None)
+        if benchmark is None:
+            parser.error(f"unknown benchmark {args.measure}")
+        print(json.dumps(measure_benchmark(benchmark, args.repeat or benchmark.repeat or DEFAULT_REPEAT)))
+        return EXIT_OK
+
+    if args.compare:
+        try:
+            baseline, current = (load_results(path) for path in args.compare)
+        except (OSError, ValueError) as e:
+            parser.error(f"could not read results: {str(e)}")
+    else:
+        baseline = None
+        if args.baseline:
+            try:
+                baseline = load_results(args.baseline)
+            except (OSError, ValueError) as e:
+                parser.error(f"could not read baseline: {str(e)}")
+
+        benchmarks = select_benchmarks(args.patterns)
+        if not benchmarks:
+            parser.error("no benchmark matches " + ", ".join(args.patterns))
+        # Scratch directories are relative to nothing, so resolve the output before running
+        output = Path(args.output or RESULTS_DIRECTORY / f"{(get_commit() or 'results').replace('+', '-dirty')}.json")
+        output = output.resolve()
+
+        current = run_benchmarks(benchmarks, args.repeat, args.processes)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(current, f, indent=2)
+        print(format_results(current))
+        print(f"\nResults written to {output}")
+
+    if baseline is None:
+        return EXIT_OK
+
+    if baseline.get('fixture_version') != current.get('fixture_version'):
+        print("\nWarning: the results were measured on different fixtures; comparing anyway")
+    comparisons = compare_results(baseline, current, args.threshold)
+    if not comparisons:
+        print("\nNo benchmarks in common with the baseline")
+        return EXIT_OK
+    print()
+    print(format_comparison(comparisons))
+    regressions = [row['name'] for row in comparisons if row['status'] == 'regression']
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        return EXIT_REGRESSION
+    return EXIT_OK
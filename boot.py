@@ -1,15 +1,34 @@
 import sys
-import time
-import msvcrt
 import os
+import re
+import json
+import site
+import shutil
+import platform
+import hashlib
 import subprocess
-import pkg_resources
+import importlib.metadata
 import urllib.request
 import urllib.error
 import toml
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from utils import *
 
+# Results of boot checks that passed, reused while their inputs are unchanged
+BOOT_CACHE_PATH = Path("temp") / "boot_checks.json"
+
+# Seconds between checks for a skip key press while boot checks run
+BOOT_POLL_INTERVAL = 0.05
+
+# name[extras] followed by the version specifiers of a requirements.txt line
+REQUIREMENT_PATTERN = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)\s*(?:\[[^\]]*\])?\s*(.*)$")
+SPECIFIER_PATTERN = re.compile(r"^(===|~=|==|!=|<=|>=|<|>)\s*(\S+)$")
+VERSION_PATTERN = re.compile(r"^v?(\d+(?:\.\d+)*)(?:[-_.]?(a|alpha|b|beta|c|rc|pre|preview)[-_.]?(\d*))?"
+                             r"(?:[-_.]?(?:post|rev|r)[-_.]?(\d*))?(?:[-_.]?dev[-_.]?(\d*))?", re.IGNORECASE)
+# One comparison of an environment marker, such as sys_platform == "win32"
+MARKER_PATTERN = re.compile(r"^\s*([a-z_]+)\s*(===|~=|==|!=|<=|>=|<|>|not\s+in|in)\s*(['\"])(.*?)\3\s*$")
+
 def draw_loading_bar(progress, max_length=50):
     """Draw a loading bar with the given progress (0-100)"""
     filled_length = int(max_length * progress / 100)
@@ -109,8 +128,157 @@ def update_boot_progress(progress, status_text, progress_bar_row, status_text_ro
     
     show_cursor()
 
+def parse_version(version):
+    """
+    Parse a version string into a tuple that compares like PEP 440 versions
+    
+    Covers the release, pre-release, post-release and dev parts that real
+    package versions use; local versions (+...) are ignored.
+    
+    Returns:
+        Tuple of (release, pre-release rank, post-release, dev rank), or
+        None if the version cannot be parsed
+    """
+    match = VERSION_PATTERN.match(version.strip().split('+')[0])
+    if not match:
+        return None
+    release, pre_label, pre_number, post_number, dev_number = match.groups()
+    release = tuple(int(part) for part in release.split('.'))
+    while len(release) > 1 and release[-1] == 0:
+        release = release[:-1]
+    
+    # Dev releases sort before pre-releases, which sort before the final release
+    pre_ranks = {'a': 0, 'alpha': 0, 'b': 1, 'beta': 1, 'c': 2, 'rc': 2, 'pre': 2, 'preview': 2}
+    if pre_label:
+        pre = (pre_ranks[pre_label.lower()], int(pre_number or 0))
+    elif dev_number is not None and post_number is None:
+        pre = (-1, 0)
+    else:
+        pre = (3, 0)
+    post = int(post_number or 0) if post_number is not None else -1
+    dev = int(dev_number or 0) if dev_number is not None else float('inf')
+    return release, pre, post, dev
+
+def version_matches(version, operator, specified):
+    """Check an installed version against one specifier such as '>=2.31.0'"""
+    if operator == '===':
+        return version == specified
+    if operator in ('==', '!=') and specified.endswith('.*'):
+        # Prefix match: ==1.2.* accepts 1.2 and 1.2.5 but not 1.20
+        prefix = parse_version(specified[:-2])
+        installed = parse_version(version)
+        if prefix is None or installed is None:
+            return False
+        release = installed[0] + (0,) * len(prefix[0])
+        matches = release[:len(prefix[0])] == prefix[0]
+        return matches if operator == '==' else not matches
+    
+    installed, wanted = parse_version(version), parse_version(specified)
+    if installed is None or wanted is None:
+        return False
+    if operator == '~=':
+        # Compatible release: ~=2.2.1 means >=2.2.1 and ==2.2.*
+        parts = specified.split('.')
+        return installed >= wanted and version_matches(version, '==', '.'.join(parts[:-1]) + '.*')
+    return {
+        '==': installed == wanted,
+        '!=': installed != wanted,
+        '>=': installed >= wanted,
+        '<=': installed <= wanted,
+        '>': installed > wanted,
+        '<': installed < wanted
+    }[operator]
+
+def get_marker_environment():
+    """Get the values environment markers in requirements.txt are compared against"""
+    return {
+        'sys_platform': sys.platform,
+        'os_name': os.name,
+        'platform_system': platform.system(),
+        'platform_machine': platform.machine(),
+        'python_version': '.'.join(str(part) for part in sys.version_info[:2]),
+        'python_full_version': platform.python_version(),
+        'implementation_name': sys.implementation.name
+    }
+
+def marker_applies(marker, environment=None):
+    """
+    Check whether a requirement's environment marker (the part after ';')
+    holds on this system
+    
+    Comparisons can be joined with 'and' and 'or' but not grouped in
+    parentheses. Version variables compare as versions, others as strings.
+    
+    Returns:
+        True or False, or None if the marker cannot be evaluated
+    """
+    environment = environment or get_marker_environment()
+    alternatives = []
+    for alternative in re.split(r"\s+or\s+", marker.strip()):
+        results = []
+        for comparison in re.split(r"\s+and\s+", alternative):
+            match = MARKER_PATTERN.match(comparison)
+            if not match or match.group(1) not in environment:
+                return None
+            variable, operator, _, value = match.groups()
+            actual = environment[variable]
+            operator = ' '.join(operator.split())
+            if operator == 'in':
+                results.append(actual in value)
+            elif operator == 'not in':
+                results.append(actual not in value)
+            elif variable.endswith('_version'):
+                results.append(version_matches(actual, operator, value))
+            elif operator in ('==', '!=', '==='):
+                results.append((actual == value) == (operator != '!='))
+            else:
+                return None
+        alternatives.append(all(results))
+    return any(alternatives)
+
+def check_requirement(requirement):
+    """
+    Check one requirements.txt line against the installed packages
+    
+    Returns:
+        Error message, or None if the requirement is satisfied or the line
+        is not a requirement (comment, pip option, URL) or its environment
+        marker excludes this system
+    """
+    requirement, _, marker = requirement.split('#', 1)[0].partition(';')
+    requirement = requirement.strip()
+    if not requirement or requirement.startswith('-') or '://' in requirement:
+        return None
+    # A marker that cannot be evaluated is not enforced, like an unknown line
+    if marker.strip() and not marker_applies(marker):
+        return None
+    
+    match = REQUIREMENT_PATTERN.match(requirement)
+    if not match:
+        return f"Cannot parse requirement '{requirement}'"
+    name, specifiers = match.groups()
+    
+    try:
+        version = importlib.metadata.version(name)
+    except importlib.metadata.PackageNotFoundError:
+        return f"The '{requirement}' distribution was not found and is required by the application"
+    
+    for specifier in filter(None, (part.strip() for part in specifiers.split(','))):
+        specifier_match = SPECIFIER_PATTERN.match(specifier)
+        if not specifier_match:
+            return f"Cannot parse version specifier '{specifier}' of '{name}'"
+        if not version_matches(version, *specifier_match.groups()):
+            return f"{name} {version} is installed but '{requirement}' is required"
+    return None
+
 def validate_dependencies():
-    """Check if all required dependencies are installed with correct versions"""
+    """
+    Check if all required dependencies are installed with correct versions
+    
+    Installed versions are read with importlib.metadata, which is much
+    faster to import and query than pkg_resources. Only the packages listed
+    in requirements.txt are checked, not their own dependencies.
+    """
     try:
         requirements_path = Path("requirements.txt")
         if not requirements_path.exists():
@@ -120,13 +288,9 @@ def validate_dependencies():
             requirements = f.read().strip().split('\n')
         
         for requirement in requirements:
-            if not requirement.strip():
-                continue
-            
-            try:
-                pkg_resources.require(requirement)
-            except (pkg_resources.DistributionNotFound, pkg_resources.VersionConflict) as e:
-                return False, f"Dependency issue: {str(e)}"
+            error = check_requirement(requirement)
+            if error:
+                return False, f"Dependency issue: {error}"
         
         return True, "All dependencies validated"
     except Exception as e:
@@ -150,7 +314,15 @@ def validate_config_file():
                 "video": {
                     "output_directory": "output/",
                     "resolution": "1080p",
-                    "fps": 60
+                    "fps": 60,
+                    "background": "",
+                    "background_list": "backgrounds.txt",
+                    "render_workers": "auto",
+                    "encoder_preset": "standard",
+                    "aspect_ratios": "16:9",
+                    "incremental": "true",
+                    "trace": "false",
+                    "memory_profile": "false"
                 },
                 "text_to_speech": {
                     "service": "pyttsx3",
@@ -222,75 +394,178 @@ def create_required_directories():
     except Exception as e:
         return False, f"Error creating directories: {str(e)}"
 
+def _get_file_fingerprint(path):
+    """Get a file's modification time and size, or None if it does not exist"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+def _get_site_packages_fingerprint():
+    """Get the modification times of the interpreter's package directories, which change on every install"""
+    directories = list(site.getsitepackages()) if hasattr(site, 'getsitepackages') else []
+    directories.append(site.getusersitepackages())
+    return [sys.executable] + [[directory, _get_file_fingerprint(directory)] for directory in directories]
+
+def get_config_fingerprint():
+    """Cache key for validate_config_file: the config file itself"""
+    config = _get_file_fingerprint("config.toml")
+    return ["config.toml", config] if config else None
+
+def get_dependencies_fingerprint():
+    """Cache key for validate_dependencies: the contents of requirements.txt and the installed packages"""
+    try:
+        with open("requirements.txt", 'rb') as f:
+            requirements_hash = hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+    return ["requirements.txt", requirements_hash, _get_site_packages_fingerprint()]
+
+def get_ffmpeg_fingerprint():
+    """Cache key for check_ffmpeg_installation: PATH and the binary it resolves to"""
+    ffmpeg_path = shutil.which('ffmpeg')
+    if ffmpeg_path is None:
+        return None
+    return [os.environ.get('PATH', ''), ffmpeg_path, _get_file_fingerprint(ffmpeg_path)]
+
+# Checks run at boot: (status text, check, cache key function or None to always run).
+# Creating directories is instant and connectivity can change between launches, so neither is cached.
+BOOT_CHECKS = [
+    ("Creating required directories...", create_required_directories, None),
+    ("Validating configuration file...", validate_config_file, get_config_fingerprint),
+    ("Checking dependencies...", validate_dependencies, get_dependencies_fingerprint),
+    ("Checking FFmpeg installation...", check_ffmpeg_installation, get_ffmpeg_fingerprint),
+    ("Testing internet connectivity...", check_internet_connectivity, None)
+]
+
+def load_boot_cache():
+    """Load the cached boot check results, or an empty cache if there are none"""
+    try:
+        with open(BOOT_CACHE_PATH, 'r') as f:
+            cache = json.load(f)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+def save_boot_cache(cache):
+    """Save the boot check results; the cache is only an optimisation, so failures are ignored"""
+    try:
+        BOOT_CACHE_PATH.parent.mkdir(exist_ok=True)
+        temporary_path = BOOT_CACHE_PATH.with_suffix('.tmp')
+        with open(temporary_path, 'w') as f:
+            json.dump(cache, f, indent=2)
+        os.replace(temporary_path, BOOT_CACHE_PATH)
+    except OSError:
+        pass
+
+def run_boot_check(check, fingerprint_function, cache):
+    """
+    Run one boot check, reusing its cached result while its inputs are unchanged
+    
+    Only passing results are cached, so a failed check runs again on the
+    next launch.
+    
+    Returns:
+        Tuple of (success, message, cache entry to store or None)
+    """
+    fingerprint = None
+    if fingerprint_function is not None:
+        try:
+            fingerprint = fingerprint_function()
+        except Exception:
+            fingerprint = None
+        cached = cache.get(check.__name__)
+        if fingerprint is not None and cached and cached.get('fingerprint') == fingerprint:
+            return True, cached['message'], None
+    
+    success, message = check()
+    
+    if success is True and fingerprint is not None:
+        # Fingerprint again afterwards: the check may have changed its own inputs
+        try:
+            fingerprint = fingerprint_function()
+        except Exception:
+            fingerprint = None
+        if fingerprint is not None:
+            return success, message, {'fingerprint': fingerprint, 'message': message}
+    return success, message, None
+
 def simulate_boot_process():
-    """Simulate the boot process with actual system validation"""
-    
-    # Define validation stages
-    validation_stages = [
-        (5, "Initializing system...", None),
-        (15, "Creating required directories...", create_required_directories),
-        (25, "Validating configuration file...", validate_config_file),
-        (40, "Checking dependencies...", validate_dependencies),
-        (55, "Checking FFmpeg installation...", check_ffmpeg_installation),
-        (70, "Testing internet connectivity...", check_internet_connectivity),
-        (85, "Loading user interface...", None),
-        (95, "Finalizing startup...", None),
-        (100, "Boot complete! Starting application...", None)
-    ]
+    """
+    Run the boot checks and show their progress
+    
+    The checks run concurrently and the progress bar advances as each one
+    completes. Checks whose inputs (files, installed packages, PATH) have
+    not changed since they last passed reuse the cached result, so warm
+    starts only wait for the checks that cannot be cached.
+    """
     
     # Display the initial interface once
     progress_bar_row, status_text_row, width = display_boot_interface_initial()
-      # Track validation results
+    update_boot_progress(0, "Initializing system...", progress_bar_row, status_text_row, width)
+    
+    # Track validation results
     validation_errors = []
     new_config_created = False
     
-    for progress, status, validation_func in validation_stages:
-        # Update progress and status
-        update_boot_progress(progress, status, progress_bar_row, status_text_row, width)
+    cache = load_boot_cache()
+    executor = ThreadPoolExecutor(max_workers=len(BOOT_CHECKS), thread_name_prefix='boot-check')
+    pending = {
+        executor.submit(run_boot_check, check, fingerprint_function, cache): (status, check)
+        for status, check, fingerprint_function in BOOT_CHECKS
+    }
+    completed = 0
+    skipped = False
+    
+    while pending:
+        done, _ = wait(pending, timeout=BOOT_POLL_INTERVAL, return_when=FIRST_COMPLETED)
         
-        # Run validation if function is provided
-        if validation_func:
-            time.sleep(0.3)  # Brief pause for visual effect
-            success, message = validation_func()
+        for future in done:
+            status, check = pending.pop(future)
+            completed += 1
+            progress = 100 * completed / len(BOOT_CHECKS)
+            try:
+                success, message, entry = future.result()
+            except Exception as e:
+                success, message, entry = False, f"Unexpected error: {str(e)}", None
+            
+            if entry is not None:
+                cache[check.__name__] = entry
             
             if success == "new_config":
                 # Special case: new config file created
                 new_config_created = True
-                warning_status = f"⚠ {message}"
-                update_boot_progress(progress, warning_status, progress_bar_row, status_text_row, width)
-                time.sleep(1.5)  # Longer pause to let user read the warning
+                update_boot_progress(progress, f"⚠ {message}", progress_bar_row, status_text_row, width)
             elif success:
-                # Show success message briefly
-                success_status = f"✓ {message}"
-                update_boot_progress(progress, success_status, progress_bar_row, status_text_row, width)
-                time.sleep(0.5)
+                update_boot_progress(progress, f"✓ {message}", progress_bar_row, status_text_row, width)
             else:
-                # Show error message
-                error_status = f"✗ {message}"
-                update_boot_progress(progress, error_status, progress_bar_row, status_text_row, width)
+                update_boot_progress(progress, f"✗ {message}", progress_bar_row, status_text_row, width)
                 validation_errors.append(f"{status}: {message}")
-                time.sleep(1.0)  # Longer pause for errors
-        else:
-            time.sleep(0.5)  # Normal loading time for non-validation stages
         
         # Check if user wants to skip (optional)
-        if msvcrt.kbhit():
-            key = msvcrt.getch()
-            if key == b' ':  # Space to skip
+        if pending and key_available():
+            key = read_key()
+            if key == ' ':  # Space to skip
+                skipped = True
                 break
     
+    # Don't wait for checks still running after a skip; their threads finish in the background
+    executor.shutdown(wait=not skipped, cancel_futures=True)
+    save_boot_cache(cache)
+    
     # Handle validation errors
     if validation_errors:
         error_summary = f"Found {len(validation_errors)} issue(s). Press any key to continue anyway..."
         update_boot_progress(100, error_summary, progress_bar_row, status_text_row, width)
-        msvcrt.getch()
+        read_key()
         
         # Show detailed error information
         show_validation_errors(validation_errors)
     else:
         # All validations passed
         update_boot_progress(100, "All systems ready! Press any key to continue...", progress_bar_row, status_text_row, width)
-        msvcrt.getch()
+        read_key()
     
     # Show config warning if a new config was created
     if new_config_created:
@@ -358,7 +633,7 @@ def show_validation_errors(errors):
     # Draw bottom border
     draw_bottom_border(width)
     show_cursor()
-    msvcrt.getch()
+    read_key()
 
 def show_config_warning():
     """Display a warning about the newly created config file"""
@@ -426,7 +701,7 @@ def show_config_warning():
     draw_bottom_border(width)
     
     show_cursor()
-    msvcrt.getch()
+    read_key()
 
 def show_boot_screen():
     """Main function to show the boot screen"""
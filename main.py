@@ -1,5 +1,4 @@
 import sys
-import msvcrt
 
 from utils import *
 from boot import show_boot_screen
@@ -51,19 +50,17 @@ def main():
     
     while True:
         # Get keyboard input
-        key = msvcrt.getch()
+        key = read_key()
         
-        if key == b'\xe0':  # Special key prefix for arrow keys
-            key = msvcrt.getch()
-            if key == b'H':  # Up arrow
-                selected_option = (selected_option - 1) % max_options
-                # Update only the menu portion
-                update_menu_selection(selected_option, options, menu_start_row, width)
-            elif key == b'P':  # Down arrow
-                selected_option = (selected_option + 1) % max_options
-                # Update only the menu portion
-                update_menu_selection(selected_option, options, menu_start_row, width)
-        elif key == b'\r':  # Enter key
+        if key == KEY_UP:  # Up arrow
+            selected_option = (selected_option - 1) % max_options
+            # Update only the menu portion
+            update_menu_selection(selected_option, options, menu_start_row, width)
+        elif key == KEY_DOWN:  # Down arrow
+            selected_option = (selected_option + 1) % max_options
+            # Update only the menu portion
+            update_menu_selection(selected_option, options, menu_start_row, width)
+        elif key == KEY_ENTER:  # Enter key
             if selected_option == 0:
                 handle_option_1()
                 # Redraw interface when returning from a page
@@ -78,7 +75,7 @@ def main():
                 menu_start_row = display_interface_initial(selected_option, options)
             elif selected_option == 3:
                 handle_option_4()
-        elif key == b'\x1b':  # ESC key
+        elif key == KEY_ESC:  # ESC key
             handle_option_4()
 
 if __name__ == "__main__":
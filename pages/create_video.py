@@ -1,6 +1,7 @@
 import sys
-import msvcrt
 import json
+import time
+import shutil
 import hashlib
 import praw
 import toml
@@ -9,8 +10,15 @@ from pathlib import Path
 from utils import *
 from tts import (
     create_audio_gtts, test_gtts_availability,
-    create_audio_pyttsx3, test_pyttsx3_availability
+    create_audio_pyttsx3, test_pyttsx3_availability,
+    stretch_audio_file, get_audio_duration,
+    load_or_create_timing, get_timing_path
 )
+from video import export_captions, render_video_aspects, get_output_aspects, ensure_background_library, \
+    build_timeline, get_timeline_frame_rate
+from pipeline import BuildGraph, Tracer, span, traced, tracing, is_tracing_enabled, \
+    MemoryProfiler, profiling, memory_stage, is_memory_profiling_enabled
+from pipeline.metrics import TTS_SECONDS_PER_CHARACTER
 
 def create_temp_directory():
     """Create temp directory if it doesn't exist"""
@@ -59,54 +67,58 @@ def fetch_reddit_post_data(post_id, reddit_config):
     """Fetch Reddit post data using PRAW"""
     try:
         # Initialize Reddit instance
-        reddit = praw.Reddit(
-            client_id=reddit_config.get('client_id', ''),
-            client_secret=reddit_config.get('client_secret', ''),
-            username=reddit_config.get('username', ''),
-            password=reddit_config.get('password', ''),
-            user_agent=reddit_config.get('user_agent', 'RedditVideoCreator:v1.0')
-        )
+        with span('praw.init', 'fetch'):
+            reddit = praw.Reddit(
+                client_id=reddit_config.get('client_id', ''),
+                client_secret=reddit_config.get('client_secret', ''),
+                username=reddit_config.get('username', ''),
+                password=reddit_config.get('password', ''),
+                user_agent=reddit_config.get('user_agent', 'RedditVideoCreator:v1.0')
+            )
         
-        # Get the submission
-        submission = reddit.submission(id=post_id)
-        
-        # Prepare post data
-        post_data = {
-            'post_id': submission.id,
-            'title': submission.title,
-            'author': str(submission.author) if submission.author else '[deleted]',
-            'subreddit': submission.subreddit.display_name,
-            'selftext': submission.selftext,
-            'url': submission.url,
-            'score': submission.score,
-            'upvote_ratio': submission.upvote_ratio,
-            'num_comments': submission.num_comments,
-            'created_utc': submission.created_utc,
-            'is_self': submission.is_self,
-            'comments': []
-        }
-          # Fetch top comments
-        submission.comments.replace_more(limit=0)  # Remove "more comments" objects
-        for comment in submission.comments.list()[:50]:  # Limit to top 50 comments
-            try:
-                # Check if comment has body and is not deleted/removed
-                if (hasattr(comment, 'body') and 
-                    comment.body and 
-                    comment.body not in ['[deleted]', '[removed]']):
-                    
-                    comment_data = {
-                        'id': getattr(comment, 'id', ''),
-                        'author': str(comment.author) if comment.author else '[deleted]',
-                        'body': getattr(comment, 'body', ''),
-                        'score': getattr(comment, 'score', 0),
-                        'created_utc': getattr(comment, 'created_utc', 0),
-                        'is_submitter': getattr(comment, 'is_submitter', False),
-                        'parent_id': getattr(comment, 'parent_id', '')
-                    }
-                    post_data['comments'].append(comment_data)
-            except Exception as e:
-                # Skip comments that cause errors (deleted, private, etc.)
-                continue
+        # Get the submission (PRAW fetches it lazily on the first attribute access)
+        with span('praw.submission', 'fetch'):
+            submission = reddit.submission(id=post_id)
+            
+            # Prepare post data
+            post_data = {
+                'post_id': submission.id,
+                'title': submission.title,
+                'author': str(submission.author) if submission.author else '[deleted]',
+                'subreddit': submission.subreddit.display_name,
+                'selftext': submission.selftext,
+                'url': submission.url,
+                'score': submission.score,
+                'upvote_ratio': submission.upvote_ratio,
+                'num_comments': submission.num_comments,
+                'created_utc': submission.created_utc,
+                'is_self': submission.is_self,
+                'comments': []
+            }
+        # Fetch top comments
+        with span('praw.replace_more', 'fetch'):
+            submission.comments.replace_more(limit=0)  # Remove "more comments" objects
+        with span('praw.comments', 'fetch'):
+            for comment in submission.comments.list()[:50]:  # Limit to top 50 comments
+                try:
+                    # Check if comment has body and is not deleted/removed
+                    if (hasattr(comment, 'body') and 
+                        comment.body and 
+                        comment.body not in ['[deleted]', '[removed]']):
+                        
+                        comment_data = {
+                            'id': getattr(comment, 'id', ''),
+                            'author': str(comment.author) if comment.author else '[deleted]',
+                            'body': getattr(comment, 'body', ''),
+                            'score': getattr(comment, 'score', 0),
+                            'created_utc': getattr(comment, 'created_utc', 0),
+                            'is_submitter': getattr(comment, 'is_submitter', False),
+                            'parent_id': getattr(comment, 'parent_id', '')
+                        }
+                        post_data['comments'].append(comment_data)
+                except Exception as e:
+                    # Skip comments that cause errors (deleted, private, etc.)
+                    continue
         
         return True, post_data
         
@@ -207,22 +219,22 @@ def handle_url_input():
         print("│" + input_line + "│", end="", flush=True)
         
         # Get user input
-        key = msvcrt.getch()
+        key = read_key()
         
-        if key == b'\r':  # Enter
+        if key == KEY_ENTER:  # Enter
             if user_input.strip():
                 return user_input.strip()
             
-        elif key == b'\x1b':  # ESC
+        elif key == KEY_ESC:  # ESC
             return None
             
-        elif key == b'\x08':  # Backspace
+        elif key == KEY_BACKSPACE:  # Backspace
             if user_input:
                 user_input = user_input[:-1]
                 
         elif len(key) == 1 and 32 <= ord(key) <= 126:  # Printable characters
             if len(user_input) < 500:  # URL length limit
-                user_input += key.decode('utf-8')
+                user_input += key
         
         # Refresh input display
         move_cursor(input_row, 1)
@@ -338,7 +350,7 @@ def show_success_screen(post_data, cache_file):
     draw_bottom_border(width)
     
     show_cursor()
-    msvcrt.getch()
+    read_key()
 
 def show_error_screen(error_message):
     """Show error screen with error details"""
@@ -399,7 +411,7 @@ def show_error_screen(error_message):
     draw_bottom_border(width)
     
     show_cursor()
-    msvcrt.getch()
+    read_key()
 
 def display_video_type_interface(post_data):
     """Display the video type selection interface"""
@@ -598,7 +610,7 @@ def process_top_10_comments(post_data):
     return content
 
 def show_content_preview(content):
-    """Show a preview of the processed content"""
+    """Show a preview of the processed content, returning the key pressed"""
     clear_screen()
     hide_cursor()
     
@@ -634,7 +646,7 @@ def show_content_preview(content):
             "Content Preview:",
             f"{content['text'][:200]}{'...' if len(content['text']) > 200 else ''}",
             "",
-            f"{blue}Press any key to continue{reset}"
+            f"{blue}Press P for a quick preview render, any other key to continue{reset}"
         ]
     elif content['type'] == 'top_comment':
         if 'comment' in content:
@@ -648,7 +660,7 @@ def show_content_preview(content):
                 "Comment Preview:",
                 f"{content['comment']['text'][:200]}{'...' if len(content['comment']['text']) > 200 else ''}",
                 "",
-                f"{blue}Press any key to continue{reset}"
+                f"{blue}Press P for a quick preview render, any other key to continue{reset}"
             ]
     elif content['type'] == 'top_10_comments':
         content_lines = [
@@ -671,7 +683,7 @@ def show_content_preview(content):
             content_lines.append(f"... and {len(content['comments']) - 3} more comments")
             content_lines.append("")
         
-        content_lines.append(f"{blue}Press any key to continue{reset}")
+        content_lines.append(f"{blue}Press P for a quick preview render, any other key to continue{reset}")
     
     # Calculate positioning
     content_height = len(content_lines)
@@ -701,7 +713,7 @@ def show_content_preview(content):
     draw_bottom_border(width)
     
     show_cursor()
-    msvcrt.getch()
+    return read_key()
 
 def show_video_type_selection_page(post_data):
     """Main video type selection page"""
@@ -713,23 +725,22 @@ def show_video_type_selection_page(post_data):
         update_video_type_selection(selected_option, options, menu_start_row, get_terminal_size()[0])
         
         # Handle input
-        key = msvcrt.getch()
+        key = read_key()
         
-        if key == b'\xe0':  # Arrow keys
-            key = msvcrt.getch()
-            if key == b'H':  # Up
-                selected_option = (selected_option - 1) % len(options)
-                update_video_type_selection(selected_option, options, menu_start_row, get_terminal_size()[0])
-            elif key == b'P':  # Down
-                selected_option = (selected_option + 1) % len(options)
-                update_video_type_selection(selected_option, options, menu_start_row, get_terminal_size()[0])
-        elif key == b'\r':  # Enter
+        if key == KEY_UP:  # Up
+            selected_option = (selected_option - 1) % len(options)
+            update_video_type_selection(selected_option, options, menu_start_row, get_terminal_size()[0])
+        elif key == KEY_DOWN:  # Down
+            selected_option = (selected_option + 1) % len(options)
+            update_video_type_selection(selected_option, options, menu_start_row, get_terminal_size()[0])
+        elif key == KEY_ENTER:  # Enter
             # Process selected video type
             content = process_video_content(post_data, selected_option)
             if content:
-                show_content_preview(content)
+                key = show_content_preview(content)
+                content['preview'] = key in ('p', 'P')
                 return content
-        elif key == b'\x1b':  # ESC
+        elif key == KEY_ESC:  # ESC
             return None  # Go back to URL input
 
 
@@ -764,56 +775,97 @@ def show_create_video_page():
         temp_dir = Path("temp")
         cache_filename = generate_cache_filename(post_id, "unknown")  # We'll update with real author later
         
-        # Try to fetch post data
-        show_processing_screen("Fetching Reddit post data...")
-        success, result = fetch_reddit_post_data(post_id, reddit_config)
-        
-        if not success:
-            show_error_screen(f"Failed to fetch post data: {result}")
-            continue
-        
-        post_data = result
-        
-        # Update cache filename with real author and save data
-        author = post_data.get('author', 'unknown') if isinstance(post_data, dict) else 'unknown'
-        cache_filename = generate_cache_filename(post_id, author)
-        cache_file_path = temp_dir / cache_filename
-        
-        try:
-            with open(cache_file_path, 'w', encoding='utf-8') as f:
-                json.dump(post_data, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            show_error_screen(f"Failed to save post data: {str(e)}")
-            continue
-          # Step 5: Show video type selection
-        selected_content = show_video_type_selection_page(post_data)
-        
-        if selected_content is None:  # User pressed ESC from video type selection
-            continue  # Go back to URL input
-        
-        # Step 6: Generate TTS audio
-        tts_config = load_tts_config()
-        service = tts_config.get('service', 'pyttsx3')
-        
-        # Show TTS processing screen
-        content_type_names = {
-            'post_description': 'Post Description',
-            'top_comment': 'Top Comment',
-            'top_10_comments': 'Top 10 Comments'
-        }
-        content_type_display = content_type_names.get(selected_content['type'], 'Unknown')
-        show_tts_processing_screen(content_type_display, service.upper())
-        
-        # Generate the audio
-        success, result = generate_tts_audio(selected_content)
-        
-        if success:
-            # Show success screen with audio file path
-            show_tts_success_screen(result)
-        else:
-            # Show error screen
-            show_tts_error_screen(result)
+        # Trace this video's stages and profile their memory when the 'trace' and
+        # 'memory_profile' settings are on (see tracing.py and pipeline.memory)
+        video_config = load_video_config()
+        tracer = Tracer(post_id) if is_tracing_enabled(video_config) else None
+        profiler = MemoryProfiler(post_id) if is_memory_profiling_enabled(video_config) else None
         
+        with tracing(tracer), profiling(profiler):
+            # Try to fetch post data
+            show_processing_screen("Fetching Reddit post data...")
+            with memory_stage('fetched'):
+                success, result = fetch_reddit_post_data(post_id, reddit_config)
+            
+            if not success:
+                show_error_screen(f"Failed to fetch post data: {result}")
+                continue
+            
+            post_data = result
+            
+            # Update cache filename with real author and save data
+            author = post_data.get('author', 'unknown') if isinstance(post_data, dict) else 'unknown'
+            cache_filename = generate_cache_filename(post_id, author)
+            cache_file_path = temp_dir / cache_filename
+            
+            try:
+                with open(cache_file_path, 'w', encoding='utf-8') as f:
+                    json.dump(post_data, f, indent=2, ensure_ascii=False)
+            except Exception as e:
+                show_error_screen(f"Failed to save post data: {str(e)}")
+                continue
+            # Step 5: Show video type selection
+            selected_content = show_video_type_selection_page(post_data)
+            
+            if selected_content is None:  # User pressed ESC from video type selection
+                continue  # Go back to URL input
+            
+            # Step 6: Generate TTS audio
+            tts_config = load_tts_config()
+            service = tts_config.get('service', 'pyttsx3')
+            
+            # Show TTS processing screen
+            content_type_names = {
+                'post_description': 'Post Description',
+                'top_comment': 'Top Comment',
+                'top_10_comments': 'Top 10 Comments'
+            }
+            content_type_display = content_type_names.get(selected_content['type'], 'Unknown')
+            show_tts_processing_screen(content_type_display, service.upper())
+            
+            # Generate the audio
+            with memory_stage('audio_done'):
+                success, result = generate_tts_audio(selected_content)
+            
+            if success:
+                # Step 7 (optional): Render a low-resolution proxy to check pacing and layout
+                render_full = True
+                if selected_content.get('preview'):
+                    show_processing_screen("Rendering preview...")
+                    # Not profiled: 'rendered' is the full render's stage, and a proxy would skew its report
+                    preview_success, preview_result = generate_video(result, preview=True)
+                    if preview_success:
+                        result['preview'] = preview_result
+                        render_full = show_preview_screen(preview_result)
+                    else:
+                        result['video_error'] = preview_result
+            
+                # Step 8: Composite the cards over background footage and encode
+                if render_full:
+                    show_processing_screen("Rendering video...")
+                    with memory_stage('rendered'):
+                        video_success, video_result = generate_video(result)
+                    if video_success:
+                        result['videos'] = list(video_result['outputs'].values())
+                        result['video'] = result['videos'][0]
+                        result.pop('video_error', None)
+                    else:
+                        result['video_error'] = video_result
+            
+                # Save the timings and memory report next to the video (or the audio when there is no video)
+                report_base = str(Path(result['video']).with_suffix('') if result.get('video')
+                                  else create_output_directory() / result['base_filename'])
+                if tracer is not None:
+                    result['trace'] = tracer.save(report_base)
+                if profiler is not None:
+                    result['memory'] = profiler.save(report_base)
+            
+                # Show success screen with audio file path
+                show_tts_success_screen(result)
+            else:
+                # Show error screen
+                show_tts_error_screen(result)
+            
         # Return to main menu after processing
         return
 
@@ -829,12 +881,25 @@ def load_tts_config():
     except Exception:
         return {}
 
+def load_video_config():
+    """Load video configuration from config.toml"""
+    try:
+        config_path = Path("config.toml")
+        if config_path.exists():
+            with open(config_path, 'r') as f:
+                config = toml.load(f)
+                return config.get('video', {})
+        return {}
+    except Exception:
+        return {}
+
 def create_output_directory():
     """Create output directory if it doesn't exist"""
     output_dir = Path("output")
     output_dir.mkdir(exist_ok=True)
     return output_dir
 
+@traced('clean_text', 'text')
 def clean_text_for_tts(text):
     """Clean and format text for TTS by removing markdown and special formatting"""
     import re
@@ -909,7 +974,14 @@ def prepare_audio_segments(content):
                 'type': 'title',
                 'text': title_text,
                 'filename_suffix': 'title',
-                'description': f"Post Title: {content['title'][:50]}{'...' if len(content['title']) > 50 else ''}"
+                'description': f"Post Title: {content['title'][:50]}{'...' if len(content['title']) > 50 else ''}",
+                'card': {
+                    'kind': 'title',
+                    'title': content['title'],
+                    'author': content['author'],
+                    'subreddit': content['subreddit'],
+                    'score': content['score']
+                }
             })
         
         # Segment 2: Post content (if available)
@@ -920,7 +992,13 @@ def prepare_audio_segments(content):
                     'type': 'content',
                     'text': content_text,
                     'filename_suffix': 'content',
-                    'description': f"Post Content ({len(content_text)} characters)"
+                    'description': f"Post Content ({len(content_text)} characters)",
+                    'card': {
+                        'kind': 'content',
+                        'title': content['title'],
+                        'author': content['author'],
+                        'text': content['text']
+                    }
                 })
     
     elif content['type'] == 'top_comment':
@@ -934,7 +1012,13 @@ def prepare_audio_segments(content):
                 'type': 'title',
                 'text': title_text,
                 'filename_suffix': 'title',
-                'description': f"Post Title: {content['post_title'][:50]}{'...' if len(content['post_title']) > 50 else ''}"
+                'description': f"Post Title: {content['post_title'][:50]}{'...' if len(content['post_title']) > 50 else ''}",
+                'card': {
+                    'kind': 'title',
+                    'title': content['post_title'],
+                    'author': content['post_author'],
+                    'subreddit': content['subreddit']
+                }
             })
         
         # Segment 2: Top comment
@@ -944,7 +1028,13 @@ def prepare_audio_segments(content):
                 'type': 'comment',
                 'text': comment_text,
                 'filename_suffix': 'top_comment',
-                'description': f"Top Comment by u/{content['comment']['author']} (Score: {content['comment']['score']})"
+                'description': f"Top Comment by u/{content['comment']['author']} (Score: {content['comment']['score']})",
+                'card': {
+                    'kind': 'comment',
+                    'author': content['comment']['author'],
+                    'text': content['comment']['text'],
+                    'score': content['comment']['score']
+                }
             })
     
     elif content['type'] == 'top_10_comments':
@@ -958,7 +1048,13 @@ def prepare_audio_segments(content):
                 'type': 'title',
                 'text': title_text,
                 'filename_suffix': 'title',
-                'description': f"Post Title: {content['post_title'][:50]}{'...' if len(content['post_title']) > 50 else ''}"
+                'description': f"Post Title: {content['post_title'][:50]}{'...' if len(content['post_title']) > 50 else ''}",
+                'card': {
+                    'kind': 'title',
+                    'title': content['post_title'],
+                    'author': content['post_author'],
+                    'subreddit': content['subreddit']
+                }
             })
         
         # Segments 2-11: Individual comments
@@ -969,7 +1065,13 @@ def prepare_audio_segments(content):
                     'type': 'comment',
                     'text': comment_text,
                     'filename_suffix': f'comment_{i:02d}',
-                    'description': f"Comment #{i} by u/{comment['author']} (Score: {comment['score']})"
+                    'description': f"Comment #{i} by u/{comment['author']} (Score: {comment['score']})",
+                    'card': {
+                        'kind': 'comment',
+                        'author': comment['author'],
+                        'text': comment['text'],
+                        'score': comment['score']
+                    }
                 })
     
     return segments
@@ -990,6 +1092,15 @@ def generate_audio_filename(content):
     hash_object = hashlib.md5(identifier.encode())
     return f"audio_{hash_object.hexdigest()[:12]}"
 
+def get_tts_cache_path(service, text, voice_key, extension):
+    """Get the cache path for a speed-neutral TTS render of a text segment"""
+    cache_dir = Path("temp") / "tts_cache"
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    
+    identifier = f"{service}_{voice_key}_{text}"
+    hash_object = hashlib.md5(identifier.encode('utf-8'))
+    return cache_dir / f"{hash_object.hexdigest()}{extension}"
+
 def get_male_voice_id():
     """Get a male voice ID for pyttsx3"""
     try:
@@ -1019,14 +1130,25 @@ def get_male_voice_id():
     
     return None
 
-def generate_tts_audio(content):
-    """Generate multiple separate TTS audio files based on content"""
+# Speaking rate pyttsx3 renders at before time-stretching (speed 1.0)
+PYTTSX3_BASE_RATE = 175
+
+def generate_tts_audio(content, segments=None, completed=None, on_segment=None):
+    """
+    Generate multiple separate TTS audio files based on content
+    
+    Resumable runs (see pipeline.job_store) pass the segments prepared
+    earlier, the file info of segments already finished keyed by
+    filename_suffix, and a callback that is given (segment, file info or
+    None) as each segment completes or fails.
+    """
     # Load TTS configuration
     tts_config = load_tts_config()
     service = tts_config.get('service', 'pyttsx3')
     
     # Prepare audio segments
-    segments = prepare_audio_segments(content)
+    if segments is None:
+        segments = prepare_audio_segments(content)
     
     if not segments:
         return False, "No valid content segments for TTS generation"
@@ -1040,92 +1162,170 @@ def generate_tts_audio(content):
     generated_files = []
     failed_segments = []
     
+    # Text, TTS and stretched audio are tracked by content so unchanged segments are reused
+    build_graph = BuildGraph()
+    
     try:
         for segment in segments:
             if not segment['text'].strip():
                 continue
             
-            # Create filename for this segment
-            segment_filename = f"{base_filename}_{segment['filename_suffix']}"
+            # Segments finished by an earlier run are never synthesised again
+            finished = (completed or {}).get(segment['filename_suffix'])
+            if finished and Path(finished['filename']).exists():
+                generated_files.append(finished)
+                continue
             
-            success = False
+            with span('tts.segment', 'tts', segment=segment['filename_suffix'],
+                      characters=len(segment['text'])) as segment_span:
+                text_key = build_graph.key('text', {'text': segment['text']})
+                audio_key = None
             
-            if service.lower() == 'gtts':
-                # Use gTTS (online service)
-                if not test_gtts_availability():
-                    return False, "gTTS is not available. Please install it or check internet connection."
-                
-                audio_file = output_dir / f"{segment_filename}.mp3"
-                language = tts_config.get('voice', 'en')
+                # Create filename for this segment
+                segment_filename = f"{base_filename}_{segment['filename_suffix']}"
+            
+                success = False
+                cache_file = None
                 speed_setting = float(tts_config.get('speed', '1.0'))
-                slow_speech = speed_setting < 0.8
-                
-                success = create_audio_gtts(
-                    text=segment['text'],
-                    output_path=str(audio_file),
-                    language=language,
-                    slow=slow_speech
-                )
             
-            elif service.lower() == 'pyttsx3':
-                # Use pyttsx3 (offline service)
-                if not test_pyttsx3_availability():
-                    return False, "pyttsx3 is not available. Please install it."
+                if service.lower() == 'gtts':
+                    # Use gTTS (online service)
+                    with span('tts.engine_check', 'tts', service='gtts'):
+                        available = test_gtts_availability()
+                    if not available:
+                        return False, "gTTS is not available. Please install it or check internet connection."
+                
+                    audio_file = output_dir / f"{segment_filename}.mp3"
+                    language = tts_config.get('voice', 'en')
                 
-                audio_file = output_dir / f"{segment_filename}.wav"
+                    # Synthesise at normal speed once; speed is applied afterwards
+                    cache_file = get_tts_cache_path('gtts', segment['text'], language, '.mp3')
+                    tts_reused = cache_file.exists()
+                    if not tts_reused:
+                        synthesis_started = time.monotonic()
+                        with span('tts.synthesize', 'tts', service='gtts'):
+                            create_audio_gtts(
+                                text=segment['text'],
+                                output_path=str(cache_file),
+                                language=language,
+                                slow=False
+                            )
+                        if cache_file.exists():
+                            TTS_SECONDS_PER_CHARACTER.observe(
+                                'gtts', value=(time.monotonic() - synthesis_started) / len(segment['text']))
+            
+                elif service.lower() == 'pyttsx3':
+                    # Use pyttsx3 (offline service)
+                    with span('tts.engine_check', 'tts', service='pyttsx3'):
+                        available = test_pyttsx3_availability()
+                    if not available:
+                        return False, "pyttsx3 is not available. Please install it."
                 
-                # Get male voice
-                male_voice_id = get_male_voice_id()
+                    audio_file = output_dir / f"{segment_filename}.wav"
                 
-                # Convert speed and volume from string to appropriate values
-                speed_setting = float(tts_config.get('speed', '1.0'))
-                volume_setting = float(tts_config.get('volume', '0.8'))
+                    # Get male voice
+                    with span('tts.voice_lookup', 'tts'):
+                        male_voice_id = get_male_voice_id()
                 
-                # Convert speed (0.1-2.0) to rate (words per minute)
-                base_rate = 175
-                rate = int(base_rate * speed_setting)
+                    # Convert volume from string to appropriate value
+                    volume_setting = float(tts_config.get('volume', '0.8'))
                 
-                success = create_audio_pyttsx3(
-                    text=segment['text'],
-                    output_path=str(audio_file),
-                    voice_id=male_voice_id,
-                    rate=rate,
-                    volume=volume_setting
-                )
+                    # Synthesise at the base rate once; speed is applied afterwards
+                    cache_file = get_tts_cache_path(
+                        'pyttsx3', segment['text'], f"{male_voice_id}_{volume_setting}", '.wav'
+                    )
+                    tts_reused = cache_file.exists()
+                    if not tts_reused:
+                        synthesis_started = time.monotonic()
+                        with span('tts.synthesize', 'tts', service='pyttsx3'):
+                            create_audio_pyttsx3(
+                                text=segment['text'],
+                                output_path=str(cache_file),
+                                voice_id=male_voice_id,
+                                rate=PYTTSX3_BASE_RATE,
+                                volume=volume_setting
+                            )
+                        if cache_file.exists():
+                            TTS_SECONDS_PER_CHARACTER.observe(
+                                'pyttsx3', value=(time.monotonic() - synthesis_started) / len(segment['text']))
             
-            if success:
-                # Get file size for display
-                try:
-                    file_size = Path(audio_file).stat().st_size
-                    size_kb = file_size / 1024
-                    size_display = f"{size_kb:.1f} KB" if size_kb < 1024 else f"{size_kb/1024:.2f} MB"
-                except:
-                    size_display = "Unknown size"
+                # Speed changes are a time-stretch of the cached render, not a new TTS call
+                if cache_file is not None and cache_file.exists():
+                    build_graph.record('tts', cache_file.stem, str(cache_file), [text_key], built=not tts_reused)
+                    with span('tts.stretch', 'tts', speed=speed_setting):
+                        built = build_graph.build(
+                            'audio', {'tts': cache_file.name, 'speed': speed_setting},
+                            lambda path: stretch_audio_file(str(cache_file), path, speed_setting),
+                            audio_file.suffix, [cache_file.stem]
+                        )
+                    if built:
+                        audio_key, built_path = built
+                        shutil.copyfile(built_path, audio_file)
+                        success = True
+            
+                if success:
+                    # Get file size for display
+                    try:
+                        file_size = Path(audio_file).stat().st_size
+                        size_kb = file_size / 1024
+                        size_display = f"{size_kb:.1f} KB" if size_kb < 1024 else f"{size_kb/1024:.2f} MB"
+                    except:
+                        size_display = "Unknown size"
                 
-                generated_files.append({
-                    'segment_type': segment['type'],
-                    'filename': str(audio_file),
-                    'filename_short': Path(audio_file).name,
-                    'text_preview': segment['text'][:100] + ('...' if len(segment['text']) > 100 else ''),
-                    'description': segment.get('description', 'Audio segment'),
-                    'file_size': size_display,
-                    'duration_estimate': f"~{len(segment['text']) // 10}s"  # Rough estimate: 10 chars per second
-                })
-            else:
-                failed_segments.append(segment['filename_suffix'])
+                    # Measure the real duration and align words for captions
+                    with span('tts.align', 'tts'):
+                        duration = get_audio_duration(str(audio_file))
+                        timing = load_or_create_timing(str(audio_file), segment['text'])
+                    segment_span.set(reused=tts_reused, duration=duration)
+                    if duration is not None:
+                        duration_display = f"{duration:.1f}s"
+                    else:
+                        duration_display = f"~{len(segment['text']) // 10}s"  # Rough estimate: 10 chars per second
+                
+                    generated_files.append({
+                        'segment_type': segment['type'],
+                        'filename': str(audio_file),
+                        'filename_short': Path(audio_file).name,
+                        'text': segment['text'],
+                        'text_preview': segment['text'][:100] + ('...' if len(segment['text']) > 100 else ''),
+                        'description': segment.get('description', 'Audio segment'),
+                        'file_size': size_display,
+                        'duration': duration,
+                        'duration_estimate': duration_display,
+                        'timing_file': get_timing_path(str(audio_file)) if timing else None,
+                        'card': segment.get('card'),
+                        'audio_key': audio_key
+                    })
+                    if on_segment:
+                        on_segment(segment, generated_files[-1])
+                else:
+                    failed_segments.append(segment['filename_suffix'])
+                    if on_segment:
+                        on_segment(segment, None)
+        
+        build_graph.save()
         
         if generated_files:
             success_message = f"Generated {len(generated_files)} separate audio files"
             if failed_segments:
                 success_message += f" ({len(failed_segments)} failed: {', '.join(failed_segments)})"
             
+            # Write sidecar captions (SRT, WebVTT, ASS) next to the audio
+            try:
+                with span('captions.export', 'text'):
+                    caption_files = export_captions(generated_files, str(output_dir / base_filename))
+            except Exception as e:
+                caption_files = {}
+                success_message += f" (captions failed: {str(e)})"
+            
             return True, {
                 'message': success_message,
                 'files': generated_files,
                 'total_files': len(generated_files),
                 'failed_count': len(failed_segments),
                 'service_used': service.upper(),
-                'base_filename': base_filename
+                'base_filename': base_filename,
+                'captions': caption_files
             }
         else:
             return False, f"Failed to generate any audio files. Service: {service}"
@@ -1133,6 +1333,137 @@ def generate_tts_audio(content):
     except Exception as e:
         return False, f"Error during TTS generation: {str(e)}"
 
+def generate_video(tts_result, preview=False, video_config=None, should_yield=None):
+    """
+    Render the final video (one file per configured aspect ratio) from generated TTS audio segments
+    
+    With preview=True a low-resolution, low-fps proxy of the first aspect
+    ratio is rendered into temp/previews/ instead. A later full render
+    reuses the proxy's background window, narration mix and full-size cards.
+    video_config defaults to the [video] section of config.toml.
+    should_yield lets a batch scheduler stop an incremental render between
+    chunks (see render_video_aspects).
+    """
+    video_config = video_config if video_config is not None else load_video_config()
+    output_dir = Path(video_config.get('output_directory', 'output/'))
+    base_name = tts_result['base_filename'].replace('audio_', 'video_', 1)
+    aspects = get_output_aspects(video_config)
+    
+    if preview:
+        video_config = dict(video_config, encoder_preset='preview')
+        output_paths = {aspects[0]: str(Path("temp") / "previews" / f"{base_name}_preview.mp4")}
+    else:
+        # The first aspect ratio keeps the plain file name, others get a suffix
+        output_paths = {}
+        for number, aspect in enumerate(aspects):
+            suffix = "" if number == 0 else "_" + aspect.replace(':', 'x')
+            output_paths[aspect] = str(output_dir / f"{base_name}{suffix}.mp4")
+    
+    # Promoting a preview renders over exactly the footage the preview showed
+    previous = tts_result.get('preview')
+    if previous:
+        success, result = render_video_aspects(tts_result['files'], video_config, output_paths,
+                                               previous['background_path'], previous['background_start'],
+                                               should_yield=should_yield)
+    else:
+        # Pick up any new footage from the background list before choosing a clip
+        if not video_config.get('background'):
+            ensure_background_library(video_config, aspects[0])
+        
+        success, result = render_video_aspects(tts_result['files'], video_config, output_paths,
+                                               should_yield=should_yield)
+    
+    if success and not preview:
+        sync_captions_to_render(tts_result, video_config)
+    return success, result
+
+def sync_captions_to_render(tts_result, video_config):
+    """
+    Rewrite the caption sidecars on the timeline the render used
+    
+    Incremental renders start every segment on a whole frame, which shifts
+    the narration later than the unrounded timeline the captions were
+    first written from; without this they drift by up to a frame per segment.
+    """
+    frame_rate = get_timeline_frame_rate(video_config)
+    captions = tts_result.get('captions')
+    if not frame_rate or not captions:
+        return
+    
+    output_base = str(Path(next(iter(captions.values()))).with_suffix(''))
+    try:
+        with span('captions.export', 'render'):
+            timeline = build_timeline(tts_result['files'], frame_rate=frame_rate)
+            export_captions(tts_result['files'], output_base, formats=tuple(captions), timeline=timeline)
+    except Exception as e:
+        print(f"Warning: Could not align captions to the rendered video: {str(e)}")
+
+def show_preview_screen(preview_result):
+    """Show the rendered preview and ask whether to render the full video"""
+    clear_screen()
+    hide_cursor()
+    
+    width, height = get_terminal_size()
+    left_border, right_border = draw_border(width, height)
+    
+    # Colors
+    green = "\033[32m"
+    blue = "\033[34m"
+    cyan = "\033[96m"
+    yellow = "\033[93m"
+    reset = "\033[0m"
+    
+    preview_path = next(iter(preview_result['outputs'].values()))
+    resolution = next(iter(preview_result['resolutions'].values()))
+    
+    content_lines = [
+        "",
+        f"{yellow}PREVIEW READY{reset}",
+        "",
+        f"Preview: {green}{preview_path}{reset}",
+        f"Proxy: {cyan}{resolution} @ {preview_result['fps']} fps{reset} • Duration: {cyan}{preview_result['duration']:.1f}s{reset}",
+        "",
+        "Check pacing and card layout, then render the full video.",
+        "Cards, narration and background footage are reused.",
+        "",
+        f"{blue}Press Enter to render the full video, ESC to finish without it{reset}"
+    ]
+    
+    # Calculate positioning
+    content_height = len(content_lines)
+    available_lines = height - 2
+    start_line = max(0, (available_lines - content_height) // 2)
+    
+    lines_printed = 1
+    
+    # Fill empty lines before content
+    for i in range(start_line):
+        if lines_printed < height - 1:
+            print(left_border + " " * (width - 2) + right_border)
+            lines_printed += 1
+    
+    # Display content
+    for line in content_lines:
+        if lines_printed < height - 1:
+            centered_line = center_text(line, width)
+            print(left_border + centered_line + right_border)
+            lines_printed += 1
+    
+    # Fill remaining lines
+    while lines_printed < height - 1:
+        print(left_border + " " * (width - 2) + right_border)
+        lines_printed += 1
+    
+    draw_bottom_border(width)
+    
+    show_cursor()
+    while True:
+        key = read_key()
+        if key == KEY_ENTER:
+            return True
+        if key == KEY_ESC:
+            return False
+
 def show_tts_processing_screen(content_type, service):
     """Show enhanced TTS processing screen"""
     clear_screen()
@@ -1256,6 +1587,34 @@ def show_tts_success_screen(result_data):
         content_lines.append(f"{yellow}Warning: {result_data['failed_count']} segments failed to generate{reset}")
         content_lines.append("")
     
+    # Show rendered video
+    if result_data.get('video'):
+        for video_path in result_data.get('videos', [result_data['video']]):
+            content_lines.append(f"Video: {green}{video_path}{reset}")
+        content_lines.append("")
+    elif result_data.get('preview') and not result_data.get('video_error'):
+        preview_path = next(iter(result_data['preview']['outputs'].values()))
+        content_lines.append(f"Preview: {green}{preview_path}{reset}")
+        content_lines.append("")
+    elif result_data.get('video_error'):
+        content_lines.append(f"{yellow}Video render failed: {result_data['video_error'][:60]}{reset}")
+        content_lines.append("")
+    
+    # Show caption sidecar files
+    if result_data.get('captions'):
+        caption_formats = ", ".join(fmt.upper() for fmt in result_data['captions'])
+        content_lines.append(f"Captions: {cyan}{caption_formats}{reset}")
+        content_lines.append("")
+    
+    # Show the stage timings saved by the 'trace' setting
+    if result_data.get('trace'):
+        content_lines.append(f"Timings: {cyan}{Path(result_data['trace']['summary']).name}{reset}")
+        content_lines.append("")
+    
+    if result_data.get('memory'):
+        content_lines.append(f"Memory report: {cyan}{Path(result_data['memory']['summary']).name}{reset}")
+        content_lines.append("")
+    
     # Footer information
     content_lines.extend([
         f"Files saved to: {cyan}output/{reset}",
@@ -1309,7 +1668,7 @@ def show_tts_success_screen(result_data):
     draw_bottom_border(width)
     
     show_cursor()
-    msvcrt.getch()
+    read_key()
 
 def show_tts_error_screen(error_message):
     """Show enhanced TTS error screen with troubleshooting"""
@@ -1374,4 +1733,4 @@ def show_tts_error_screen(error_message):
     draw_bottom_border(width)
     
     show_cursor()
-    msvcrt.getch()
+    read_key()
@@ -1,5 +1,4 @@
 import sys
-import msvcrt
 from utils import *
 
 def show_credits_page():
@@ -70,4 +69,4 @@ def show_credits_page():
     show_cursor()
     
     # Wait for user input
-    msvcrt.getch()
+    read_key()
@@ -1,5 +1,4 @@
 import sys
-import msvcrt
 import toml
 from pathlib import Path
 from utils import *
@@ -336,27 +335,21 @@ def handle_text_input(prompt, current_value=""):
         print("│" + centered_input + "│", end="", flush=True)
         
         # Get key input
-        key = msvcrt.getch()
+        key = read_key()
         
-        if key == b'\r':  # Enter
+        if key == KEY_ENTER:  # Enter
             return user_input
-        elif key == b'\x1b':  # ESC
+        elif key == KEY_ESC:  # ESC
             return None
-        elif key == b'\x08':  # Backspace
+        elif key == KEY_BACKSPACE:  # Backspace
             if user_input:
                 user_input = user_input[:-1]
                 cursor_pos = len(user_input)
-        elif key == b'\xe0':  # Special keys (ignore arrow keys, etc.)
-            msvcrt.getch()  # Consume the second byte
-        else:
-            # Regular character input
-            try:
-                char = key.decode('utf-8')
-                if char.isprintable() and len(user_input) < 200:  # Reasonable limit
-                    user_input += char
-                    cursor_pos = len(user_input)
-            except UnicodeDecodeError:
-                pass  # Ignore invalid characters
+        elif len(key) == 1:
+            # Regular character input (arrow keys and other special keys are ignored)
+            if key.isprintable() and len(user_input) < 200:  # Reasonable limit
+                user_input += key
+                cursor_pos = len(user_input)
 
 def handle_choice_input(prompt, choices, current_value=""):
     """Handle choice selection with visual menu"""
@@ -412,17 +405,15 @@ def handle_choice_input(prompt, choices, current_value=""):
         print("│" + centered_instructions + "│", end="", flush=True)
         
         # Get keyboard input
-        key = msvcrt.getch()
+        key = read_key()
         
-        if key == b'\xe0':  # Special key prefix
-            key = msvcrt.getch()
-            if key == b'H':  # Up arrow
-                selected_option = (selected_option - 1) % len(choices)
-            elif key == b'P':  # Down arrow
-                selected_option = (selected_option + 1) % len(choices)
-        elif key == b'\r':  # Enter
+        if key == KEY_UP:  # Up arrow
+            selected_option = (selected_option - 1) % len(choices)
+        elif key == KEY_DOWN:  # Down arrow
+            selected_option = (selected_option + 1) % len(choices)
+        elif key == KEY_ENTER:  # Enter
             return choices[selected_option]
-        elif key == b'\x1b':  # ESC
+        elif key == KEY_ESC:  # ESC
             return None
 
 def handle_float_input(prompt, current_value, min_val, max_val, increment):
@@ -470,21 +461,19 @@ def handle_float_input(prompt, current_value, min_val, max_val, increment):
         print("│" + centered_controls + "│", end="", flush=True)
         
         # Get keyboard input
-        key = msvcrt.getch()
+        key = read_key()
         
-        if key == b'\xe0':  # Special key prefix
-            key = msvcrt.getch()
-            if key == b'H':  # Up arrow
-                new_value = current_float + increment
-                if new_value <= max_val:
-                    current_float = round(new_value, 2)
-            elif key == b'P':  # Down arrow
-                new_value = current_float - increment
-                if new_value >= min_val:
-                    current_float = round(new_value, 2)
-        elif key == b'\r':  # Enter
+        if key == KEY_UP:  # Up arrow
+            new_value = current_float + increment
+            if new_value <= max_val:
+                current_float = round(new_value, 2)
+        elif key == KEY_DOWN:  # Down arrow
+            new_value = current_float - increment
+            if new_value >= min_val:
+                current_float = round(new_value, 2)
+        elif key == KEY_ENTER:  # Enter
             return str(current_float)
-        elif key == b'\x1b':  # ESC
+        elif key == KEY_ESC:  # ESC
             return None
 
 def handle_variable_edit(section_name, variable_name, current_value):
@@ -546,6 +535,28 @@ def handle_variable_edit(section_name, variable_name, current_value):
         elif variable_name == "fps":
             choices = ["15", "30", "60"]
             new_value = handle_choice_input("Select FPS:", choices, current_value)
+        elif variable_name == "background":
+            new_value = handle_text_input("Enter background video path (empty for solid colour):", current_value)
+        elif variable_name == "background_list":
+            new_value = handle_text_input("Enter background list file (paths or URLs, one per line):", current_value)
+        elif variable_name == "render_workers":
+            choices = ["auto", "1", "2", "4", "8"]
+            new_value = handle_choice_input("Select render processes:", choices, current_value)
+        elif variable_name == "encoder_preset":
+            choices = ["standard", "shorts", "reels", "hevc", "draft"]
+            new_value = handle_choice_input("Select encoder preset:", choices, current_value)
+        elif variable_name == "aspect_ratios":
+            choices = ["16:9", "9:16", "1:1", "9:16,16:9", "9:16,1:1,16:9"]
+            new_value = handle_choice_input("Select output aspect ratios:", choices, current_value)
+        elif variable_name == "incremental":
+            choices = ["true", "false"]
+            new_value = handle_choice_input("Reuse unchanged segments between renders:", choices, current_value)
+        elif variable_name == "trace":
+            choices = ["false", "true"]
+            new_value = handle_choice_input("Save stage timings (trace) next to each video:", choices, current_value)
+        elif variable_name == "memory_profile":
+            choices = ["false", "true"]
+            new_value = handle_choice_input("Save a memory report next to each video (slower):", choices, current_value)
         else:
             new_value = handle_text_input(f"Enter new value for {variable_name}:", current_value)
     
@@ -655,7 +666,7 @@ def handle_variable_edit(section_name, variable_name, current_value):
             draw_bottom_border(width)
             
             show_cursor()
-            msvcrt.getch()
+            read_key()
     
     show_cursor()
 
@@ -675,17 +686,15 @@ def show_settings_page():
     
     while True:
         # Get keyboard input
-        key = msvcrt.getch()
+        key = read_key()
         
-        if key == b'\xe0':  # Special key prefix for arrow keys
-            key = msvcrt.getch()
-            if key == b'H':  # Up arrow
-                selected_option = (selected_option - 1) % max_options
-                update_main_menu_selection(selected_option, main_sections, menu_start_row, width)
-            elif key == b'P':  # Down arrow
-                selected_option = (selected_option + 1) % max_options
-                update_main_menu_selection(selected_option, main_sections, menu_start_row, width)
-        elif key == b'\r':  # Enter key
+        if key == KEY_UP:  # Up arrow
+            selected_option = (selected_option - 1) % max_options
+            update_main_menu_selection(selected_option, main_sections, menu_start_row, width)
+        elif key == KEY_DOWN:  # Down arrow
+            selected_option = (selected_option + 1) % max_options
+            update_main_menu_selection(selected_option, main_sections, menu_start_row, width)
+        elif key == KEY_ENTER:  # Enter key
             # Enter selected section
             section_name = main_sections[selected_option]
             section_values = config.get(section_name, {})
@@ -693,7 +702,7 @@ def show_settings_page():
             
             # Redraw main interface when returning from section
             menu_start_row = display_main_settings_interface(selected_option, main_sections)
-        elif key == b'\x1b':  # ESC key
+        elif key == KEY_ESC:  # ESC key
             return  # Return to main menu
 
 def show_section_page(section_name, section_values, full_config):
@@ -712,7 +721,7 @@ def show_section_page(section_name, section_values, full_config):
             if section_name == "reddit":
                 variables = ["client_id", "client_secret", "username", "password", "user_agent"]
             elif section_name == "video":
-                variables = ["output_directory", "resolution", "fps"]
+                variables = ["output_directory", "resolution", "fps", "background", "background_list", "render_workers", "encoder_preset", "aspect_ratios", "incremental", "trace", "memory_profile"]
             elif section_name == "text_to_speech":
                 variables = ["service", "voice", "speed", "volume"]
         
@@ -730,17 +739,15 @@ def show_section_page(section_name, section_values, full_config):
     
     while True:
         # Get keyboard input
-        key = msvcrt.getch()
+        key = read_key()
         
-        if key == b'\xe0':  # Special key prefix for arrow keys
-            key = msvcrt.getch()
-            if key == b'H':  # Up arrow
-                selected_option = (selected_option - 1) % max_options
-                update_section_menu_selection(selected_option, variables, section_values, menu_start_row, width)
-            elif key == b'P':  # Down arrow
-                selected_option = (selected_option + 1) % max_options
-                update_section_menu_selection(selected_option, variables, section_values, menu_start_row, width)
-        elif key == b'\r':  # Enter key
+        if key == KEY_UP:  # Up arrow
+            selected_option = (selected_option - 1) % max_options
+            update_section_menu_selection(selected_option, variables, section_values, menu_start_row, width)
+        elif key == KEY_DOWN:  # Down arrow
+            selected_option = (selected_option + 1) % max_options
+            update_section_menu_selection(selected_option, variables, section_values, menu_start_row, width)
+        elif key == KEY_ENTER:  # Enter key
             if selected_option == len(variables):  # Back option selected
                 return  # Return to main settings
             else:
@@ -759,5 +766,5 @@ def show_section_page(section_name, section_values, full_config):
                 
                 # Redraw section interface with updated values
                 menu_start_row = display_section_settings_interface(section_name, selected_option, variables, section_values)
-        elif key == b'\x1b':  # ESC key
+        elif key == KEY_ESC:  # ESC key
             return  # Return to main settings
\ No newline at end of file
@@ -0,0 +1,41 @@
+# Pipeline Module
+# Contains job orchestration and build caching functions
+
+from .build_graph import (
+    BuildGraph,
+    hash_inputs,
+    hash_file
+)
+
+from .job_store import (
+    JobStore,
+    JOB_STAGES,
+    STAGE_GROUPS
+)
+
+from .worker import Worker
+from .executor import PipelineExecutor
+from .scheduler import Scheduler
+
+from .metrics import (
+    MetricsRegistry,
+    MetricsExporter,
+    REGISTRY
+)
+
+from .memory import (
+    MemoryProfiler,
+    profiling,
+    memory_stage,
+    is_memory_profiling_enabled
+)
+
+from tracing import (
+    Tracer,
+    span,
+    traced,
+    tracing,
+    start_tracing,
+    get_tracer,
+    is_tracing_enabled
+)
@@ -0,0 +1,268 @@
+import os
+import json
+import time
+import socket
+import hashlib
+import threading
+import contextlib
+from pathlib import Path
+from typing import Optional, Dict, Tuple, Callable, Iterable
+
+from .metrics import CACHE_LOOKUPS
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+
+BUILD_DIRECTORY = Path("temp") / "build"
+
+# Bump when artifact layouts change so every cached artifact is rebuilt
+BUILD_GRAPH_VERSION = 1
+
+# Artifacts not built or reused for this long are removed
+BUILD_MAX_AGE = 14 * 24 * 3600
+
+# Seconds between prunes of the store, which scan every artifact directory
+BUILD_PRUNE_INTERVAL = 3600
+
+
+def hash_inputs(kind: str, inputs: Dict[str, any], dependencies: Iterable[str] = ()) -> str:
+    """Hash an artifact's kind, its own inputs and the keys of the artifacts it was built from"""
+    identifier = json.dumps({
+        'version': BUILD_GRAPH_VERSION,
+        'kind': kind,
+        'inputs': inputs,
+        'dependencies': list(dependencies)
+    }, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.md5(identifier.encode('utf-8')).hexdigest()
+
+
+def hash_file(path: str) -> Optional[str]:
+    """Hash a file's contents, or None if it cannot be read"""
+    digest = hashlib.md5()
+    try:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def get_writer_id() -> str:
+    """Identify the current host, process and thread, keeping concurrent workers' temp files apart"""
+    return f"{socket.gethostname()}-{os.getpid()}-{threading.get_ident()}"
+
+
+@contextlib.contextmanager
+def file_lock(path: Path):
+    """Hold an exclusive lock on a lock file, shared by every process using the same path"""
+    with open(path, 'a+') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class BuildGraph:
+    """
+    Content-addressed store for intermediate job artifacts
+
+    Every artifact is keyed by a hash of its own inputs plus the keys of the
+    artifacts it depends on (cleaned text -> TTS audio -> card image ->
+    video chunk -> final mux), so changing one input only invalidates the
+    artifacts downstream of it. Artifacts live under temp/build/<kind>/ and
+    a manifest records what each one was built from and when it was last
+    used; artifacts unused for BUILD_MAX_AGE are pruned.
+    """
+
+    def __init__(self, directory: Path = BUILD_DIRECTORY, max_age: float = BUILD_MAX_AGE):
+        self.directory = Path(directory)
+        self.manifest_path = self.directory / "manifest.json"
+        self.lock_path = self.directory / "manifest.lock"
+        self.max_age = max_age
+        self.manifest = self._load_manifest()['artifacts']
+        # Entries this instance built or reused; only these are merged back on save
+        self.touched = set()
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    def _load_manifest(self) -> Dict[str, any]:
+        """Load the manifest file, starting fresh if it is missing or stale"""
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get('version') == BUILD_GRAPH_VERSION:
+                return {'artifacts': manifest.get('artifacts', {}), 'pruned_at': manifest.get('pruned_at', 0)}
+        except (OSError, ValueError):
+            pass
+        return {'artifacts': {}, 'pruned_at': 0}
+
+    def save(self) -> bool:
+        """
+        Write the manifest atomically, keeping entries other processes saved meanwhile
+
+        The read-merge-write runs under a lock file, so concurrent workers
+        cannot drop each other's entries. At most every BUILD_PRUNE_INTERVAL
+        the save also prunes artifacts unused for max_age.
+        """
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with file_lock(self.lock_path):
+                manifest = self._load_manifest()
+                artifacts = manifest['artifacts']
+                for key in self.touched:
+                    entry = self.manifest[key]
+                    saved = artifacts.get(key)
+                    if saved and saved.get('used_at', 0) > entry.get('used_at', 0):
+                        entry = dict(entry, used_at=saved['used_at'])
+                    artifacts[key] = entry
+
+                if time.time() - manifest['pruned_at'] >= BUILD_PRUNE_INTERVAL:
+                    self._prune(artifacts)
+                    manifest['pruned_at'] = time.time()
+
+                temp_path = self.manifest_path.with_name(f"manifest.{get_writer_id()}.tmp")
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump({'version': BUILD_GRAPH_VERSION, 'pruned_at': manifest['pruned_at'],
+                               'artifacts': artifacts}, f, indent=2)
+                os.replace(temp_path, self.manifest_path)
+            self.manifest = artifacts
+            self.touched.clear()
+            return True
+        except OSError as e:
+            print(f"Warning: Could not save build manifest: {str(e)}")
+            return False
+
+    def _prune(self, artifacts: Dict[str, Dict[str, any]]) -> int:
+        """
+        Remove artifacts unused for max_age, and files the manifest no longer knows
+
+        File mtimes count as use as well, since record() touches reused
+        artifacts before their process saves its manifest entries.
+
+        Returns:
+            Number of files removed
+        """
+        cutoff = time.time() - self.max_age
+        removed = 0
+
+        for key, entry in list(artifacts.items()):
+            path = Path(entry['path'])
+            try:
+                modified = path.stat().st_mtime
+            except OSError:
+                # The file is gone; its entry is of no use
+                del artifacts[key]
+                continue
+            if max(entry.get('used_at', entry.get('built_at', 0)), modified) < cutoff:
+                try:
+                    path.unlink()
+                    removed += 1
+                except OSError:
+                    continue
+                del artifacts[key]
+
+        # Leftovers from interrupted builds and artifacts recorded by no manifest
+        known = {os.path.abspath(entry['path']) for entry in artifacts.values()}
+        for kind_directory in self.directory.iterdir():
+            if not kind_directory.is_dir():
+                continue
+            for path in kind_directory.iterdir():
+                try:
+                    if os.path.abspath(path) not in known and path.stat().st_mtime < cutoff:
+                        path.unlink()
+                        removed += 1
+                except OSError:
+                    pass
+        return removed
+
+    def key(self, kind: str, inputs: Dict[str, any], dependencies: Iterable[str] = ()) -> str:
+        """Get the content key of an artifact"""
+        return hash_inputs(kind, inputs, dependencies)
+
+    def path(self, kind: str, key: str, extension: str = '') -> Path:
+        """Get where an artifact with the given key is stored"""
+        return self.directory / kind / f"{key}{extension}"
+
+    def is_built(self, kind: str, key: str, extension: str = '') -> bool:
+        """Check whether an artifact exists in the store"""
+        return self.path(kind, key, extension).exists()
+
+    def record(self, kind: str, key: str, path: str, dependencies: Iterable[str] = (), built: bool = True):
+        """Record an artifact in the manifest and count it as built or reused"""
+        counts = self.stats.setdefault(kind, {'built': 0, 'reused': 0})
+        counts['built' if built else 'reused'] += 1
+        CACHE_LOOKUPS.inc(kind, 'miss' if built else 'hit')
+        now = time.time()
+        if built or key not in self.manifest:
+            self.manifest[key] = {
+                'kind': kind,
+                'path': str(path),
+                'dependencies': list(dependencies),
+                'built_at': now,
+                'used_at': now
+            }
+        else:
+            self.manifest[key]['used_at'] = now
+            # Other processes may prune before this one saves, so mark the file as in use right away
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+        self.touched.add(key)
+
+    def build(self, kind: str, inputs: Dict[str, any], builder: Callable[[str], bool],
+              extension: str = '', dependencies: Iterable[str] = ()) -> Optional[Tuple[str, str]]:
+        """
+        Get an artifact from the store, building it only if its key is new
+
+        Args:
+            kind: Artifact kind, also the subdirectory it is stored in
+            inputs: JSON-serialisable inputs the artifact is built from
+            builder: Called with the output path; returns True on success
+            extension: File extension of the artifact
+            dependencies: Keys of the artifacts this one is built from
+
+        Returns:
+            Tuple of (key, artifact path), or None if building failed
+        """
+        dependencies = list(dependencies)
+        key = self.key(kind, inputs, dependencies)
+        path = self.path(kind, key, extension)
+
+        if path.exists():
+            self.record(kind, key, str(path), dependencies, built=False)
+            return key, str(path)
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f"{key}.{get_writer_id()}.part{extension}")
+        try:
+            success = builder(str(temp_path))
+        except Exception as e:
+            print(f"Error building {kind} artifact: {str(e)}")
+            success = False
+
+        if not success or not temp_path.exists():
+            if temp_path.exists():
+                temp_path.unlink()
+            return None
+
+        os.replace(temp_path, path)
+        self.record(kind, key, str(path), dependencies, built=True)
+        return key, str(path)
+
+    def summary(self) -> Dict[str, Dict[str, int]]:
+        """Get how many artifacts of each kind were built and reused"""
+        return {kind: dict(counts) for kind, counts in self.stats.items()}
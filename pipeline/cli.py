@@ -0,0 +1,183 @@
+import re
+import sys
+import json
+import time
+import argparse
+import contextlib
+from datetime import datetime
+from typing import Optional, Dict, List
+
+from .job_store import JobStore, JOB_DATABASE
+from .runner import VIDEO_TYPES, run_job, get_job_result
+from .executor import PipelineExecutor, DEFAULT_QUEUE_SIZE
+from .worker import parse_limits
+from video.presets import ENCODER_PRESETS
+
+
+# Exit codes reported to job runners
+EXIT_OK = 0
+EXIT_PARTIAL = 1
+EXIT_USAGE = 2
+EXIT_FAILED = 3
+
+VIDEO_TYPE_ALIASES = {
+    'post': 'post_description',
+    'top': 'top_comment',
+    'top10': 'top_10_comments'
+}
+
+
+def parse_video_type(value: str) -> str:
+    """Parse a video type name or alias for argparse"""
+    value = value.strip().lower().replace('-', '_')
+    value = VIDEO_TYPE_ALIASES.get(value, value)
+    if value not in VIDEO_TYPES:
+        choices = ', '.join(list(VIDEO_TYPES) + list(VIDEO_TYPE_ALIASES))
+        raise argparse.ArgumentTypeError(f"unknown video type (choose from {choices})")
+    return value
+
+
+def parse_deadline(value: str) -> float:
+    """Parse a deadline for argparse: a relative time such as 90m, 6h or 2d, or an ISO date and time"""
+    match = re.fullmatch(r'\+?(\d+(?:\.\d+)?)([smhd])', value.strip().lower())
+    if match:
+        return time.time() + float(match.group(1)) * {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}[match.group(2)]
+    try:
+        return datetime.fromisoformat(value.strip()).timestamp()
+    except ValueError:
+        raise argparse.ArgumentTypeError("invalid deadline (use e.g. 90m, 6h, 2d or 2025-01-31T18:00)")
+
+
+def read_url_file(path: str) -> List[str]:
+    """Read Reddit URLs from a file (one per line, # for comments, - for stdin)"""
+    handle = sys.stdin if path == '-' else open(path, 'r', encoding='utf-8')
+    try:
+        return [line.strip() for line in handle if line.strip() and not line.strip().startswith('#')]
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command line parser"""
+    parser = argparse.ArgumentParser(
+        prog='python -m pipeline',
+        description="Create Reddit videos without the interactive menu. "
+                    "Prints one JSON result per URL to stdout."
+    )
+    parser.add_argument('urls', nargs='*', help="Reddit post URLs")
+    parser.add_argument('-f', '--url-file', help="File with one Reddit post URL per line ('-' for stdin)")
+    parser.add_argument('-t', '--type', dest='video_type', type=parse_video_type, default='post_description',
+                        help="post_description (post), top_comment (top) or top_10_comments (top10)")
+    parser.add_argument('--no-video', action='store_true', help="Stop after generating audio and captions")
+    parser.add_argument('--preset', type=str.lower, choices=sorted(ENCODER_PRESETS),
+                        help="Override the encoder_preset setting for this run")
+    parser.add_argument('--aspects', help="Override the aspect_ratios setting, e.g. 9:16,16:9")
+    parser.add_argument('--trace', action='store_true',
+                        help="Save a Chrome trace and a timing summary next to each video")
+    parser.add_argument('--memory-profile', action='store_true',
+                        help="Save a per-stage memory report next to each video (slows jobs down)")
+    parser.add_argument('--priority', type=int, default=0,
+                        help="Scheduling priority of new jobs; higher runs first (default 0)")
+    parser.add_argument('--deadline', type=parse_deadline,
+                        help="When new jobs must be done, e.g. 6h or 2025-01-31T18:00")
+    parser.add_argument('--resume', action='store_true',
+                        help="Also resume every unfinished job in the job store")
+    parser.add_argument('--fresh', action='store_true',
+                        help="Start new jobs instead of resuming unfinished ones for the same URL")
+    parser.add_argument('--enqueue', action='store_true',
+                        help="Only add the jobs to the job store for workers (python -m pipeline.worker) to run")
+    parser.add_argument('--database', default=str(JOB_DATABASE), help="Job database file")
+    parser.add_argument('--shared', action='store_true',
+                        help="The database is on a network filesystem used by several hosts")
+    parser.add_argument('--sequential', action='store_true',
+                        help="Run one job at a time instead of overlapping the stages of several jobs")
+    parser.add_argument('--limit', action='append', default=[], metavar='GROUP=COUNT',
+                        help="Concurrent jobs per stage group (fetch, tts, render); repeatable")
+    parser.add_argument('--queue-size', type=int, default=DEFAULT_QUEUE_SIZE,
+                        help="Jobs that may wait between two stages")
+    parser.add_argument('--pretty', action='store_true', help="Indent the JSON output")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the batch CLI, returning the process exit code"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    urls = list(args.urls)
+    if args.url_file:
+        try:
+            urls += read_url_file(args.url_file)
+        except OSError as e:
+            parser.error(f"cannot read URL file: {str(e)}")
+    if not urls and not args.resume:
+        parser.error("no URLs given")
+    try:
+        limits = parse_limits(args.limit)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+
+    video_overrides = {}
+    if args.preset:
+        video_overrides['encoder_preset'] = args.preset
+    if args.aspects:
+        video_overrides['aspect_ratios'] = args.aspects
+    if args.trace:
+        video_overrides['trace'] = 'true'
+    if args.memory_profile:
+        video_overrides['memory_profile'] = 'true'
+    options = {'render': not args.no_video, 'video_overrides': video_overrides}
+
+    store = JobStore(args.database, shared=args.shared)
+    try:
+        job_ids = []
+        if args.resume:
+            job_ids += [job['id'] for job in store.list_jobs(('queued', 'running', 'failed'))]
+
+        # A URL with an unfinished job resumes it rather than starting over
+        for url in urls:
+            job = None if args.fresh else store.find_job(url, args.video_type)
+            if job is None:
+                job_ids.append(store.create_job(url, args.video_type, options,
+                                                priority=args.priority, deadline=args.deadline))
+            elif job['id'] not in job_ids:
+                if args.priority or args.deadline is not None:
+                    store.update_job(job['id'], priority=args.priority, deadline=args.deadline)
+                job_ids.append(job['id'])
+
+        stdout = sys.stdout
+        results = []
+
+        def report(result: Dict[str, any]):
+            results.append(result)
+            print(json.dumps(result, indent=2 if args.pretty else None, ensure_ascii=False, default=str),
+                  file=stdout, flush=True)
+
+        if args.enqueue:
+            for job_id in job_ids:
+                report(get_job_result(store.get_job(job_id)))
+        # Pipeline functions report progress with print; keep stdout for the JSON results
+        elif args.sequential:
+            with contextlib.redirect_stdout(sys.stderr):
+                for job_id in job_ids:
+                    try:
+                        result = run_job(store, job_id)
+                    except Exception as e:
+                        store.fail_job(job_id, str(e))
+                        result = get_job_result(store.get_job(job_id))
+                    report(result)
+        else:
+            executor = PipelineExecutor(
+                lambda: JobStore(args.database, shared=args.shared),
+                limits=limits, queue_size=args.queue_size, on_result=report
+            )
+            with contextlib.redirect_stdout(sys.stderr):
+                executor.run(job_ids)
+    finally:
+        store.close()
+
+    failures = sum(1 for result in results if result['status'] == 'error')
+    if failures == 0:
+        return EXIT_OK
+    return EXIT_FAILED if failures == len(results) else EXIT_PARTIAL
@@ -0,0 +1,146 @@
+import queue
+import itertools
+import threading
+from typing import Optional, Dict, List, Callable, Tuple
+
+from .job_store import JobStore, STAGE_GROUPS
+from .runner import run_job, get_job_result
+from .worker import DEFAULT_STAGE_LIMITS
+from .scheduler import Scheduler
+from .metrics import QUEUE_DEPTH, STAGE_FAILURES
+
+
+# Jobs that may wait between two stages; bounds how far fetching and TTS run ahead of rendering
+DEFAULT_QUEUE_SIZE = 2
+
+# Marks the end of a stage's input queue
+_STOP = object()
+
+
+class PipelineExecutor:
+    """
+    Runs a batch of stored jobs with their stage groups overlapped
+
+    Every stage group (fetch, tts, render) has its own threads, connected
+    by bounded queues, so while job N renders, job N+1 is synthesised and
+    job N+2 fetched. Throughput is then set by the slowest stage instead of
+    the sum of all of them, and the bounded queues stop the fast stages
+    from running far ahead of the slow ones. Each queue hands out the job
+    pipeline.scheduler ranks first. Progress is committed to the
+    job store after every stage exactly as with run_job, so an interrupted
+    batch resumes where it stopped.
+    """
+
+    def __init__(self, open_store: Callable[[], JobStore], limits: Optional[Dict[str, int]] = None,
+                 queue_size: int = DEFAULT_QUEUE_SIZE,
+                 on_result: Optional[Callable[[Dict[str, any]], None]] = None):
+        """
+        Args:
+            open_store: Opens a job store connection (one is opened per thread)
+            limits: Threads per stage group (optional, defaults to the worker limits)
+            queue_size: Jobs that may wait in front of each stage after the first
+            on_result: Called with each job's result as soon as the job finishes
+        """
+        self.open_store = open_store
+        self.groups = list(STAGE_GROUPS)
+        limits = dict(DEFAULT_STAGE_LIMITS, **(limits or {}))
+        self.limits = {group: max(1, limits[group]) for group in self.groups}
+        self.queue_size = max(1, queue_size)
+        self.on_result = on_result
+
+        self.lock = threading.Lock()
+        self.results: List[Dict[str, any]] = []
+        self.scheduler: Optional[Scheduler] = None
+        self.sequence = itertools.count()
+
+    def _queue_item(self, store: JobStore, job_id: str) -> Tuple[int, Tuple, int, str]:
+        """Build a queue entry that sorts a job by the scheduler's ranking"""
+        info = store.get_schedule_info(job_id)
+        # Unknown jobs go first; run_job reports them as errors straight away
+        key = self.scheduler.sort_key(info) if info else ()
+        return 0, key, next(self.sequence), job_id
+
+    def _stop_item(self) -> Tuple[int, Tuple, int, object]:
+        """Build a queue entry that closes a stage for one of its threads"""
+        # Jobs lead with 0, so the marker sorts after every job whatever its ranking
+        return 1, (), next(self.sequence), _STOP
+
+    def run(self, job_ids: List[str]) -> List[Dict[str, any]]:
+        """
+        Run jobs through every stage group
+
+        Args:
+            job_ids: Ids of the jobs to run
+
+        Returns:
+            List of result dicts from get_job_result, in the order the jobs finished
+        """
+        self.results = []
+        # The first queue is filled up front; the others apply back-pressure
+        queues = [queue.PriorityQueue()] + [queue.PriorityQueue(maxsize=self.queue_size) for _ in self.groups[1:]]
+        store = self.open_store()
+        try:
+            self.scheduler = Scheduler(store)
+            for job_id in job_ids:
+                queues[0].put(self._queue_item(store, job_id))
+            QUEUE_DEPTH.set(self.groups[0], value=len(job_ids))
+        finally:
+            store.close()
+        for _ in range(self.limits[self.groups[0]]):
+            queues[0].put(self._stop_item())
+
+        running = {group: self.limits[group] for group in self.groups}
+        threads = []
+        for index, group in enumerate(self.groups):
+            for number in range(self.limits[group]):
+                thread = threading.Thread(
+                    target=self._run_stage, args=(index, queues, running),
+                    name=f"{group}-stage-{number}", daemon=True
+                )
+                thread.start()
+                threads.append(thread)
+
+        for thread in threads:
+            thread.join()
+        return self.results
+
+    def _run_stage(self, index: int, queues: List[queue.Queue], running: Dict[str, int]):
+        """Run one stage group for jobs from its queue until the queue is closed"""
+        group = self.groups[index]
+        store = self.open_store()
+        try:
+            while True:
+                job_id = queues[index].get()[-1]
+                if job_id is _STOP:
+                    break
+                QUEUE_DEPTH.set(group, value=queues[index].qsize())
+
+                try:
+                    result = run_job(store, job_id, groups=(group,))
+                except Exception as e:
+                    STAGE_FAILURES.inc(group)
+                    store.fail_job(job_id, str(e))
+                    result = get_job_result(store.get_job(job_id))
+
+                # Finished or failed jobs leave the pipeline; others move on to the next stage
+                if result['status'] == 'pending' and index + 1 < len(self.groups):
+                    queues[index + 1].put(self._queue_item(store, job_id))
+                    QUEUE_DEPTH.set(self.groups[index + 1], value=queues[index + 1].qsize())
+                else:
+                    self._finish(result)
+        finally:
+            store.close()
+            with self.lock:
+                running[group] -= 1
+                last = running[group] == 0
+            # The last thread of a stage closes the next stage's queue
+            if last and index + 1 < len(self.groups):
+                for _ in range(self.limits[self.groups[index + 1]]):
+                    queues[index + 1].put(self._stop_item())
+
+    def _finish(self, result: Dict[str, any]):
+        """Record a finished job's result"""
+        with self.lock:
+            self.results.append(result)
+            if self.on_result:
+                self.on_result(result)
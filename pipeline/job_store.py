@@ -0,0 +1,406 @@
+import json
+import time
+import uuid
+import sqlite3
+from pathlib import Path
+from typing import Optional, Dict, List, Iterable, Callable
+
+
+JOB_DATABASE = Path("temp") / "jobs.sqlite3"
+
+# Bump when the schema changes and add the upgrade to MIGRATIONS; JobStore migrates older databases on open
+JOB_SCHEMA_VERSION = 3
+
+# Stages a job passes through, in order; a job records the last one it completed
+JOB_STAGES = ('queued', 'fetched', 'content_selected', 'segments_cleaned', 'audio_done', 'rendered')
+
+JOB_STATUSES = ('queued', 'running', 'done', 'failed')
+
+# Stages grouped by the resource they mostly wait on, so workers can limit
+# network-bound fetching, TTS and CPU-bound rendering separately
+STAGE_GROUPS = {
+    'fetch': ('fetched', 'content_selected', 'segments_cleaned'),
+    'tts': ('audio_done',),
+    'render': ('rendered',)
+}
+
+# Job columns holding JSON documents
+JSON_COLUMNS = ('options', 'post_data', 'content', 'tts_result', 'render_result')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    video_type TEXT NOT NULL,
+    status TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    options TEXT,
+    post_data TEXT,
+    content TEXT,
+    tts_result TEXT,
+    render_result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);
+CREATE TABLE IF NOT EXISTS segments (
+    job_id TEXT NOT NULL REFERENCES jobs (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    suffix TEXT NOT NULL,
+    segment TEXT NOT NULL,
+    status TEXT NOT NULL,
+    file_info TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (job_id, suffix)
+);
+"""
+
+# Statements upgrading a database to each schema version from the one before
+MIGRATIONS = {
+    # Leases let several workers share one database without a central service
+    2: (
+        "ALTER TABLE jobs ADD COLUMN lease_owner TEXT",
+        "ALTER TABLE jobs ADD COLUMN lease_expires REAL",
+        "ALTER TABLE jobs ADD COLUMN failures INTEGER NOT NULL DEFAULT 0",
+        "CREATE INDEX IF NOT EXISTS jobs_stage ON jobs (stage, status, created_at)"
+    ),
+    # Scheduling inputs: priorities, deadlines and how long past stages took
+    3: (
+        "ALTER TABLE jobs ADD COLUMN priority INTEGER NOT NULL DEFAULT 0",
+        "ALTER TABLE jobs ADD COLUMN deadline REAL",
+        "CREATE TABLE IF NOT EXISTS stage_timings ("
+        "job_id TEXT NOT NULL, stage_group TEXT NOT NULL, seconds REAL NOT NULL, "
+        "units REAL NOT NULL, finished_at REAL NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS stage_timings_group ON stage_timings (stage_group, finished_at)"
+    )
+}
+
+# Columns the scheduler ranks jobs by, plus the size of their narration text
+SCHEDULE_QUERY = (
+    "SELECT id, url, stage, status, priority, deadline, created_at, tts_result, "
+    "(SELECT SUM(LENGTH(json_extract(segment, '$.text'))) FROM segments WHERE job_id = jobs.id) AS characters "
+    "FROM jobs"
+)
+
+
+def stage_index(stage: str) -> int:
+    """Get the position of a stage in JOB_STAGES (unknown stages count as queued)"""
+    return JOB_STAGES.index(stage) if stage in JOB_STAGES else 0
+
+
+def get_stage_group(stage: str) -> Optional[str]:
+    """Get the STAGE_GROUPS entry a stage belongs to"""
+    for group, stages in STAGE_GROUPS.items():
+        if stage in stages:
+            return group
+    return None
+
+
+def get_next_group(stage: str) -> Optional[str]:
+    """Get the stage group a job at the given stage runs next (None once every stage is done)"""
+    index = stage_index(stage) + 1
+    return get_stage_group(JOB_STAGES[index]) if index < len(JOB_STAGES) else None
+
+
+def get_group_start_stages(group: str) -> List[str]:
+    """Get the stages a job has completed when its next stage is in the given group"""
+    return [JOB_STAGES[stage_index(stage) - 1] for stage in STAGE_GROUPS.get(group, ())]
+
+
+class JobStore:
+    """
+    Durable store of jobs and their per-segment progress in SQLite
+
+    Every stage a job completes is committed before the next one starts,
+    together with what that stage produced (post data, selected content,
+    cleaned segments, audio file info, render result), so a job can be
+    resumed from its last completed stage and segment after a crash or a
+    failed TTS call.
+    """
+
+    def __init__(self, path: Path = JOB_DATABASE, shared: bool = False):
+        """
+        Open (and create or migrate) a job database
+
+        Args:
+            path: Database file
+            shared: The file is on a network filesystem shared by several
+                hosts; WAL needs shared memory that only works on one host,
+                so a rollback journal is used instead
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit; multi-statement updates use explicit transactions
+        self.connection = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute(f"PRAGMA journal_mode={'DELETE' if shared else 'WAL'}")
+        self.connection.execute("PRAGMA foreign_keys=ON")
+        self._migrate()
+
+    def _migrate(self):
+        """Create or upgrade the schema"""
+        if self.connection.execute("PRAGMA user_version").fetchone()[0] >= JOB_SCHEMA_VERSION:
+            return
+
+        # Re-read the version under the write lock in case another worker migrated first
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+            if version < 1:
+                for statement in SCHEMA.split(';'):
+                    if statement.strip():
+                        self.connection.execute(statement)
+                version = 1
+            for target in range(version + 1, JOB_SCHEMA_VERSION + 1):
+                for statement in MIGRATIONS[target]:
+                    self.connection.execute(statement)
+            self.connection.execute(f"PRAGMA user_version={JOB_SCHEMA_VERSION}")
+            self.connection.execute("COMMIT")
+        except sqlite3.Error:
+            self.connection.execute("ROLLBACK")
+            raise
+
+    def close(self):
+        """Close the database connection"""
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _decode_job(self, row: Optional[sqlite3.Row]) -> Optional[Dict[str, any]]:
+        """Turn a jobs row into a dict with its JSON columns decoded"""
+        if row is None:
+            return None
+        job = dict(row)
+        for column in JSON_COLUMNS:
+            if job.get(column) is not None:
+                job[column] = json.loads(job[column])
+        return job
+
+    def create_job(self, url: str, video_type: str, options: Optional[Dict[str, any]] = None,
+                   priority: int = 0, deadline: Optional[float] = None) -> str:
+        """Add a queued job and return its id (higher priorities run first; deadline is a Unix time)"""
+        job_id = uuid.uuid4().hex[:12]
+        now = time.time()
+        self.connection.execute(
+            "INSERT INTO jobs (id, url, video_type, status, stage, options, priority, deadline, created_at, updated_at) "
+            "VALUES (?, ?, ?, 'queued', 'queued', ?, ?, ?, ?, ?)",
+            (job_id, url, video_type, json.dumps(options or {}), priority, deadline, now, now)
+        )
+        return job_id
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, any]]:
+        """Get a job by id"""
+        row = self.connection.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._decode_job(row)
+
+    def find_job(self, url: str, video_type: str, unfinished_only: bool = True) -> Optional[Dict[str, any]]:
+        """Get the newest job for a URL and video type, by default only one that has not finished"""
+        query = "SELECT * FROM jobs WHERE url = ? AND video_type = ?"
+        if unfinished_only:
+            query += " AND status != 'done'"
+        row = self.connection.execute(query + " ORDER BY created_at DESC LIMIT 1", (url, video_type)).fetchone()
+        return self._decode_job(row)
+
+    def list_jobs(self, statuses: Optional[Iterable[str]] = None) -> List[Dict[str, any]]:
+        """List jobs oldest first, optionally only those with the given statuses"""
+        if statuses:
+            statuses = list(statuses)
+            placeholders = ', '.join('?' for _ in statuses)
+            rows = self.connection.execute(
+                f"SELECT * FROM jobs WHERE status IN ({placeholders}) ORDER BY created_at", statuses
+            ).fetchall()
+        else:
+            rows = self.connection.execute("SELECT * FROM jobs ORDER BY created_at").fetchall()
+        return [self._decode_job(row) for row in rows]
+
+    def update_job(self, job_id: str, **fields):
+        """Update job columns; dict and list values are stored as JSON"""
+        if not fields:
+            return
+        fields['updated_at'] = time.time()
+        for column in JSON_COLUMNS:
+            if column in fields and fields[column] is not None:
+                fields[column] = json.dumps(fields[column], ensure_ascii=False, default=str)
+
+        assignments = ', '.join(f"{column} = ?" for column in fields)
+        self.connection.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def complete_stage(self, job_id: str, stage: str, **fields):
+        """Record that a job finished a stage, along with what the stage produced"""
+        self.update_job(job_id, stage=stage, error=None, **fields)
+
+    def fail_job(self, job_id: str, error: str):
+        """Mark a job as failed; it keeps its stage so a retry resumes from there"""
+        self.connection.execute(
+            "UPDATE jobs SET status = 'failed', error = ?, failures = failures + 1, updated_at = ? WHERE id = ?",
+            (error, time.time(), job_id)
+        )
+
+    def _get_schedule_info(self, where: str, params: Iterable) -> List[Dict[str, any]]:
+        """Get the scheduling fields of the jobs matching a condition"""
+        rows = self.connection.execute(f"{SCHEDULE_QUERY} WHERE {where}", tuple(params)).fetchall()
+        jobs = []
+        for row in rows:
+            job = dict(row)
+            # Once audio exists its measured length sizes the render
+            tts_result = json.loads(job.pop('tts_result')) if job['tts_result'] else None
+            job['narration_seconds'] = sum(file_info.get('duration') or 0 for file_info in tts_result['files']) \
+                if tts_result else None
+            jobs.append(job)
+        return jobs
+
+    def get_schedule_info(self, job_id: str) -> Optional[Dict[str, any]]:
+        """Get the fields the scheduler ranks a job by"""
+        jobs = self._get_schedule_info("id = ?", (job_id,))
+        return jobs[0] if jobs else None
+
+    def list_claimable(self, group: str, max_failures: int = 0,
+                       retry_delay: float = 60.0) -> List[Dict[str, any]]:
+        """
+        List the jobs a worker could claim for a stage group, by priority then age
+
+        A job can be claimed when it is queued, when it is running under a
+        lease that was not renewed in time (its worker died), or when it
+        failed fewer than max_failures times and has waited retry_delay
+        seconds since. Each job is returned with its scheduling fields only.
+        """
+        start_stages = get_group_start_stages(group)
+        if not start_stages:
+            return []
+        placeholders = ', '.join('?' for _ in start_stages)
+        now = time.time()
+        return self._get_schedule_info(
+            f"stage IN ({placeholders}) "
+            "AND (lease_expires IS NULL OR lease_expires < ?) AND ("
+            "status = 'queued' "
+            "OR (status = 'running' AND lease_expires IS NOT NULL) "
+            "OR (status = 'failed' AND failures < ? AND updated_at < ?)"
+            ") ORDER BY priority DESC, created_at",
+            (*start_stages, now, max_failures, now - retry_delay)
+        )
+
+    def claim_job(self, owner: str, group: str, lease_seconds: float, max_failures: int = 0,
+                  retry_delay: float = 60.0,
+                  choose: Optional[Callable[[List[Dict[str, any]]], Optional[Dict[str, any]]]] = None
+                  ) -> Optional[Dict[str, any]]:
+        """
+        Lease the next job whose next stage is in a stage group
+
+        Args:
+            owner: Id of the claiming worker
+            group: STAGE_GROUPS entry the worker has a free slot for
+            lease_seconds: How long the lease lasts without a heartbeat
+            max_failures: Failures after which a job is no longer retried
+            retry_delay: Seconds to wait before retrying a failed job
+            choose: Picks a job from the list_claimable entries (optional,
+                default the highest priority, then the oldest)
+
+        Returns:
+            The claimed job, or None if there is nothing to claim
+        """
+        # BEGIN IMMEDIATE takes the write lock up front so two workers cannot claim the same job
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            candidates = self.list_claimable(group, max_failures, retry_delay)
+            chosen = (choose(candidates) if choose else candidates[0]) if candidates else None
+            # Only the lease is taken; run_job marks the job running when it starts
+            if chosen is not None:
+                self.connection.execute(
+                    "UPDATE jobs SET lease_owner = ?, lease_expires = ? WHERE id = ?",
+                    (owner, time.time() + lease_seconds, chosen['id'])
+                )
+            self.connection.execute("COMMIT")
+        except BaseException:
+            # Also when choose raises, or the write lock would be held until the connection closes
+            self.connection.execute("ROLLBACK")
+            raise
+        return self.get_job(chosen['id']) if chosen is not None else None
+
+    def renew_lease(self, job_id: str, owner: str, lease_seconds: float) -> bool:
+        """Extend a worker's lease on a job; False if the lease was lost to another worker"""
+        cursor = self.connection.execute(
+            "UPDATE jobs SET lease_expires = ? WHERE id = ? AND lease_owner = ?",
+            (time.time() + lease_seconds, job_id, owner)
+        )
+        return cursor.rowcount == 1
+
+    def release_job(self, job_id: str, owner: str):
+        """Drop a worker's lease on a job, unless another worker has claimed it since"""
+        self.connection.execute(
+            "UPDATE jobs SET lease_owner = NULL, lease_expires = NULL WHERE id = ? AND lease_owner = ?",
+            (job_id, owner)
+        )
+
+    def record_timing(self, job_id: str, group: str, seconds: float, units: float):
+        """Record how long a job's stage group took and how much work it was (see pipeline.scheduler)"""
+        self.connection.execute(
+            "INSERT INTO stage_timings (job_id, stage_group, seconds, units, finished_at) VALUES (?, ?, ?, ?, ?)",
+            (job_id, group, seconds, units, time.time())
+        )
+
+    def get_stage_rates(self, history: int) -> Dict[str, Dict[str, float]]:
+        """
+        Summarise the most recent timings of every stage group
+
+        Returns:
+            Dict of group -> {'count', 'seconds' (mean per run), 'seconds_per_unit'}
+        """
+        rates = {}
+        for group in STAGE_GROUPS:
+            row = self.connection.execute(
+                "SELECT COUNT(*), AVG(seconds), SUM(seconds), SUM(units) FROM ("
+                "SELECT seconds, units FROM stage_timings WHERE stage_group = ? ORDER BY finished_at DESC LIMIT ?)",
+                (group, history)
+            ).fetchone()
+            if row[0]:
+                rates[group] = {
+                    'count': row[0],
+                    'seconds': row[1],
+                    'seconds_per_unit': row[2] / row[3] if row[3] else None
+                }
+        return rates
+
+    def save_segments(self, job_id: str, segments: List[Dict[str, any]]):
+        """Store a job's cleaned segments as pending, replacing any stored before"""
+        now = time.time()
+        self.connection.execute("BEGIN")
+        try:
+            self.connection.execute("DELETE FROM segments WHERE job_id = ?", (job_id,))
+            self.connection.executemany(
+                "INSERT INTO segments (job_id, position, suffix, segment, status, updated_at) "
+                "VALUES (?, ?, ?, ?, 'pending', ?)",
+                [(job_id, position, segment['filename_suffix'], json.dumps(segment, ensure_ascii=False), now)
+                 for position, segment in enumerate(segments)]
+            )
+            self.connection.execute("COMMIT")
+        except sqlite3.Error:
+            self.connection.execute("ROLLBACK")
+            raise
+
+    def get_segments(self, job_id: str) -> List[Dict[str, any]]:
+        """Get a job's segments in order, each with 'segment', 'status' and 'file_info'"""
+        rows = self.connection.execute(
+            "SELECT * FROM segments WHERE job_id = ? ORDER BY position", (job_id,)
+        ).fetchall()
+        return [{
+            'position': row['position'],
+            'suffix': row['suffix'],
+            'segment': json.loads(row['segment']),
+            'status': row['status'],
+            'file_info': json.loads(row['file_info']) if row['file_info'] else None
+        } for row in rows]
+
+    def set_segment_result(self, job_id: str, suffix: str, file_info: Optional[Dict[str, any]]):
+        """Record a segment's audio as done (with its file info) or failed (None)"""
+        self.connection.execute(
+            "UPDATE segments SET status = ?, file_info = ?, updated_at = ? WHERE job_id = ? AND suffix = ?",
+            ('done' if file_info else 'failed',
+             json.dumps(file_info, ensure_ascii=False, default=str) if file_info else None,
+             time.time(), job_id, suffix)
+        )
@@ -0,0 +1,415 @@
+import os
+import sys
+import json
+import time
+import socket
+import tracemalloc
+import contextlib
+import threading
+from pathlib import Path
+from typing import Optional, Dict, List, Tuple
+
+from .job_store import STAGE_GROUPS, get_stage_group
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+
+MEMORY_DIRECTORY = Path("temp") / "memory"
+
+# Seconds between RSS samples while a stage runs
+SAMPLE_INTERVAL = 0.05
+
+# Allocation sites listed per stage
+TOP_SITES = 10
+
+# Growth of Python allocations (fraction, and at least bytes) before the peak is snapshotted again
+PEAK_SNAPSHOT_GROWTH = 0.1
+PEAK_SNAPSHOT_MINIMUM = 1 << 20
+
+# Share of the machine's memory the suggested stage limits plan to use
+MEMORY_BUDGET = 0.8
+
+# Allocations by the profiler itself and the import system are not of interest
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>")
+)
+
+# The profiler active in each thread; None while profiling is off
+_local = threading.local()
+
+# tracemalloc is process-wide, so it runs while any profiler does; it is only
+# stopped again if a profiler started it (not when e.g. PYTHONTRACEMALLOC did)
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+_tracemalloc_started = False
+
+
+def is_memory_profiling_enabled(video_config: Dict[str, any]) -> bool:
+    """Whether job memory is profiled (the 'memory_profile' setting, off by default)"""
+    return str(video_config.get('memory_profile', False)).lower() in ('true', '1', 'yes', 'on')
+
+
+def get_rss(pid: Optional[int] = None) -> Optional[int]:
+    """Get the resident memory of a process (default this one) in bytes, or None if unknown"""
+    pid = pid or os.getpid()
+    try:
+        with open(f"/proc/{pid}/statm", 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    if PSUTIL_AVAILABLE:
+        try:
+            return psutil.Process(pid).memory_info().rss
+        except psutil.Error:
+            return None
+    return None
+
+
+def get_children_rss() -> int:
+    """
+    Get the combined resident memory of this process's descendants in bytes
+
+    Render workers and FFmpeg run as child processes, so their memory
+    counts towards what a stage needs even though it is not in our RSS.
+    """
+    if PSUTIL_AVAILABLE:
+        total = 0
+        try:
+            for child in psutil.Process().children(recursive=True):
+                try:
+                    total += child.memory_info().rss
+                except psutil.Error:
+                    pass
+        except psutil.Error:
+            pass
+        return total
+
+    # Without psutil, walk the process tree through /proc (Linux only)
+    try:
+        parents = {}
+        for entry in os.listdir("/proc"):
+            if entry.isdigit():
+                try:
+                    with open(f"/proc/{entry}/stat", 'r') as f:
+                        # The command name may contain spaces; fields resume after its closing parenthesis
+                        parents[int(entry)] = int(f.read().rsplit(')', 1)[1].split()[1])
+                except (OSError, ValueError, IndexError):
+                    pass
+    except OSError:
+        return 0
+
+    descendants, frontier = [], [os.getpid()]
+    while frontier:
+        parent = frontier.pop()
+        children = [pid for pid, ppid in parents.items() if ppid == parent]
+        descendants.extend(children)
+        frontier.extend(children)
+    return sum(get_rss(pid) or 0 for pid in descendants)
+
+
+def get_total_memory() -> Optional[int]:
+    """Get the machine's physical memory in bytes, or None if unknown"""
+    if PSUTIL_AVAILABLE:
+        return psutil.virtual_memory().total
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def format_bytes(size: Optional[float]) -> str:
+    """Format a byte count for the report"""
+    if size is None:
+        return "-"
+    for unit in ('B', 'KB', 'MB'):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.2f} GB"
+
+
+class MemorySampler:
+    """
+    Polls this process's and its children's RSS in a thread, keeping the peaks
+
+    It also snapshots the Python allocations whenever they reach a new
+    high, so the allocation sites at a stage's peak are known even when
+    the memory is freed again before the stage ends.
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self.peaks = {'rss': 0, 'children': 0, 'total': 0}
+        self.peak_snapshot: Optional[tracemalloc.Snapshot] = None
+        self.peak_snapshot_size = 0
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name='memory-sampler', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+
+    def sample(self):
+        rss = get_rss() or 0
+        children = get_children_rss()
+        traced = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+        snapshot = None
+        if traced > max(self.peak_snapshot_size * (1 + PEAK_SNAPSHOT_GROWTH),
+                        self.peak_snapshot_size + PEAK_SNAPSHOT_MINIMUM):
+            snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+        with self.lock:
+            self.peaks['rss'] = max(self.peaks['rss'], rss)
+            self.peaks['children'] = max(self.peaks['children'], children)
+            self.peaks['total'] = max(self.peaks['total'], rss + children)
+            if snapshot is not None:
+                self.peak_snapshot, self.peak_snapshot_size = snapshot, traced
+
+    def reset(self, traced_baseline: int = 0) -> Tuple[Dict[str, int], Optional[tracemalloc.Snapshot]]:
+        """
+        Take one more sample, then start over
+
+        Returns:
+            Tuple of (peaks since the last reset, snapshot of the Python
+            allocations at their highest point, or None if they did not grow)
+        """
+        self.sample()
+        with self.lock:
+            peaks, snapshot = dict(self.peaks), self.peak_snapshot
+            self.peaks = {'rss': 0, 'children': 0, 'total': 0}
+            self.peak_snapshot, self.peak_snapshot_size = None, traced_baseline
+        return peaks, snapshot
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            self.sample()
+
+
+def get_top_sites(snapshot: tracemalloc.Snapshot, baseline: tracemalloc.Snapshot) -> List[Dict[str, any]]:
+    """Get the source lines holding the most memory in a snapshot that they did not hold at the baseline"""
+    sites = []
+    for difference in snapshot.compare_to(baseline, 'lineno'):
+        if difference.size_diff <= 0:
+            continue
+        frame = difference.traceback[0]
+        sites.append({'site': f"{frame.filename}:{frame.lineno}", 'size': difference.size_diff,
+                      'count': difference.count_diff})
+        if len(sites) == TOP_SITES:
+            break
+    return sites
+
+
+class MemoryProfiler:
+    """
+    Records the memory every pipeline stage of one job needs
+
+    For each stage it keeps the RSS before and after, the peak RSS of this
+    process and of its child processes (render workers, FFmpeg) sampled
+    while the stage ran, the peak of Python allocations (tracemalloc) and
+    the call sites holding the most memory at that peak and at the end of
+    the stage. tracemalloc and RSS are process-wide, so figures are exact when one job runs per process
+    (--sequential, or worker limits of 1) and include the neighbouring
+    stages otherwise.
+    """
+
+    def __init__(self, name: str, stages: Optional[List[Dict[str, any]]] = None):
+        self.name = name
+        self.stages: List[Dict[str, any]] = list(stages or [])
+        self.sampler: Optional[MemorySampler] = None
+
+    def start(self):
+        """Start sampling RSS and tracing allocations"""
+        global _tracemalloc_users, _tracemalloc_started
+        with _tracemalloc_lock:
+            if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                _tracemalloc_started = True
+            _tracemalloc_users += 1
+        self.sampler = MemorySampler()
+        self.sampler.start()
+
+    def stop(self):
+        """Stop sampling; tracemalloc stops with the last profiler if a profiler started it"""
+        global _tracemalloc_users, _tracemalloc_started
+        if self.sampler is None:
+            return
+        self.sampler.stop()
+        self.sampler = None
+        with _tracemalloc_lock:
+            _tracemalloc_users -= 1
+            if _tracemalloc_users == 0 and _tracemalloc_started:
+                tracemalloc.stop()
+                _tracemalloc_started = False
+
+    @contextlib.contextmanager
+    def stage(self, stage: str):
+        """Profile a block as one pipeline stage (a JOB_STAGES name)"""
+        before = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+        traced_before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        self.sampler.reset(traced_before)
+        rss_before = get_rss()
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            seconds = time.monotonic() - started
+            peaks, peak_snapshot = self.sampler.reset()
+            traced_after, traced_peak = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+            self.stages.append({
+                'stage': stage,
+                'group': get_stage_group(stage),
+                'seconds': seconds,
+                'rss_before': rss_before,
+                'rss_after': get_rss(),
+                'peak_rss': peaks['rss'],
+                'peak_children': peaks['children'],
+                'peak_total': peaks['total'],
+                'python_peak': traced_peak - traced_before,
+                'python_retained': traced_after - traced_before,
+                'peak_sites': get_top_sites(peak_snapshot or after, before),
+                'retained_sites': get_top_sites(after, before)
+            })
+
+    def get_group_footprints(self) -> Dict[str, Dict[str, any]]:
+        """
+        Get how much memory one more concurrent stage of each group needs
+
+        The footprint is the largest rise above the stage's starting RSS
+        plus the stage's child processes; the suggested limit is how many
+        such stages fit in MEMORY_BUDGET of the machine's memory next to
+        one worker process.
+        """
+        total_memory = get_total_memory()
+        baseline = min((stage['rss_before'] for stage in self.stages if stage['rss_before']), default=0)
+        footprints = {}
+        for group in STAGE_GROUPS:
+            stages = [stage for stage in self.stages if stage['group'] == group]
+            if not stages:
+                continue
+            footprint = max(max(0, (stage['peak_rss'] or 0) - (stage['rss_before'] or 0)) + stage['peak_children']
+                            for stage in stages)
+            limit = None
+            if total_memory and footprint:
+                limit = max(1, int((total_memory * MEMORY_BUDGET - baseline) // footprint))
+            footprints[group] = {
+                'peak_total': max(stage['peak_total'] for stage in stages),
+                'footprint': footprint,
+                'suggested_limit': limit
+            }
+        return footprints
+
+    def to_report(self) -> Dict[str, any]:
+        """Get the memory report as a JSON-serialisable dict"""
+        return {
+            'job': self.name,
+            'host': socket.gethostname(),
+            'python': sys.version.split()[0],
+            'total_memory': get_total_memory(),
+            'memory_budget': MEMORY_BUDGET,
+            'stages': self.stages,
+            'groups': self.get_group_footprints()
+        }
+
+    def format_report(self) -> str:
+        """Format the memory report as plain text"""
+        report = self.to_report()
+        lines = [
+            f"Memory report: {self.name}",
+            f"Host: {report['host']} ({format_bytes(report['total_memory'])} RAM)",
+            "",
+            f"{'Stage':<18}  {'Seconds':>8}  {'RSS before':>10}  {'Peak RSS':>10}  {'Children':>10}  "
+            f"{'Py peak':>10}  {'Py kept':>10}",
+            "-" * 90
+        ]
+        for stage in self.stages:
+            lines.append(
+                f"{stage['stage']:<18}  {stage['seconds']:>8.2f}  {format_bytes(stage['rss_before']):>10}  "
+                f"{format_bytes(stage['peak_rss']):>10}  {format_bytes(stage['peak_children']):>10}  "
+                f"{format_bytes(stage['python_peak']):>10}  {format_bytes(stage['python_retained']):>10}"
+            )
+
+        if report['groups']:
+            lines += ["", "Per stage group (for worker --limit GROUP=COUNT):"]
+            for group, footprint in report['groups'].items():
+                limit = footprint['suggested_limit']
+                if limit:
+                    advice = f"about {limit} at once fit in {MEMORY_BUDGET:.0%} of RAM"
+                elif footprint['footprint']:
+                    advice = "machine memory unknown"
+                else:
+                    advice = "no measurable growth"
+                lines.append(f"  {group:<8} needs {format_bytes(footprint['footprint'])} per stage; {advice}")
+
+        for stage in self.stages:
+            if stage['peak_sites']:
+                lines += ["", f"Largest allocations at the peak of {stage['stage']}:"]
+                for site in stage['peak_sites']:
+                    lines.append(f"  {format_bytes(site['size']):>10}  {site['count']:>8} blocks  {site['site']}")
+        return "\n".join(lines) + "\n"
+
+    def save(self, path_base: str) -> Dict[str, str]:
+        """
+        Write <path_base>.memory.json and <path_base>.memory.txt
+
+        Returns:
+            Dict with the 'report' and 'summary' paths, empty if writing failed
+        """
+        report_path = f"{path_base}.memory.json"
+        summary_path = f"{path_base}.memory.txt"
+        try:
+            Path(report_path).parent.mkdir(parents=True, exist_ok=True)
+            with open(report_path, 'w', encoding='utf-8') as f:
+                json.dump(self.to_report(), f, indent=2)
+            with open(summary_path, 'w', encoding='utf-8') as f:
+                f.write(self.format_report())
+        except OSError as e:
+            print(f"Warning: Could not save memory report: {str(e)}")
+            return {}
+        return {'report': report_path, 'summary': summary_path}
+
+    @classmethod
+    def load(cls, name: str, report_path: str) -> 'MemoryProfiler':
+        """Continue a report saved earlier, e.g. by a previous stage group of the same job"""
+        try:
+            with open(report_path, 'r', encoding='utf-8') as f:
+                return cls(name, json.load(f).get('stages', []))
+        except (OSError, ValueError):
+            return cls(name)
+
+
+def memory_stage(stage: str):
+    """Profile a block as a pipeline stage of the profiler active in this thread (no-op without one)"""
+    profiler = getattr(_local, 'profiler', None)
+    if profiler is None:
+        return contextlib.nullcontext()
+    return profiler.stage(stage)
+
+
+@contextlib.contextmanager
+def profiling(profiler: Optional[MemoryProfiler]):
+    """Make a memory profiler active in this thread for a block (None leaves profiling off)"""
+    previous = getattr(_local, 'profiler', None)
+    _local.profiler = profiler
+    if profiler is not None:
+        profiler.start()
+    try:
+        yield profiler
+    finally:
+        if profiler is not None:
+            profiler.stop()
+        _local.profiler = previous
@@ -0,0 +1,317 @@
+import os
+import json
+import math
+import time
+import threading
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Dict, List, Tuple, Iterable
+
+
+METRICS_SNAPSHOT = Path("temp") / "metrics.json"
+
+DEFAULT_METRICS_HOST = "127.0.0.1"
+DEFAULT_SNAPSHOT_INTERVAL = 30.0
+
+# Upper bounds of the histogram buckets, per metric kind
+SECONDS_BUCKETS = (0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+SECONDS_PER_CHARACTER_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+FPS_BUCKETS = (5, 10, 15, 24, 30, 45, 60, 90, 120, 240, 480)
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value as Prometheus expects"""
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    """Format a label set as {name="value",...} (empty without labels)"""
+    if not labels:
+        return ""
+    escaped = (
+        (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in labels.items()
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+class Metric:
+    """
+    A named metric with one value per label combination
+
+    Use the Counter, Gauge and Histogram subclasses through a
+    MetricsRegistry; label values are given positionally in the order of
+    label_names.
+    """
+
+    type = 'untyped'
+
+    def __init__(self, name: str, help_text: str, label_names: Iterable[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self.lock = threading.Lock()
+        self.values: Dict[Tuple[str, ...], any] = {}
+
+    def _key(self, labels: Tuple[str, ...]) -> Tuple[str, ...]:
+        if len(labels) != len(self.label_names):
+            raise ValueError(f"{self.name} takes labels {self.label_names}, got {labels}")
+        return tuple(str(label) for label in labels)
+
+    def _labels(self, key: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.label_names, key))
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        """Get the (sample name, labels, value) lines of the metric"""
+        with self.lock:
+            return [(self.name, self._labels(key), value) for key, value in sorted(self.values.items())]
+
+    def snapshot(self) -> List[Dict[str, any]]:
+        """Get the metric's values as JSON-serialisable dicts"""
+        with self.lock:
+            return [{'labels': self._labels(key), 'value': value} for key, value in sorted(self.values.items())]
+
+
+class Counter(Metric):
+    """A value that only goes up, e.g. posts fetched"""
+
+    type = 'counter'
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+
+class Gauge(Metric):
+    """A value that goes up and down, e.g. jobs waiting in a queue"""
+
+    type = 'gauge'
+
+    def set(self, *labels: str, value: float):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = float(value)
+
+
+class Histogram(Metric):
+    """Observations counted into buckets, e.g. render speed per job"""
+
+    type = 'histogram'
+
+    def __init__(self, name: str, help_text: str, label_names: Iterable[str] = (),
+                 buckets: Iterable[float] = SECONDS_BUCKETS):
+        super().__init__(name, help_text, label_names)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, *labels: str, value: float):
+        key = self._key(labels)
+        with self.lock:
+            counts = self.values.setdefault(key, {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0})
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts['buckets'][index] += 1
+                    break
+            counts['sum'] += value
+            counts['count'] += 1
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        lines = []
+        with self.lock:
+            for key, counts in sorted(self.values.items()):
+                labels = self._labels(key)
+                # Prometheus buckets are cumulative
+                total = 0
+                for bound, count in zip(self.buckets, counts['buckets']):
+                    total += count
+                    lines.append((f"{self.name}_bucket", dict(labels, le=_format_value(bound)), total))
+                lines.append((f"{self.name}_sum", labels, counts['sum']))
+                lines.append((f"{self.name}_count", labels, counts['count']))
+        return lines
+
+    def snapshot(self) -> List[Dict[str, any]]:
+        with self.lock:
+            return [{
+                'labels': self._labels(key),
+                'count': counts['count'],
+                'sum': counts['sum'],
+                'mean': counts['sum'] / counts['count'] if counts['count'] else None,
+                'buckets': {_format_value(bound): count for bound, count in zip(self.buckets, counts['buckets'])}
+            } for key, counts in sorted(self.values.items())]
+
+
+class MetricsRegistry:
+    """
+    Holds the metrics of a process and renders them for export
+
+    Metrics are created once (creating one again returns the existing
+    metric) and fed from wherever the work happens; MetricsExporter
+    serves them in the Prometheus text format and writes JSON snapshots.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics: Dict[str, Metric] = {}
+
+    def _register(self, metric_class, name: str, *args, **kwargs) -> Metric:
+        with self.lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = metric_class(name, *args, **kwargs)
+            elif not isinstance(metric, metric_class):
+                raise ValueError(f"Metric {name} is already registered as a {metric.type}")
+            return metric
+
+    def counter(self, name: str, help_text: str, label_names: Iterable[str] = ()) -> Counter:
+        return self._register(Counter, name, help_text, label_names)
+
+    def gauge(self, name: str, help_text: str, label_names: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge, name, help_text, label_names)
+
+    def histogram(self, name: str, help_text: str, label_names: Iterable[str] = (),
+                  buckets: Iterable[float] = SECONDS_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, help_text, label_names, buckets)
+
+    def to_prometheus(self) -> str:
+        """Render every metric in the Prometheus text exposition format"""
+        with self.lock:
+            metrics = sorted(self.metrics.values(), key=lambda metric: metric.name)
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, any]:
+        """Get every metric's current values as a JSON-serialisable dict"""
+        with self.lock:
+            metrics = sorted(self.metrics.values(), key=lambda metric: metric.name)
+        return {
+            'time': time.time(),
+            'pid': os.getpid(),
+            'metrics': {metric.name: {'type': metric.type, 'help': metric.help, 'values': metric.snapshot()}
+                        for metric in metrics}
+        }
+
+    def save_snapshot(self, path: Path = METRICS_SNAPSHOT) -> bool:
+        """Write a JSON snapshot atomically"""
+        path = Path(path)
+        temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.snapshot(), f, indent=2)
+            os.replace(temp_path, path)
+            return True
+        except OSError as e:
+            print(f"Warning: Could not save metrics snapshot: {str(e)}")
+            return False
+
+
+REGISTRY = MetricsRegistry()
+
+# Metrics fed by the pipeline stages
+POSTS_FETCHED = REGISTRY.counter(
+    'pipeline_posts_fetched_total', "Reddit posts fetched")
+CACHE_LOOKUPS = REGISTRY.counter(
+    'pipeline_cache_lookups_total', "Build cache lookups by artifact kind and result (hit or miss)",
+    ('kind', 'result'))
+STAGE_SECONDS = REGISTRY.histogram(
+    'pipeline_stage_seconds', "Seconds a stage group took for one job", ('stage',))
+STAGE_FAILURES = REGISTRY.counter(
+    'pipeline_stage_failures_total', "Failed job attempts by stage group", ('stage',))
+TTS_SECONDS_PER_CHARACTER = REGISTRY.histogram(
+    'pipeline_tts_seconds_per_character', "Synthesis seconds per character of narration by TTS backend",
+    ('backend',), SECONDS_PER_CHARACTER_BUCKETS)
+RENDER_FPS = REGISTRY.histogram(
+    'pipeline_render_fps', "Video frames rendered per second of render time", (), FPS_BUCKETS)
+QUEUE_DEPTH = REGISTRY.gauge(
+    'pipeline_queue_depth', "Jobs waiting for a stage group", ('stage',))
+STAGES_RUNNING = REGISTRY.gauge(
+    'pipeline_stages_running', "Stage groups running in this process", ('stage',))
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Serves /metrics (Prometheus text) and /metrics.json"""
+
+    registry: MetricsRegistry = REGISTRY
+
+    def do_GET(self):
+        path = self.path.split('?', 1)[0]
+        if path in ('/', '/metrics'):
+            body = self.registry.to_prometheus().encode('utf-8')
+            content_type = 'text/plain; version=0.0.4; charset=utf-8'
+        elif path == '/metrics.json':
+            body = json.dumps(self.registry.snapshot()).encode('utf-8')
+            content_type = 'application/json'
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes every few seconds would drown the worker log
+        pass
+
+
+class MetricsExporter:
+    """
+    Exposes a registry over HTTP and/or as a periodic JSON snapshot file
+
+    The HTTP endpoint binds to localhost by default; put a reverse proxy
+    or the Prometheus agent on the same host in front of it rather than
+    exposing it directly.
+    """
+
+    def __init__(self, registry: MetricsRegistry = REGISTRY, port: Optional[int] = None,
+                 host: str = DEFAULT_METRICS_HOST, snapshot_path: Optional[Path] = None,
+                 snapshot_interval: float = DEFAULT_SNAPSHOT_INTERVAL):
+        self.registry = registry
+        self.port = port
+        self.host = host
+        self.snapshot_path = Path(snapshot_path) if snapshot_path else None
+        self.snapshot_interval = snapshot_interval
+        self.server: Optional[ThreadingHTTPServer] = None
+        self.stop_event = threading.Event()
+        self.threads: List[threading.Thread] = []
+
+    def start(self) -> 'MetricsExporter':
+        """Start serving and snapshotting in background threads"""
+        if self.port is not None:
+            handler = type('MetricsHandler', (_MetricsHandler,), {'registry': self.registry})
+            self.server = ThreadingHTTPServer((self.host, self.port), handler)
+            self.server.daemon_threads = True
+            # Port 0 picks a free port
+            self.port = self.server.server_address[1]
+            self.threads.append(threading.Thread(target=self.server.serve_forever, name='metrics-http', daemon=True))
+        if self.snapshot_path is not None:
+            self.threads.append(threading.Thread(target=self._write_snapshots, name='metrics-snapshot', daemon=True))
+        for thread in self.threads:
+            thread.start()
+        return self
+
+    def _write_snapshots(self):
+        while not self.stop_event.wait(self.snapshot_interval):
+            self.registry.save_snapshot(self.snapshot_path)
+
+    def stop(self):
+        """Stop serving and write a final snapshot"""
+        self.stop_event.set()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+        if self.snapshot_path is not None:
+            self.registry.save_snapshot(self.snapshot_path)
@@ -0,0 +1,242 @@
+import json
+import time
+from pathlib import Path
+from typing import Optional, Dict, Iterable, Callable
+
+from .job_store import JobStore, stage_index, get_stage_group, get_next_group
+from tracing import Tracer, TRACE_DIRECTORY, is_tracing_enabled, tracing, span
+from .metrics import POSTS_FETCHED, STAGE_SECONDS, STAGE_FAILURES, RENDER_FPS
+from .memory import MemoryProfiler, MEMORY_DIRECTORY, is_memory_profiling_enabled, profiling, memory_stage
+
+
+# Video types in the order of the interactive menu (process_video_content indices)
+VIDEO_TYPES = {
+    'post_description': 0,
+    'top_comment': 1,
+    'top_10_comments': 2
+}
+
+
+def get_job_result(job: Dict[str, any]) -> Dict[str, any]:
+    """Summarise a stored job as the JSON result reported to callers"""
+    result = {
+        'job_id': job['id'],
+        'url': job['url'],
+        'video_type': job['video_type'],
+        'status': {'done': 'ok', 'failed': 'error'}.get(job['status'], 'pending'),
+        'stage': job['stage'],
+        'attempts': job['attempts']
+    }
+    if job.get('error'):
+        result['error'] = job['error']
+
+    tts_result = job.get('tts_result')
+    if tts_result:
+        result.update({
+            'audio_files': [file_info['filename'] for file_info in tts_result['files']],
+            'failed_segments': tts_result['failed_count'],
+            'captions': tts_result.get('captions', {}),
+            'tts_service': tts_result['service_used']
+        })
+
+    render_result = job.get('render_result')
+    if render_result:
+        result.update({
+            'videos': render_result['outputs'],
+            'duration': render_result['duration'],
+            'preset': render_result['preset'],
+            'build': render_result.get('build')
+        })
+    return result
+
+
+def run_job(store: JobStore, job_id: str, groups: Optional[Iterable[str]] = None,
+            should_yield: Optional[Callable[[], bool]] = None) -> Dict[str, any]:
+    """
+    Run a stored job from its last completed stage to the end, or through
+    the stages of some stage groups only
+
+    Stages: fetch -> content selection -> segment cleaning -> per-segment
+    TTS -> render. Each stage's output is committed to the store before the
+    next stage starts, and audio segments are committed one at a time, so
+    a failed or interrupted job resumes where it stopped without redoing
+    finished TTS or renders.
+
+    Args:
+        store: Job store holding the job
+        job_id: Id of the job to run
+        groups: STAGE_GROUPS entries to run (optional, default all); a job
+            with stages left afterwards goes back to queued
+        should_yield: Checked between render chunks; when it returns True
+            the render stops and the job goes back to queued (optional)
+
+    Returns:
+        Result dict from get_job_result
+
+    How long each stage group took is recorded for pipeline.scheduler and,
+    with the fetch counts, failures and render speed, in pipeline.metrics. With
+    the 'trace' setting on, the stages are traced into temp/traces/ and a
+    finished job's trace and timing summary are saved next to its outputs
+    (see tracing.py). The 'memory_profile' setting does the same for
+    a per-stage memory report in temp/memory/ (see pipeline.memory).
+    """
+    from pages import create_video as create_video_page
+
+    job = store.get_job(job_id)
+    if job is None:
+        return {'job_id': job_id, 'status': 'error', 'stage': 'queued', 'error': "Unknown job"}
+
+    options = job.get('options') or {}
+    video_config = dict(create_video_page.load_video_config(), **options.get('video_overrides', {}))
+    # A queued job past its first stage is moving between stage groups, not starting another attempt
+    resuming = job['status'] == 'queued' and job['stage'] != 'queued'
+    store.update_job(job_id, status='running', attempts=job['attempts'] + (0 if resuming else 1))
+
+    # Stage groups may run in different processes, so traces and memory reports are carried over on disk
+    tracer = None
+    if is_tracing_enabled(video_config):
+        tracer = Tracer.load(job_id, str(TRACE_DIRECTORY / f"{job_id}.trace.json"))
+    profiler = None
+    if is_memory_profiling_enabled(video_config):
+        profiler = MemoryProfiler.load(job_id, str(MEMORY_DIRECTORY / f"{job_id}.memory.json"))
+
+    with tracing(tracer), profiling(profiler):
+        result = _run_stages(store, job, groups, should_yield, video_config)
+
+    if tracer is not None:
+        tracer.save(str(TRACE_DIRECTORY / job_id))
+        if result['status'] == 'ok':
+            result['trace'] = tracer.save(get_job_path_base(store, job_id))
+    if profiler is not None:
+        profiler.save(str(MEMORY_DIRECTORY / job_id))
+        if result['status'] == 'ok':
+            result['memory'] = profiler.save(get_job_path_base(store, job_id))
+    return result
+
+
+def get_job_path_base(store: JobStore, job_id: str) -> str:
+    """Get where a finished job's reports go: next to its first video, or its audio without a render"""
+    job = store.get_job(job_id)
+    if job.get('render_result'):
+        return str(Path(next(iter(job['render_result']['outputs'].values()))).with_suffix(''))
+    return str(Path("output") / job['tts_result']['base_filename'])
+
+
+def _run_stages(store: JobStore, job: Dict[str, any], groups: Optional[Iterable[str]],
+                should_yield: Optional[Callable[[], bool]], video_config: Dict[str, any]) -> Dict[str, any]:
+    """Run the pending stages of a job for run_job"""
+    from pages import create_video as create_video_page
+    from video import RENDER_PREEMPTED
+
+    job_id = job['id']
+    options = job.get('options') or {}
+
+    def fail(error: str) -> Dict[str, any]:
+        STAGE_FAILURES.inc(get_next_group(store.get_job(job_id)['stage']) or 'render')
+        store.fail_job(job_id, error)
+        return get_job_result(store.get_job(job_id))
+
+    stage = stage_index(job['stage'])
+    groups = None if groups is None else set(groups)
+
+    def pending(name: str) -> bool:
+        return stage < stage_index(name) and (groups is None or get_stage_group(name) in groups)
+
+    post_data = job.get('post_data')
+    content = job.get('content')
+    tts_result = job.get('tts_result')
+
+    # Stage 1: fetch the post
+    fetch_started = time.monotonic() if pending('fetched') else None
+    if pending('fetched'):
+        post_id, subreddit = create_video_page.extract_post_info_from_url(job['url'])
+        if not post_id or not subreddit:
+            return fail("Invalid Reddit URL format")
+
+        temp_dir = create_video_page.create_temp_directory()
+        with span('stage.fetch', 'stage'), memory_stage('fetched'):
+            success, post_data = create_video_page.fetch_reddit_post_data(
+                post_id, create_video_page.load_reddit_config())
+        if not success:
+            return fail(f"Failed to fetch post data: {post_data}")
+        POSTS_FETCHED.inc()
+
+        cache_path = temp_dir / create_video_page.generate_cache_filename(post_id, post_data.get('author', 'unknown'))
+        try:
+            with open(cache_path, 'w', encoding='utf-8') as f:
+                json.dump(post_data, f, indent=2, ensure_ascii=False)
+        except OSError:
+            pass
+        store.complete_stage(job_id, 'fetched', post_data=post_data)
+
+    # Stage 2: select content (stored, so a resumed top-10 job keeps its shuffled order)
+    if pending('content_selected'):
+        with span('stage.select_content', 'stage'), memory_stage('content_selected'):
+            content = create_video_page.process_video_content(post_data, VIDEO_TYPES[job['video_type']])
+        if not content or content.get('error'):
+            return fail((content or {}).get('error', "Could not select content"))
+        store.complete_stage(job_id, 'content_selected', content=content)
+
+    # Stage 3: clean the text into narration segments
+    if pending('segments_cleaned'):
+        with span('stage.clean_text', 'stage'), memory_stage('segments_cleaned'):
+            segments = create_video_page.prepare_audio_segments(content)
+        if not segments:
+            return fail("No valid content segments for TTS generation")
+        store.save_segments(job_id, segments)
+        store.complete_stage(job_id, 'segments_cleaned')
+    if fetch_started is not None:
+        fetch_seconds = time.monotonic() - fetch_started
+        store.record_timing(job_id, 'fetch', fetch_seconds, 1.0)
+        STAGE_SECONDS.observe('fetch', value=fetch_seconds)
+
+    # Stage 4: synthesise each segment, skipping the ones already done
+    if pending('audio_done'):
+        rows = store.get_segments(job_id)
+        completed = {row['suffix']: row['file_info'] for row in rows if row['status'] == 'done'}
+        characters = sum(len(row['segment'].get('text', '')) for row in rows if row['suffix'] not in completed)
+        tts_started = time.monotonic()
+
+        with span('stage.tts', 'stage', segments=len(rows) - len(completed)), memory_stage('audio_done'):
+            success, tts_result = create_video_page.generate_tts_audio(
+                content,
+                segments=[row['segment'] for row in rows],
+                completed=completed,
+                on_segment=lambda segment, file_info: store.set_segment_result(
+                    job_id, segment['filename_suffix'], file_info)
+            )
+        if not success:
+            return fail(tts_result)
+        if tts_result['failed_count']:
+            # Left unfinished so a retry only synthesises the failed segments
+            return fail(tts_result['message'])
+        store.complete_stage(job_id, 'audio_done', tts_result=tts_result)
+        tts_seconds = time.monotonic() - tts_started
+        STAGE_SECONDS.observe('tts', value=tts_seconds)
+        if characters:
+            store.record_timing(job_id, 'tts', tts_seconds, characters)
+
+    # Stage 5: render
+    if options.get('render', True) and pending('rendered'):
+        render_started = time.monotonic()
+        with span('stage.render', 'stage'), memory_stage('rendered'):
+            success, render_result = create_video_page.generate_video(tts_result, video_config=video_config,
+                                                                      should_yield=should_yield)
+        if not success and render_result == RENDER_PREEMPTED:
+            # Not a failure; the finished chunks are cached for when the job is picked up again
+            store.update_job(job_id, status='queued', error=None)
+            return dict(get_job_result(store.get_job(job_id)), preempted=True)
+        if not success:
+            return fail(render_result)
+        store.complete_stage(job_id, 'rendered', render_result=render_result)
+        render_seconds = time.monotonic() - render_started
+        store.record_timing(job_id, 'render', render_seconds,
+                            sum(file_info.get('duration') or 0 for file_info in tts_result['files']) or 1.0)
+        STAGE_SECONDS.observe('render', value=render_seconds)
+        if render_result.get('frames') and render_seconds > 0:
+            RENDER_FPS.observe(value=render_result['frames'] / render_seconds)
+
+    final_stage = 'rendered' if options.get('render', True) else 'audio_done'
+    finished = stage_index(store.get_job(job_id)['stage']) >= stage_index(final_stage)
+    store.update_job(job_id, status='done' if finished else 'queued', error=None)
+    return get_job_result(store.get_job(job_id))
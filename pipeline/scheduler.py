@@ -0,0 +1,116 @@
+import math
+import time
+from typing import Optional, Dict, List, Tuple
+
+from .job_store import JobStore, STAGE_GROUPS, stage_index
+
+
+# Seconds a stage group takes per job until there are timings to go by
+DEFAULT_STAGE_SECONDS = {
+    'fetch': 5.0,
+    'tts': 30.0,
+    'render': 90.0
+}
+
+# Timings per stage group the estimates are based on
+TIMING_HISTORY = 50
+
+# Narration speed used to size a render before its audio exists
+SPEECH_CHARACTERS_PER_SECOND = 15.0
+
+
+def get_job_units(job: Dict[str, any], group: str) -> Optional[float]:
+    """
+    Get how much work a stage group is for a job, in the units its timings are recorded in
+
+    Fetching is counted per job, TTS per character of cleaned narration
+    text and rendering per second of narration. None means the job has
+    not got far enough to tell.
+    """
+    if group == 'fetch':
+        return 1.0
+    if group == 'tts':
+        return job.get('characters')
+    if group == 'render':
+        if job.get('narration_seconds'):
+            return job['narration_seconds']
+        if job.get('characters'):
+            return job['characters'] / SPEECH_CHARACTERS_PER_SECOND
+    return None
+
+
+class Scheduler:
+    """
+    Orders jobs by priority, deadline slack and estimated cost
+
+    Higher priorities always go first. Within a priority, jobs with the
+    least slack (time to their deadline minus the estimated time they still
+    need) go first, and jobs without a deadline follow, shortest first.
+    Estimates come from the recent stage timings in the job store, scaled
+    by each job's measured size once it is known.
+    """
+
+    def __init__(self, store: JobStore):
+        self.store = store
+        self.rates: Dict[str, Dict[str, float]] = {}
+        self.refresh()
+
+    def refresh(self):
+        """Reload the stage timings from the store"""
+        self.rates = self.store.get_stage_rates(TIMING_HISTORY)
+
+    def estimate_stage(self, job: Dict[str, any], group: str) -> float:
+        """Estimate how many seconds a stage group will take for a job"""
+        rate = self.rates.get(group)
+        if not rate:
+            return DEFAULT_STAGE_SECONDS[group]
+        units = get_job_units(job, group)
+        if units is not None and rate['seconds_per_unit']:
+            return units * rate['seconds_per_unit']
+        return rate['seconds']
+
+    def estimate_remaining(self, job: Dict[str, any]) -> float:
+        """Estimate how many seconds a job still needs across its remaining stage groups"""
+        done = stage_index(job['stage'])
+        return sum(self.estimate_stage(job, group) for group, stages in STAGE_GROUPS.items()
+                   if stage_index(stages[-1]) > done)
+
+    def get_slack(self, job: Dict[str, any], now: Optional[float] = None) -> float:
+        """Get the seconds a job can wait and still meet its deadline (infinite without one)"""
+        if job.get('deadline') is None:
+            return math.inf
+        now = time.time() if now is None else now
+        return job['deadline'] - now - self.estimate_remaining(job)
+
+    def sort_key(self, job: Dict[str, any], now: Optional[float] = None) -> Tuple[float, float, float, float]:
+        """Get a key that sorts jobs in the order they should run"""
+        return (-job.get('priority', 0), self.get_slack(job, now), self.estimate_remaining(job), job['created_at'])
+
+    def order(self, jobs: List[Dict[str, any]]) -> List[Dict[str, any]]:
+        """Sort jobs in the order they should run"""
+        now = time.time()
+        return sorted(jobs, key=lambda job: self.sort_key(job, now))
+
+    def choose(self, jobs: List[Dict[str, any]]) -> Optional[Dict[str, any]]:
+        """Get the job that should run next"""
+        if not jobs:
+            return None
+        now = time.time()
+        return min(jobs, key=lambda job: self.sort_key(job, now))
+
+    def should_preempt(self, waiting: Dict[str, any], running: Dict[str, any], group: str) -> bool:
+        """
+        Check whether a waiting job is urgent enough to interrupt a running one
+
+        It is when it has a higher priority, or the same priority and a
+        deadline it would miss by waiting for the running stage to finish,
+        while the running job could wait for it without missing its own.
+        """
+        if waiting.get('priority', 0) != running.get('priority', 0):
+            return waiting.get('priority', 0) > running.get('priority', 0)
+
+        now = time.time()
+        waiting_slack = self.get_slack(waiting, now)
+        running_slack = self.get_slack(running, now)
+        return waiting_slack < self.estimate_stage(running, group) and \
+            running_slack - self.estimate_stage(waiting, group) > 0
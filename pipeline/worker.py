@@ -0,0 +1,323 @@
+import os
+import sys
+import time
+import uuid
+import signal
+import socket
+import argparse
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, List
+
+from .job_store import JobStore, JOB_DATABASE, STAGE_GROUPS
+from .runner import run_job
+from .scheduler import Scheduler
+from .metrics import (
+    MetricsExporter, QUEUE_DEPTH, STAGES_RUNNING, STAGE_FAILURES,
+    METRICS_SNAPSHOT, DEFAULT_METRICS_HOST, DEFAULT_SNAPSHOT_INTERVAL
+)
+
+
+# Concurrent stages per group; fetching mostly waits on the network, while
+# TTS engines and the renderer (which has its own process pool) are heavier
+DEFAULT_STAGE_LIMITS = {
+    'fetch': 4,
+    'tts': 1,
+    'render': 1
+}
+
+DEFAULT_LEASE_SECONDS = 120.0
+DEFAULT_POLL_SECONDS = 2.0
+DEFAULT_MAX_FAILURES = 3
+DEFAULT_RETRY_DELAY = 60.0
+
+
+def get_worker_id() -> str:
+    """Build a worker id that is unique across hosts sharing a job database"""
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+class Worker:
+    """
+    Daemon that claims jobs from a job store and runs them stage by stage
+
+    A worker leases a job for one stage group at a time (fetch, tts or
+    render), runs that group's stages and puts the job back in the queue
+    for whichever worker has a free slot for the next group, so every group
+    has its own concurrency limit. Leases are renewed by a heartbeat; if a
+    worker dies its leases run out and other workers reclaim the jobs from
+    their last completed stage. The job database is the only coordination,
+    so workers on several hosts can share it over a shared filesystem.
+
+    Jobs are claimed in the order pipeline.scheduler ranks them. When every
+    render slot is busy and a more urgent job is waiting to render, the
+    least urgent running render is stopped at its next chunk boundary and
+    requeued; its finished chunks are reused when it resumes.
+
+    Queue depth and running stages per group are kept up to date in
+    pipeline.metrics for the metrics endpoint (see main()).
+    """
+
+    def __init__(self, database: Path = JOB_DATABASE, limits: Optional[Dict[str, int]] = None,
+                 lease_seconds: float = DEFAULT_LEASE_SECONDS, poll_seconds: float = DEFAULT_POLL_SECONDS,
+                 max_failures: int = DEFAULT_MAX_FAILURES, retry_delay: float = DEFAULT_RETRY_DELAY,
+                 shared: bool = False, exit_when_idle: bool = False, worker_id: Optional[str] = None):
+        self.database = Path(database)
+        self.limits = dict(DEFAULT_STAGE_LIMITS, **(limits or {}))
+        self.lease_seconds = lease_seconds
+        self.poll_seconds = poll_seconds
+        self.max_failures = max_failures
+        self.retry_delay = retry_delay
+        self.shared = shared
+        self.exit_when_idle = exit_when_idle
+        self.worker_id = worker_id or get_worker_id()
+
+        self.stop_event = threading.Event()
+        self.lock = threading.Lock()
+        self.active: Dict[str, set] = {group: set() for group in STAGE_GROUPS}
+        self.yield_events: Dict[str, threading.Event] = {}
+        self.scheduler: Optional[Scheduler] = None
+        self.completed = 0
+
+    def open_store(self) -> JobStore:
+        """Open a connection to the job database (one per thread)"""
+        return JobStore(self.database, shared=self.shared)
+
+    def stop(self):
+        """Stop claiming jobs; stages already running are finished first"""
+        self.stop_event.set()
+
+    def log(self, message: str):
+        print(f"[{self.worker_id}] {message}", flush=True)
+
+    def held_jobs(self) -> List[str]:
+        """Get the ids of the jobs this worker is running"""
+        with self.lock:
+            return [job_id for jobs in self.active.values() for job_id in jobs]
+
+    def run(self) -> int:
+        """
+        Claim and run jobs until stopped (or until idle with exit_when_idle)
+
+        Returns:
+            Number of stage groups run
+        """
+        pools = {
+            group: ThreadPoolExecutor(max_workers=limit, thread_name_prefix=f"{group}-stage")
+            for group, limit in self.limits.items() if group in STAGE_GROUPS and limit > 0
+        }
+        store = self.open_store()
+        self.scheduler = Scheduler(store)
+        self.log(f"Started ({', '.join(f'{group}={self.limits[group]}' for group in pools)})")
+
+        last_heartbeat = time.monotonic()
+        last_metrics = 0.0
+        try:
+            while True:
+                claimed = False if self.stop_event.is_set() else self.claim_jobs(store, pools)
+
+                if time.monotonic() - last_metrics >= self.poll_seconds:
+                    self.update_metrics(store, pools)
+                    last_metrics = time.monotonic()
+
+                if time.monotonic() - last_heartbeat >= self.lease_seconds / 3:
+                    self.heartbeat(store)
+                    last_heartbeat = time.monotonic()
+
+                # Keep heartbeating while stopping so running stages keep their leases
+                if not self.held_jobs() and (self.stop_event.is_set() or (self.exit_when_idle and not claimed)):
+                    break
+                if not claimed:
+                    self.stop_event.wait(self.poll_seconds)
+        finally:
+            for pool in pools.values():
+                pool.shutdown(wait=True)
+            store.close()
+
+        self.log(f"Stopped after {self.completed} stage group(s)")
+        return self.completed
+
+    def claim_jobs(self, store: JobStore, pools: Dict[str, ThreadPoolExecutor]) -> bool:
+        """Fill every free stage slot with a claimed job; True if any job was claimed"""
+        self.scheduler.refresh()
+        claimed = False
+        for group, pool in pools.items():
+            while len(self.active[group]) < self.limits[group]:
+                job = store.claim_job(self.worker_id, group, self.lease_seconds, max_failures=self.max_failures,
+                                      retry_delay=self.retry_delay, choose=self.scheduler.choose)
+                if job is None:
+                    break
+                with self.lock:
+                    self.active[group].add(job['id'])
+                    self.yield_events[job['id']] = threading.Event()
+                pool.submit(self.run_stage, group, job['id'])
+                claimed = True
+
+        if 'render' in pools:
+            self.preempt_render(store)
+        return claimed
+
+    def preempt_render(self, store: JobStore):
+        """Stop the least urgent running render if every slot is busy and a more urgent job waits"""
+        with self.lock:
+            if len(self.active['render']) < self.limits['render']:
+                return
+            running = [job_id for job_id in self.active['render'] if not self.yield_events[job_id].is_set()]
+        if not running:
+            return
+
+        waiting = self.scheduler.choose(store.list_claimable('render', self.max_failures, self.retry_delay))
+        if waiting is None:
+            return
+        running = [info for info in (store.get_schedule_info(job_id) for job_id in running) if info]
+        if not running:
+            return
+        victim = max(running, key=self.scheduler.sort_key)
+        if self.scheduler.should_preempt(waiting, victim, 'render'):
+            with self.lock:
+                event = self.yield_events.get(victim['id'])
+            if event:
+                self.log(f"Job {victim['id']}: stopping render at the next chunk for job {waiting['id']}")
+                event.set()
+
+    def update_metrics(self, store: JobStore, pools: Dict[str, ThreadPoolExecutor]):
+        """Update the queue depth and running stage gauges"""
+        for group in pools:
+            QUEUE_DEPTH.set(group, value=len(store.list_claimable(group, self.max_failures, self.retry_delay)))
+            with self.lock:
+                STAGES_RUNNING.set(group, value=len(self.active[group]))
+
+    def heartbeat(self, store: JobStore):
+        """Renew the leases of every job this worker is running"""
+        for job_id in self.held_jobs():
+            if not store.renew_lease(job_id, self.worker_id, self.lease_seconds):
+                self.log(f"Lost the lease on job {job_id}; another worker may be running it")
+
+    def run_stage(self, group: str, job_id: str):
+        """Run one stage group of a claimed job (in a pool thread)"""
+        store = self.open_store()
+        try:
+            self.log(f"Job {job_id}: running {group}")
+            try:
+                result = run_job(store, job_id, groups=(group,), should_yield=self.yield_events[job_id].is_set)
+            except Exception as e:
+                STAGE_FAILURES.inc(group)
+                store.fail_job(job_id, str(e))
+                result = {'status': 'error', 'error': str(e)}
+
+            if result.get('preempted'):
+                self.log(f"Job {job_id}: {group} preempted, requeued")
+            elif result['status'] == 'error':
+                self.log(f"Job {job_id}: {group} failed: {result.get('error')}")
+            elif result['status'] == 'ok':
+                self.log(f"Job {job_id}: done")
+            store.release_job(job_id, self.worker_id)
+        finally:
+            store.close()
+            with self.lock:
+                self.active[group].discard(job_id)
+                self.yield_events.pop(job_id, None)
+                self.completed += 1
+
+
+def parse_limits(values: List[str]) -> Dict[str, int]:
+    """Parse GROUP=COUNT stage limits for argparse"""
+    limits = {}
+    for value in values:
+        group, _, count = value.partition('=')
+        if group not in STAGE_GROUPS or not count.isdigit():
+            raise argparse.ArgumentTypeError(
+                f"invalid stage limit '{value}' (use GROUP=COUNT with a group from {', '.join(STAGE_GROUPS)})")
+        limits[group] = int(count)
+    return limits
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command line parser"""
+    parser = argparse.ArgumentParser(
+        prog='python -m pipeline.worker',
+        description="Run queued jobs from the job store. Start one worker per host; "
+                    "workers sharing a database split the jobs between them."
+    )
+    parser.add_argument('--database', default=str(JOB_DATABASE), help="Job database file")
+    parser.add_argument('--shared', action='store_true',
+                        help="The database is on a network filesystem used by several hosts")
+    parser.add_argument('--limit', action='append', default=[], metavar='GROUP=COUNT',
+                        help="Concurrent stages for a stage group (fetch, tts, render); repeatable")
+    parser.add_argument('--lease', type=float, default=DEFAULT_LEASE_SECONDS,
+                        help="Seconds before a job held by an unresponsive worker is reclaimed")
+    parser.add_argument('--poll', type=float, default=DEFAULT_POLL_SECONDS,
+                        help="Seconds between checks for new jobs when idle")
+    parser.add_argument('--max-failures', type=int, default=DEFAULT_MAX_FAILURES,
+                        help="Failures after which a job is no longer retried")
+    parser.add_argument('--retry-delay', type=float, default=DEFAULT_RETRY_DELAY,
+                        help="Seconds to wait before retrying a failed job")
+    parser.add_argument('--drain', action='store_true', help="Exit once there are no jobs left to claim")
+    parser.add_argument('--metrics-port', type=int,
+                        help="Serve metrics in the Prometheus text format on this port (0 picks a free one)")
+    parser.add_argument('--metrics-host', default=DEFAULT_METRICS_HOST,
+                        help="Address the metrics endpoint listens on")
+    parser.add_argument('--metrics-file', nargs='?', const=str(METRICS_SNAPSHOT),
+                        help=f"Write a JSON metrics snapshot to this file periodically (default {METRICS_SNAPSHOT})")
+    parser.add_argument('--metrics-interval', type=float, default=DEFAULT_SNAPSHOT_INTERVAL,
+                        help="Seconds between metrics snapshots")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run a worker until interrupted, returning the process exit code"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        limits = parse_limits(args.limit)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+    if args.lease <= 0 or args.poll <= 0 or args.metrics_interval <= 0:
+        parser.error("--lease, --poll and --metrics-interval must be positive")
+
+    worker = Worker(
+        database=Path(args.database),
+        limits=limits,
+        lease_seconds=args.lease,
+        poll_seconds=args.poll,
+        max_failures=args.max_failures,
+        retry_delay=args.retry_delay,
+        shared=args.shared,
+        exit_when_idle=args.drain
+    )
+
+    # First signal finishes the running stages, a second one exits immediately
+    def handle_signal(signum, frame):
+        if worker.stop_event.is_set():
+            raise KeyboardInterrupt
+        worker.log("Stopping after the running stages finish (interrupt again to quit now)")
+        worker.stop()
+
+    signal.signal(signal.SIGINT, handle_signal)
+    if hasattr(signal, 'SIGTERM'):
+        signal.signal(signal.SIGTERM, handle_signal)
+
+    exporter = None
+    if args.metrics_port is not None or args.metrics_file:
+        try:
+            exporter = MetricsExporter(port=args.metrics_port, host=args.metrics_host,
+                                       snapshot_path=args.metrics_file,
+                                       snapshot_interval=args.metrics_interval).start()
+        except OSError as e:
+            parser.error(f"could not serve metrics on {args.metrics_host}:{args.metrics_port}: {str(e)}")
+        if exporter.server is not None:
+            worker.log(f"Serving metrics on http://{args.metrics_host}:{exporter.port}/metrics")
+
+    try:
+        worker.run()
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        if exporter is not None:
+            exporter.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+import os
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+# Tests import the project's top-level packages (pipeline, video, tts) and modules (boot, utils)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def make_create_video_page(files):
+    """Stand-in for pages.create_video that succeeds at every stage without network, TTS or FFmpeg"""
+    page = types.ModuleType('pages.create_video')
+    page.load_video_config = lambda: {}
+    page.load_reddit_config = lambda: {}
+    page.extract_post_info_from_url = lambda url: ('abc123', 'AskReddit') if '/comments/' in url else (None, None)
+    page.create_temp_directory = lambda: Path('.')
+    page.generate_cache_filename = lambda post_id, author: f"{post_id}.json"
+    page.fetch_reddit_post_data = lambda post_id, config: (True, {'author': 'someone', 'title': 'Title'})
+    page.process_video_content = lambda post_data, index: {'type': 'post_description', 'title': 'Title'}
+    page.prepare_audio_segments = lambda content: [{'filename_suffix': 'title', 'text': 'Title', 'type': 'title'}]
+
+    def generate_tts_audio(content, segments=None, completed=None, on_segment=None):
+        for segment, file_info in zip(segments, files):
+            on_segment(segment, file_info)
+        return True, {'files': files, 'failed_count': 0, 'service_used': 'GTTS',
+                      'base_filename': 'audio_abc123', 'message': "ok"}
+
+    page.generate_tts_audio = generate_tts_audio
+    page.generate_video = lambda tts_result, video_config=None, should_yield=None: (True, {
+        'outputs': {'16:9': 'output/video_abc123.mp4'}, 'duration': 1.0, 'preset': 'standard', 'frames': 30
+    })
+    return page
+
+
+@pytest.fixture
+def install_create_video_page(monkeypatch):
+    """Install a stand-in pages.create_video (see make_create_video_page) for the given audio files"""
+    def install(files):
+        page = make_create_video_page(files)
+        package = types.ModuleType('pages')
+        package.create_video = page
+        monkeypatch.setitem(sys.modules, 'pages', package)
+        monkeypatch.setitem(sys.modules, 'pages.create_video', page)
+        return page
+    return install
@@ -0,0 +1,47 @@
+import sys
+
+import pytest
+
+import boot
+
+
+def test_marker_excludes_other_platforms():
+    assert boot.check_requirement('no-such-distribution; sys_platform == "no-such-platform"') is None
+    assert boot.check_requirement(f'no-such-distribution; sys_platform == "{sys.platform}"') is not None
+
+
+def test_marker_compares_python_versions():
+    environment = {'python_version': '3.12', 'sys_platform': 'linux'}
+
+    assert boot.marker_applies('python_version >= "3.9"', environment)
+    assert not boot.marker_applies('python_version < "3.10"', environment)
+    assert boot.marker_applies('python_version < "3.10" or sys_platform == "linux"', environment)
+    assert not boot.marker_applies('python_version >= "3.9" and sys_platform == "win32"', environment)
+    assert boot.marker_applies('sys_platform not in "win32 cygwin"', environment)
+    assert boot.marker_applies('extra == "test"', environment) is None
+
+
+def test_parse_version_orders_like_pep_440():
+    versions = ['1.0.dev1', '1.0a1', '1.0b2', '1.0rc1', '1.0', '1.0.post1', '1.1', '2.0']
+
+    assert sorted(versions, key=boot.parse_version) == versions
+    assert boot.parse_version('1.0') == boot.parse_version('1.0.0') == boot.parse_version('v1.0+local')
+    assert boot.parse_version('not a version') is None
+
+
+@pytest.mark.parametrize('version, operator, specified, expected', [
+    ('2.31.0', '>=', '2.31.0', True),
+    ('2.30.9', '>=', '2.31.0', False),
+    ('2.0', '==', '2.0.0', True),
+    ('2.0rc1', '<', '2.0', True),
+    ('1.2.5', '==', '1.2.*', True),
+    ('1.20', '==', '1.2.*', False),
+    ('1.20', '!=', '1.2.*', True),
+    ('2.2.5', '~=', '2.2.1', True),
+    ('2.3.0', '~=', '2.2.1', False),
+    ('2.2.0', '~=', '2.2.1', False),
+    ('1.0', '===', '1.0.0', False),
+    ('garbage', '>=', '1.0', False),
+])
+def test_version_matches(version, operator, specified, expected):
+    assert boot.version_matches(version, operator, specified) is expected
@@ -0,0 +1,59 @@
+from video.captions import break_caption_lines, build_caption_cues, export_captions
+
+WORDS = "the quick brown fox jumps over the lazy dog again and again".split()
+
+
+def test_break_caption_lines_balances_two_lines():
+    assert break_caption_lines("one two three four".split(), 12) == ["one two", "three four"]
+    assert break_caption_lines(["unbreakable"], 5) == ["unbreakable"]
+
+
+def test_cues_honour_more_than_two_lines():
+    files = [{'filename': 'title.mp3', 'duration': 3.0, 'text': " ".join(WORDS)}]
+
+    two_line_cues = list(build_caption_cues(files, max_line_chars=20, max_lines=2, max_cue_ms=10000))
+    three_line_cues = list(build_caption_cues(files, max_line_chars=20, max_lines=3, max_cue_ms=10000))
+
+    assert max(len(cue['lines']) for cue in two_line_cues) == 2
+    assert len(three_line_cues) == 1
+    assert three_line_cues[0]['lines'] == ["the quick brown fox", "jumps over the lazy", "dog again and again"]
+
+
+def test_cues_split_at_sentence_ends():
+    files = [{'filename': 'title.mp3', 'duration': 2.0, 'text': "Hello there. General Kenobi!"}]
+
+    cues = list(build_caption_cues(files))
+
+    assert [cue['lines'] for cue in cues] == [["Hello there."], ["General Kenobi!"]]
+    assert cues[0]['end_ms'] == cues[1]['start_ms']
+
+
+def test_cues_respect_maximum_duration():
+    files = [{'filename': 'body.mp3', 'duration': 10.0, 'text': " ".join(["word"] * 20)}]
+
+    cues = list(build_caption_cues(files, max_cue_ms=2000))
+
+    assert len(cues) > 1
+    assert all(cue['end_ms'] - cue['start_ms'] <= 2000 for cue in cues)
+    assert all(len(line) <= 28 for cue in cues for line in cue['lines'])
+
+
+def test_export_srt_and_vtt(tmp_path):
+    files = [{'filename': 'title.mp3', 'duration': 2.0, 'text': "Hello there. General Kenobi!"},
+             {'filename': 'body.mp3', 'duration': 3661.5, 'text': "Hi"}]
+
+    paths = export_captions(files, str(tmp_path / "captions" / "audio_abc123"), formats=('srt', 'vtt'))
+
+    with open(paths['srt'], encoding='utf-8') as f:
+        assert f.read() == (
+            "1\n00:00:00,000 --> 00:00:00,896\nHello there.\n\n"
+            "2\n00:00:00,896 --> 00:00:02,000\nGeneral Kenobi!\n\n"
+            "3\n00:00:02,000 --> 01:01:03,500\nHi\n\n"
+        )
+    with open(paths['vtt'], encoding='utf-8') as f:
+        assert f.read() == (
+            "WEBVTT\n\n"
+            "00:00:00.000 --> 00:00:00.896 line:80% align:center\nHello there.\n\n"
+            "00:00:00.896 --> 00:00:02.000 line:80% align:center\nGeneral Kenobi!\n\n"
+            "00:00:02.000 --> 01:01:03.500 line:80% align:center\nHi\n\n"
+        )
@@ -0,0 +1,41 @@
+import json
+
+import pytest
+
+from pipeline.cli import main, EXIT_OK, EXIT_PARTIAL, EXIT_USAGE, EXIT_FAILED
+
+URL = "https://www.reddit.com/r/AskReddit/comments/abc123/title/"
+INVALID_URL = "https://example.com/not-a-post"
+
+
+@pytest.fixture
+def run_cli(tmp_path, monkeypatch, install_create_video_page):
+    monkeypatch.chdir(tmp_path)
+    install_create_video_page([{'filename': 'title.mp3', 'duration': 1.5}])
+
+    def run(*args):
+        return main(['--database', str(tmp_path / "jobs.sqlite3"), *args])
+    return run
+
+
+def test_all_jobs_succeed(run_cli, capsys):
+    assert run_cli('--sequential', URL) == EXIT_OK
+    assert json.loads(capsys.readouterr().out)['status'] == 'ok'
+
+
+def test_some_jobs_fail(run_cli, capsys):
+    assert run_cli(URL, INVALID_URL) == EXIT_PARTIAL
+    results = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert sorted(result['status'] for result in results) == ['error', 'ok']
+
+
+def test_all_jobs_fail(run_cli):
+    assert run_cli('--sequential', INVALID_URL) == EXIT_FAILED
+
+
+@pytest.mark.parametrize('args', [(), ('--preset', 'no-such-preset', URL), ('--type', 'no-such-type', URL),
+                                  ('--limit', 'render', URL)])
+def test_invalid_arguments(run_cli, args):
+    with pytest.raises(SystemExit) as exit_info:
+        run_cli(*args)
+    assert exit_info.value.code == EXIT_USAGE
@@ -0,0 +1,48 @@
+from video import compositor
+
+
+class FakeProcess:
+    def __init__(self):
+        self.killed = False
+
+    def kill(self):
+        self.killed = True
+
+
+def test_render_chunk_stops_decoder_when_encoder_missing(monkeypatch):
+    decoder = FakeProcess()
+    monkeypatch.setattr(compositor, 'open_background_decoder', lambda *args: decoder)
+
+    def open_encoder(*args):
+        raise FileNotFoundError('ffmpeg')
+
+    monkeypatch.setattr(compositor, 'open_encoder', open_encoder)
+    job = {
+        'entries': [], 'start_frame': 0, 'end_frame': 1, 'fps': 30, 'background_path': None,
+        'background_start': 0.0, 'encoder_args': [],
+        'outputs': [{'aspect': '16:9', 'frame_size': (64, 36), 'card_width': 48, 'card_source_width': 48,
+                     'output_path': 'chunk.mp4', 'audio_path': None}]
+    }
+
+    assert compositor.render_chunk(job) == (False, "FFmpeg not found in PATH")
+    assert decoder.killed
+
+
+def test_single_chunk_render_can_be_preempted(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    def render_chunk(job):
+        for output in job['outputs']:
+            open(output['output_path'], 'wb').close()
+        return True, None
+
+    monkeypatch.setattr(compositor, 'render_chunk', render_chunk)
+    timeline = [{'file': {}, 'start': 0.0, 'end': 1.0, 'duration': 1.0}]
+    specs = [{'aspect': '16:9', 'frame_size': (64, 36), 'card_width': 48, 'card_source_width': 48}]
+
+    success, error = compositor.render_incremental(timeline, specs, {'16:9': 'out.mp4'}, 30, [], None, 0.0,
+                                                   'narration.wav', 1, should_yield=lambda: True)
+
+    assert (success, error) == (False, compositor.RENDER_PREEMPTED)
+    # The finished chunk is kept for the next attempt
+    assert list((tmp_path / 'temp').rglob('*_16x9.mp4'))
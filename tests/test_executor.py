@@ -0,0 +1,24 @@
+import pytest
+
+from pipeline import JobStore
+from pipeline.executor import PipelineExecutor
+from pipeline.scheduler import Scheduler
+
+
+@pytest.fixture
+def store(tmp_path):
+    with JobStore(tmp_path / "jobs.sqlite3") as job_store:
+        yield job_store
+
+
+def test_stop_markers_sort_after_every_job(store):
+    executor = PipelineExecutor(lambda: store)
+    executor.scheduler = Scheduler(store)
+    job_id = store.create_job("https://www.reddit.com/r/AskReddit/comments/abc123/title/", 'post_description',
+                              priority=-1000)
+
+    # A stop marker queued before a job must still come out after it
+    stop = executor._stop_item()
+    items = [executor._queue_item(store, 'missing'), executor._queue_item(store, job_id)]
+
+    assert all(item < stop for item in items)
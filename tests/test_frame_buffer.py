@@ -0,0 +1,97 @@
+import io
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from video.frame_buffer import FrameCompositor, premultiply_overlay, read_frame_into
+
+
+def make_card(width, height, colour, alpha):
+    card = np.empty((height, width, 4), dtype=np.uint8)
+    card[..., :3] = colour
+    card[..., 3] = alpha
+    return card
+
+
+def reference_blend(background, card):
+    alpha = card[..., 3:4].astype(np.float64) / 255
+    return background * (1 - alpha) + card[..., :3] * alpha
+
+
+@pytest.mark.parametrize('alpha', [0, 1, 64, 128, 200, 254, 255])
+def test_blend_stays_within_one_level_of_exact(alpha):
+    rng = np.random.default_rng(alpha)
+    background = rng.integers(0, 256, (8, 8, 3), dtype=np.uint8)
+    card = make_card(8, 8, rng.integers(0, 256, 3), alpha)
+    compositor = FrameCompositor((8, 8))
+    compositor.set_background(background)
+    compositor.set_overlay(premultiply_overlay(card))
+
+    frame = compositor.compose()
+
+    assert np.abs(frame.astype(np.float64) - reference_blend(background, card)).max() <= 1.0
+
+
+def test_opaque_and_transparent_overlays_are_exact():
+    background = np.full((4, 4, 3), 37, dtype=np.uint8)
+    compositor = FrameCompositor((4, 4))
+
+    compositor.set_background(background)
+    compositor.set_overlay(premultiply_overlay(make_card(4, 4, (255, 0, 200), 255)))
+    assert (compositor.compose() == (255, 0, 200)).all()
+
+    compositor.set_background(background)
+    compositor.set_overlay(premultiply_overlay(make_card(4, 4, (255, 0, 200), 0)))
+    assert (compositor.compose() == 37).all()
+
+
+def test_overlay_is_clipped_to_the_frame():
+    compositor = FrameCompositor((6, 4))
+    compositor.set_background(np.zeros((4, 6, 3), dtype=np.uint8))
+    compositor.set_overlay(premultiply_overlay(make_card(4, 4, (255, 255, 255), 255)), x=4, y=2)
+
+    frame = compositor.compose()
+
+    assert (frame[2:, 4:] == 255).all()
+    assert frame[:2].sum() == 0 and frame[:, :4].sum() == 0
+
+
+def test_overlay_outside_the_frame_is_ignored():
+    compositor = FrameCompositor((4, 4))
+    compositor.set_background(np.zeros((4, 4, 3), dtype=np.uint8))
+    compositor.set_overlay(premultiply_overlay(make_card(2, 2, (255, 255, 255), 255)), x=4, y=0)
+
+    assert compositor.compose().sum() == 0
+
+
+def test_static_background_restores_uncovered_area():
+    compositor = FrameCompositor((6, 2), static_background=True)
+    compositor.set_background(np.full((2, 6, 3), 10, dtype=np.uint8))
+    overlay = premultiply_overlay(make_card(2, 2, (200, 200, 200), 255))
+
+    compositor.set_overlay(overlay, x=0, y=0)
+    compositor.compose()
+    compositor.set_overlay(overlay, x=4, y=0)
+    frame = compositor.compose()
+
+    assert (frame[:, :4] == 10).all()
+    assert (frame[:, 4:] == 200).all()
+    assert not compositor.needs_background()
+
+
+def test_read_frame_into_handles_short_reads():
+    class Trickle(io.RawIOBase):
+        def __init__(self, data):
+            self.data = data
+
+        def readinto(self, buffer):
+            count = min(5, len(self.data), len(buffer))
+            buffer[:count] = self.data[:count]
+            self.data = self.data[count:]
+            return count
+
+    buffer = np.empty((2, 4, 3), dtype=np.uint8)
+    assert read_frame_into(Trickle(bytes(range(24))), buffer)
+    assert buffer.ravel().tolist() == list(range(24))
+    assert not read_frame_into(Trickle(bytes(10)), buffer)
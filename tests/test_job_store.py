@@ -0,0 +1,121 @@
+import sqlite3
+import time
+
+import pytest
+
+from pipeline import JobStore
+from pipeline.job_store import SCHEMA, JOB_SCHEMA_VERSION
+
+URL = "https://www.reddit.com/r/AskReddit/comments/abc123/title/"
+
+
+@pytest.fixture
+def store(tmp_path):
+    with JobStore(tmp_path / "jobs.sqlite3") as job_store:
+        yield job_store
+
+
+def add_job_with_audio(store, files):
+    job_id = store.create_job(URL, 'post_description')
+    store.complete_stage(job_id, 'audio_done', tts_result={
+        'files': files, 'failed_count': 0, 'service_used': 'GTTS', 'base_filename': 'audio_abc123'
+    })
+    store.update_job(job_id, status='queued')
+    return job_id
+
+
+def test_schedule_info_with_unmeasured_audio_duration(store):
+    job_id = add_job_with_audio(store, [{'filename': 'title.mp3', 'duration': None},
+                                        {'filename': 'body.mp3', 'duration': 2.5}])
+
+    assert store.get_schedule_info(job_id)['narration_seconds'] == 2.5
+    assert store.claim_job('worker', 'render', 60)['id'] == job_id
+
+
+def test_claim_job_releases_lock_when_choose_fails(store, tmp_path):
+    job_id = store.create_job(URL, 'post_description')
+
+    def choose(candidates):
+        raise ValueError("no ranking")
+
+    with pytest.raises(ValueError):
+        store.claim_job('worker', 'fetch', 60, choose=choose)
+
+    assert not store.connection.in_transaction
+    with JobStore(tmp_path / "jobs.sqlite3") as other:
+        assert other.claim_job('other-worker', 'fetch', 60)['id'] == job_id
+
+
+def test_claim_takes_highest_priority_then_oldest(store):
+    old = store.create_job(URL, 'post_description')
+    new = store.create_job(URL + "?2", 'post_description')
+    urgent = store.create_job(URL + "?3", 'post_description', priority=5)
+
+    claimed = [store.claim_job('worker', 'fetch', 60)['id'] for _ in range(3)]
+
+    assert claimed == [urgent, old, new]
+    assert store.claim_job('worker', 'fetch', 60) is None
+
+
+def test_claim_only_offers_jobs_of_the_group(store):
+    job_id = store.create_job(URL, 'post_description')
+
+    assert store.claim_job('worker', 'tts', 60) is None
+    store.complete_stage(job_id, 'segments_cleaned')
+    assert store.claim_job('worker', 'fetch', 60) is None
+    assert store.claim_job('worker', 'tts', 60)['id'] == job_id
+
+
+def test_expired_lease_can_be_claimed_again(store):
+    job_id = store.create_job(URL, 'post_description')
+    store.claim_job('dead-worker', 'fetch', 60)
+    store.update_job(job_id, status='running')
+
+    assert store.claim_job('worker', 'fetch', 60) is None
+    store.update_job(job_id, lease_expires=time.time() - 1)
+
+    assert store.claim_job('worker', 'fetch', 60)['lease_owner'] == 'worker'
+    assert not store.renew_lease(job_id, 'dead-worker', 60)
+    assert store.renew_lease(job_id, 'worker', 60)
+
+
+def test_release_only_drops_own_lease(store):
+    job_id = store.create_job(URL, 'post_description')
+    store.claim_job('worker', 'fetch', 60)
+
+    store.release_job(job_id, 'other-worker')
+    assert store.get_job(job_id)['lease_owner'] == 'worker'
+    store.release_job(job_id, 'worker')
+    assert store.get_job(job_id)['lease_owner'] is None
+
+
+def test_failed_jobs_are_retried_after_the_delay(store):
+    job_id = store.create_job(URL, 'post_description')
+    store.claim_job('worker', 'fetch', 60)
+    store.release_job(job_id, 'worker')
+    store.fail_job(job_id, "Network error")
+
+    assert store.claim_job('worker', 'fetch', 60, max_failures=0) is None
+    assert store.claim_job('worker', 'fetch', 60, max_failures=2, retry_delay=60) is None
+    assert store.claim_job('worker', 'fetch', 60, max_failures=2, retry_delay=-1)['id'] == job_id
+
+
+def test_migrates_first_schema_version(tmp_path):
+    path = tmp_path / "jobs.sqlite3"
+    connection = sqlite3.connect(str(path))
+    connection.executescript(SCHEMA)
+    connection.execute(
+        "INSERT INTO jobs (id, url, video_type, status, stage, created_at, updated_at) "
+        "VALUES ('old', ?, 'post_description', 'queued', 'queued', 0, 0)", (URL,)
+    )
+    connection.execute("PRAGMA user_version=1")
+    connection.commit()
+    connection.close()
+
+    with JobStore(path) as store:
+        assert store.connection.execute("PRAGMA user_version").fetchone()[0] == JOB_SCHEMA_VERSION
+        job = store.get_job('old')
+        assert (job['priority'], job['failures'], job['lease_owner']) == (0, 0, None)
+        assert store.claim_job('worker', 'fetch', 60)['id'] == 'old'
+        store.record_timing('old', 'fetch', 2.0, 1.0)
+        assert store.get_stage_rates(10)['fetch']['seconds'] == 2.0
@@ -0,0 +1,24 @@
+import tracemalloc
+
+from pipeline.memory import MemoryProfiler
+
+
+def test_profiler_stops_tracemalloc_it_started():
+    profiler = MemoryProfiler('job')
+    profiler.start()
+    assert tracemalloc.is_tracing()
+    profiler.stop()
+
+    assert not tracemalloc.is_tracing()
+
+
+def test_profiler_leaves_tracemalloc_started_elsewhere_running():
+    tracemalloc.start()
+    try:
+        profiler = MemoryProfiler('job')
+        profiler.start()
+        profiler.stop()
+
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
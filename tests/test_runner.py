@@ -0,0 +1,44 @@
+import pytest
+
+from pipeline import JobStore
+from pipeline.runner import run_job
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with JobStore(tmp_path / "jobs.sqlite3") as job_store:
+        yield job_store
+
+
+def test_run_job_completes(store, install_create_video_page):
+    install_create_video_page([{'filename': 'title.mp3', 'duration': 1.5}])
+    job_id = store.create_job("https://www.reddit.com/r/AskReddit/comments/abc123/title/", 'post_description')
+
+    result = run_job(store, job_id)
+
+    assert result['status'] == 'ok'
+    assert result['videos'] == {'16:9': 'output/video_abc123.mp4'}
+    assert store.get_job(job_id)['stage'] == 'rendered'
+
+
+def test_run_job_with_unmeasured_audio_duration(store, install_create_video_page):
+    # generate_tts_audio reports duration None when the audio length cannot be measured
+    install_create_video_page([{'filename': 'title.mp3', 'duration': None}])
+    job_id = store.create_job("https://www.reddit.com/r/AskReddit/comments/abc123/title/", 'post_description')
+
+    result = run_job(store, job_id)
+
+    assert result['status'] == 'ok'
+    assert store.get_job(job_id)['status'] == 'done'
+
+
+def test_run_job_with_invalid_url(store, install_create_video_page):
+    install_create_video_page([{'filename': 'title.mp3', 'duration': 1.5}])
+    job_id = store.create_job("https://example.com/not-a-post", 'post_description')
+
+    result = run_job(store, job_id)
+
+    assert result['status'] == 'error'
+    assert result['error'] == "Invalid Reddit URL format"
+    assert store.get_job(job_id)['failures'] == 1
@@ -0,0 +1,64 @@
+import time
+
+import pytest
+
+from pipeline import JobStore
+from pipeline.scheduler import Scheduler, DEFAULT_STAGE_SECONDS
+
+
+@pytest.fixture
+def store(tmp_path):
+    with JobStore(tmp_path / "jobs.sqlite3") as job_store:
+        yield job_store
+
+
+def make_job(name, priority=0, deadline=None, stage='queued', characters=None, created_at=0.0):
+    return {'id': name, 'priority': priority, 'deadline': deadline, 'stage': stage,
+            'characters': characters, 'narration_seconds': None, 'created_at': created_at}
+
+
+def order(scheduler, *jobs):
+    return [job['id'] for job in scheduler.order(list(jobs))]
+
+
+def test_priority_goes_first(store):
+    scheduler = Scheduler(store)
+
+    assert order(scheduler, make_job('low', deadline=0.0), make_job('high', priority=1)) == ['high', 'low']
+
+
+def test_least_slack_then_no_deadline(store):
+    scheduler = Scheduler(store)
+    now = 1000.0
+    jobs = [make_job('none'), make_job('late', deadline=now + 500), make_job('soon', deadline=now + 200)]
+
+    assert [job['id'] for job in sorted(jobs, key=lambda job: scheduler.sort_key(job, now))] == \
+        ['soon', 'late', 'none']
+
+
+def test_shortest_remaining_work_first(store):
+    scheduler = Scheduler(store)
+
+    assert order(scheduler, make_job('new', created_at=1.0), make_job('rendering', stage='audio_done', created_at=2.0),
+                 make_job('older', created_at=0.5)) == ['rendering', 'older', 'new']
+
+
+def test_estimates_scale_with_recorded_timings(store):
+    store.record_timing('a', 'tts', 10.0, 100.0)
+    store.record_timing('b', 'tts', 30.0, 300.0)
+    scheduler = Scheduler(store)
+
+    assert scheduler.estimate_stage(make_job('job', characters=50), 'tts') == pytest.approx(5.0)
+    # Without a size the mean run is used, and without timings the defaults
+    assert scheduler.estimate_stage(make_job('job'), 'tts') == pytest.approx(20.0)
+    assert scheduler.estimate_stage(make_job('job'), 'render') == DEFAULT_STAGE_SECONDS['render']
+
+
+def test_preempts_for_higher_priority_or_a_deadline_at_risk(store):
+    scheduler = Scheduler(store)
+    running = make_job('running', stage='audio_done')
+
+    assert scheduler.should_preempt(make_job('urgent', priority=1), running, 'render')
+    assert not scheduler.should_preempt(make_job('waiting'), running, 'render')
+    assert scheduler.should_preempt(make_job('due', deadline=time.time() + 60), running, 'render')
+    assert not scheduler.should_preempt(make_job('low', priority=-1, deadline=0.0), running, 'render')
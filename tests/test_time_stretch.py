@@ -0,0 +1,59 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from tts.time_stretch import time_stretch
+
+SAMPLE_RATE = 16000
+
+
+def tone(frequency, seconds=1.0):
+    t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    return (0.5 * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+
+def dominant_frequency(samples):
+    spectrum = np.abs(np.fft.rfft(samples * np.hanning(len(samples))))
+    return np.fft.rfftfreq(len(samples), 1 / SAMPLE_RATE)[np.argmax(spectrum)]
+
+
+@pytest.mark.parametrize('speed', [0.5, 0.8, 1.25, 2.0])
+def test_length_follows_speed(speed):
+    samples = tone(220.0)
+
+    stretched = time_stretch(samples, speed, SAMPLE_RATE)
+
+    assert len(stretched) == round(len(samples) / speed)
+    assert stretched.dtype == np.float32
+
+
+@pytest.mark.parametrize('speed', [0.75, 1.5])
+def test_pitch_is_kept(speed):
+    stretched = time_stretch(tone(440.0), speed, SAMPLE_RATE)
+
+    # FFT bins are 1-2 Hz wide at these lengths
+    assert dominant_frequency(stretched) == pytest.approx(440.0, abs=3.0)
+
+
+def test_level_is_kept():
+    samples = tone(330.0)
+
+    stretched = time_stretch(samples, 1.3, SAMPLE_RATE)
+
+    assert np.abs(stretched).max() <= 0.5 + 1e-3
+    rms = np.sqrt(np.mean(stretched ** 2))
+    assert rms == pytest.approx(np.sqrt(np.mean(samples ** 2)), rel=0.1)
+
+
+def test_unchanged_speed_copies_samples():
+    samples = tone(220.0, 0.1)
+
+    stretched = time_stretch(samples, 1.0, SAMPLE_RATE)
+
+    assert np.array_equal(stretched, samples)
+    assert stretched is not samples
+
+
+def test_speed_must_be_positive():
+    with pytest.raises(ValueError):
+        time_stretch(tone(220.0, 0.1), 0, SAMPLE_RATE)
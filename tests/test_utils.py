@@ -0,0 +1,33 @@
+import io
+import os
+
+import pytest
+
+import utils
+
+posix_only = pytest.mark.skipif(utils.msvcrt is not None, reason="POSIX terminal input")
+
+
+@posix_only
+def test_read_key_without_terminal(monkeypatch):
+    monkeypatch.setattr('sys.stdin', io.StringIO("q\n"))
+
+    assert utils.read_key() == 'q'
+    assert utils.read_key() == utils.KEY_ENTER
+    with pytest.raises(EOFError):
+        utils.read_key()
+
+
+@posix_only
+def test_read_char_after_short_read(monkeypatch):
+    read_fd, write_fd = os.pipe()
+    os.write(write_fd, "é€".encode('utf-8'))
+    os.close(write_fd)
+    # Deliver one byte per read, as a slow terminal might
+    read = os.read
+    monkeypatch.setattr(os, 'read', lambda fd, size: read(fd, 1))
+    try:
+        assert utils._read_char_posix(read_fd) == 'é'
+        assert utils._read_char_posix(read_fd) == '€'
+    finally:
+        os.close(read_fd)
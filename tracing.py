@@ -0,0 +1,234 @@
+import os
+import json
+import time
+import functools
+import contextlib
+import threading
+from pathlib import Path
+from typing import Optional, Dict, List, Callable
+
+
+TRACE_DIRECTORY = Path("temp") / "traces"
+
+# The tracer spans are recorded into, per thread; None while tracing is off
+_local = threading.local()
+
+
+def is_tracing_enabled(video_config: Dict[str, any]) -> bool:
+    """Whether stage timings are traced (the 'trace' setting, off by default)"""
+    return str(video_config.get('trace', False)).lower() in ('true', '1', 'yes', 'on')
+
+
+class Tracer:
+    """
+    Collects timed spans for one job
+
+    Spans are opened with span() in whichever thread the tracer is active
+    in (see tracing()). The trace can be exported as Chrome trace-event
+    JSON, which chrome://tracing and ui.perfetto.dev open, and summarised
+    as a table of where the time went.
+    """
+
+    def __init__(self, name: str, events: Optional[List[Dict[str, any]]] = None):
+        self.name = name
+        self.events: List[Dict[str, any]] = list(events or [])
+        self.lock = threading.Lock()
+
+    def record(self, name: str, category: str, start: float, end: float, args: Optional[Dict[str, any]] = None):
+        """Add a finished span (start and end are Unix times)"""
+        thread = threading.current_thread()
+        event = {
+            'name': name,
+            'cat': category,
+            'ph': 'X',
+            'ts': int(start * 1e6),
+            'dur': max(0, int((end - start) * 1e6)),
+            'pid': os.getpid(),
+            'tid': thread.ident,
+            'thread': thread.name
+        }
+        if args:
+            event['args'] = args
+        with self.lock:
+            self.events.append(event)
+
+    def to_chrome_trace(self) -> Dict[str, any]:
+        """Get the trace in the Chrome trace-event format"""
+        with self.lock:
+            events = [{key: value for key, value in event.items() if key != 'thread'} for event in self.events]
+            threads = {(event['pid'], event['tid']): event['thread'] for event in self.events}
+        metadata = [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}}
+                    for (pid, tid), name in threads.items()]
+        return {'traceEvents': metadata + events, 'displayTimeUnit': 'ms', 'otherData': {'job': self.name}}
+
+    def summarize(self) -> List[Dict[str, any]]:
+        """
+        Total up the spans by name, slowest first
+
+        Returns:
+            List of {'name', 'category', 'count', 'total', 'mean', 'max'} in seconds
+        """
+        totals: Dict[str, Dict[str, any]] = {}
+        with self.lock:
+            for event in self.events:
+                row = totals.setdefault(event['name'], {
+                    'name': event['name'], 'category': event['cat'], 'count': 0, 'total': 0.0, 'max': 0.0
+                })
+                seconds = event['dur'] / 1e6
+                row['count'] += 1
+                row['total'] += seconds
+                row['max'] = max(row['max'], seconds)
+        for row in totals.values():
+            row['mean'] = row['total'] / row['count']
+        return sorted(totals.values(), key=lambda row: row['total'], reverse=True)
+
+    def format_summary(self) -> str:
+        """Format the summary as a plain-text table"""
+        rows = self.summarize()
+        width = max([len(row['name']) for row in rows] + [4])
+        lines = [
+            f"Trace summary: {self.name}",
+            "",
+            f"{'Span':<{width}}  {'Category':<10}  {'Count':>5}  {'Total s':>9}  {'Mean s':>8}  {'Max s':>8}",
+            "-" * (width + 50)
+        ]
+        for row in rows:
+            lines.append(f"{row['name']:<{width}}  {row['category']:<10}  {row['count']:>5}  "
+                         f"{row['total']:>9.3f}  {row['mean']:>8.3f}  {row['max']:>8.3f}")
+        return "\n".join(lines) + "\n"
+
+    def save(self, path_base: str) -> Dict[str, str]:
+        """
+        Write <path_base>.trace.json and <path_base>.timings.txt
+
+        Returns:
+            Dict with the 'trace' and 'summary' paths, empty if writing failed
+        """
+        trace_path = f"{path_base}.trace.json"
+        summary_path = f"{path_base}.timings.txt"
+        try:
+            Path(trace_path).parent.mkdir(parents=True, exist_ok=True)
+            with open(trace_path, 'w', encoding='utf-8') as f:
+                json.dump(self.to_chrome_trace(), f, ensure_ascii=False, default=str)
+            with open(summary_path, 'w', encoding='utf-8') as f:
+                f.write(self.format_summary())
+        except OSError as e:
+            print(f"Warning: Could not save trace: {str(e)}")
+            return {}
+        return {'trace': trace_path, 'summary': summary_path}
+
+    @classmethod
+    def load(cls, name: str, trace_path: str) -> 'Tracer':
+        """Continue a trace saved earlier, e.g. by a previous stage of the same job"""
+        try:
+            with open(trace_path, 'r', encoding='utf-8') as f:
+                trace = json.load(f)
+        except (OSError, ValueError):
+            return cls(name)
+
+        threads = {(event['pid'], event['tid']): event['args']['name']
+                   for event in trace.get('traceEvents', []) if event.get('ph') == 'M'}
+        events = [dict(event, thread=threads.get((event['pid'], event['tid']), str(event['tid'])))
+                  for event in trace.get('traceEvents', []) if event.get('ph') == 'X']
+        return cls(name, events)
+
+
+class Span:
+    """A span being timed; use through span()"""
+
+    __slots__ = ('tracer', 'name', 'category', 'args', 'start')
+
+    def __init__(self, tracer: Tracer, name: str, category: str, args: Dict[str, any]):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start = 0.0
+
+    def __enter__(self) -> 'Span':
+        self.start = time.time()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        self.tracer.record(self.name, self.category, self.start, time.time(), self.args)
+        return False
+
+    def set(self, **args):
+        """Attach more details to the span, e.g. whether a cached result was reused"""
+        self.args.update(args)
+
+
+class NullSpan:
+    """Stand-in returned by span() while tracing is off"""
+
+    __slots__ = ()
+
+    def __enter__(self) -> 'NullSpan':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+NULL_SPAN = NullSpan()
+
+
+def get_tracer() -> Optional[Tracer]:
+    """Get the tracer active in this thread, if any"""
+    return getattr(_local, 'tracer', None)
+
+
+def span(name: str, category: str = 'stage', **args):
+    """
+    Time a block as a span of the active tracer
+
+    With no tracer active this returns a shared no-op object, so leaving
+    spans in hot paths costs one attribute lookup per block.
+
+    Example:
+        with span('tts.synthesize', 'tts', segment='title') as current:
+            ...
+            current.set(reused=True)
+    """
+    tracer = getattr(_local, 'tracer', None)
+    if tracer is None:
+        return NULL_SPAN
+    return Span(tracer, name, category, args)
+
+
+def traced(name: Optional[str] = None, category: str = 'function') -> Callable:
+    """Decorator timing every call of a function as a span"""
+    def decorator(function: Callable) -> Callable:
+        span_name = name or function.__name__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            tracer = getattr(_local, 'tracer', None)
+            if tracer is None:
+                return function(*args, **kwargs)
+            with Span(tracer, span_name, category, {}):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def start_tracing(tracer: Optional[Tracer]) -> Optional[Tracer]:
+    """Make a tracer (or None to stop tracing) active in this thread, returning the previous one"""
+    previous = getattr(_local, 'tracer', None)
+    _local.tracer = tracer
+    return previous
+
+
+@contextlib.contextmanager
+def tracing(tracer: Optional[Tracer]):
+    """Make a tracer active in this thread for a block (None leaves tracing off)"""
+    previous = start_tracing(tracer)
+    try:
+        yield tracer
+    finally:
+        start_tracing(previous)
@@ -18,6 +18,24 @@ from .pyttsx3_module import (
     get_pyttsx3_info
 )
 
+from .audio_io import (
+    read_audio,
+    write_audio,
+    get_audio_duration,
+    test_numpy_availability
+)
+
+from .time_stretch import (
+    time_stretch,
+    stretch_audio_file
+)
+
+from .alignment import (
+    align_words,
+    load_or_create_timing,
+    get_timing_path
+)
+
 __all__ = [
     # gTTS functions
     'create_audio_gtts',
@@ -31,5 +49,16 @@ __all__ = [
     'get_available_voices',
     'get_default_voice',
     'set_voice_properties',
-    'get_pyttsx3_info'
+    'get_pyttsx3_info',
+    
+    # Audio processing functions
+    'read_audio',
+    'write_audio',
+    'get_audio_duration',
+    'test_numpy_availability',
+    'time_stretch',
+    'stretch_audio_file',
+    'align_words',
+    'load_or_create_timing',
+    'get_timing_path'
 ]
\ No newline at end of file
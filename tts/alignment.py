@@ -0,0 +1,174 @@
+import json
+import hashlib
+from typing import Optional, Dict, List
+
+from .audio_io import NUMPY_AVAILABLE, np, read_audio
+
+
+# Bump when the timing file layout or the aligner changes meaningfully
+TIMING_FORMAT_VERSION = 1
+
+# Energy analysis frame hop in milliseconds
+ALIGNMENT_HOP_MS = 10
+
+
+def get_timing_path(audio_path: str) -> str:
+    """Get the path of the timing file stored next to an audio file"""
+    return f"{audio_path}.timing.json"
+
+
+def _text_hash(text: str) -> str:
+    """Hash segment text so timing files are invalidated when the text changes"""
+    return hashlib.md5(text.encode('utf-8')).hexdigest()
+
+
+def _audio_hash(audio_path: str) -> str:
+    """Hash an audio file's contents, which stay the same when the file is rewritten unchanged"""
+    digest = hashlib.md5()
+    with open(audio_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def detect_voiced_frames(samples: "np.ndarray", sample_rate: int,
+                         hop_ms: int = ALIGNMENT_HOP_MS) -> "np.ndarray":
+    """
+    Classify fixed-size frames of speech audio as voiced or silent
+
+    Args:
+        samples: Mono float32 samples
+        sample_rate: Sample rate of the samples
+        hop_ms: Frame size in milliseconds (default: 10)
+
+    Returns:
+        Boolean array with one entry per frame
+    """
+    hop = max(1, int(sample_rate * hop_ms / 1000))
+    n_frames = len(samples) // hop
+    if n_frames == 0:
+        return np.zeros(0, dtype=bool)
+
+    frames = samples[:n_frames * hop].reshape(n_frames, hop)
+    energy = np.sqrt(np.mean(frames * frames, axis=1))
+
+    # Threshold relative to the recording: well above the noise floor, well below speech peaks
+    noise_floor = np.percentile(energy, 10)
+    peak = np.percentile(energy, 95)
+    threshold = max(noise_floor * 3.0, peak * 0.08, 1e-4)
+    voiced = energy > threshold
+
+    # Bridge short dips inside words (stop consonants) so they are not taken as pauses
+    bridge = max(1, 60 // hop_ms)
+    kernel = np.ones(2 * bridge + 1, dtype=np.int32)
+    dilated = np.convolve(voiced.astype(np.int32), kernel, mode='same') > 0
+    closed = np.convolve(dilated.astype(np.int32), kernel, mode='same') == len(kernel)
+    return voiced | closed
+
+
+def align_words(samples: "np.ndarray", sample_rate: int, text: str,
+                hop_ms: int = ALIGNMENT_HOP_MS) -> Dict[str, List]:
+    """
+    Estimate per-word timestamps for narrated text from its audio
+
+    Words are spread over the voiced portion of the recording in proportion
+    to their length, so pauses between sentences are skipped rather than
+    being attributed to the surrounding words.
+
+    Args:
+        samples: Mono float32 samples of the narration
+        sample_rate: Sample rate of the samples
+        text: The exact text that was synthesised
+        hop_ms: Analysis frame size in milliseconds (default: 10)
+
+    Returns:
+        Dict with 'words', 'starts_ms' and 'ends_ms' lists of equal length
+    """
+    words = text.split()
+    if not words:
+        return {'words': [], 'starts_ms': [], 'ends_ms': []}
+
+    voiced = detect_voiced_frames(samples, sample_rate, hop_ms)
+    voiced_index = np.flatnonzero(voiced)
+    if len(voiced_index) == 0:
+        # Nothing above the noise floor; fall back to spreading over the whole clip
+        voiced_index = np.arange(max(1, len(samples) * 1000 // (sample_rate * hop_ms)))
+
+    # Character count is a reasonable proxy for how long a word takes to say
+    weights = np.array([len(word) + 1 for word in words], dtype=np.float64)
+    boundaries = np.concatenate(([0.0], np.cumsum(weights))) / weights.sum()
+    voiced_positions = np.minimum((boundaries * len(voiced_index)).astype(np.int64), len(voiced_index) - 1)
+
+    starts = voiced_index[voiced_positions[:-1]] * hop_ms
+    ends = (voiced_index[np.maximum(voiced_positions[1:] - 1, voiced_positions[:-1])] + 1) * hop_ms
+
+    return {
+        'words': words,
+        'starts_ms': starts.astype(int).tolist(),
+        'ends_ms': ends.astype(int).tolist()
+    }
+
+
+def load_or_create_timing(audio_path: str, text: str) -> Optional[Dict[str, any]]:
+    """
+    Load the cached word timing for an audio file, aligning it if needed
+
+    The timing file is reused while the audio contents and the text are
+    unchanged; it is keyed on a hash of the audio rather than its mtime,
+    since the pipeline copies the audio into place again on every run.
+
+    Args:
+        audio_path: Narration audio file
+        text: The exact text that was synthesised into the audio
+
+    Returns:
+        Timing dict (see align_words) plus 'duration_ms', or None on failure
+    """
+    timing_path = get_timing_path(audio_path)
+
+    try:
+        source = {'md5': _audio_hash(audio_path)}
+    except OSError:
+        print(f"Error: Audio file not found for alignment: {audio_path}")
+        return None
+    text_hash = _text_hash(text)
+
+    try:
+        with open(timing_path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if (cached.get('version') == TIMING_FORMAT_VERSION and
+                cached.get('source') == source and
+                cached.get('text_hash') == text_hash):
+            return cached
+    except (OSError, ValueError):
+        pass
+
+    if not NUMPY_AVAILABLE:
+        print("Error: NumPy is not available. Please install it with: pip install numpy")
+        return None
+
+    audio = read_audio(audio_path)
+    if audio is None:
+        return None
+
+    samples, sample_rate = audio
+    try:
+        timing = align_words(samples, sample_rate, text)
+    except Exception as e:
+        print(f"Error aligning narration: {str(e)}")
+        return None
+
+    timing.update({
+        'version': TIMING_FORMAT_VERSION,
+        'source': source,
+        'text_hash': text_hash,
+        'duration_ms': int(len(samples) * 1000 // sample_rate)
+    })
+
+    try:
+        with open(timing_path, 'w', encoding='utf-8') as f:
+            json.dump(timing, f, ensure_ascii=False, separators=(',', ':'))
+    except OSError as e:
+        print(f"Warning: Could not save timing file {timing_path}: {str(e)}")
+
+    return timing
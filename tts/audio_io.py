@@ -0,0 +1,170 @@
+import os
+import wave
+import subprocess
+from typing import Optional, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    np = None
+
+
+# gTTS streams 24 kHz mono MP3, so decoding at that rate avoids resampling
+DEFAULT_SAMPLE_RATE = 24000
+
+
+def test_numpy_availability() -> bool:
+    """Test if NumPy is available for audio processing"""
+    return NUMPY_AVAILABLE
+
+
+def _read_wav(path: str) -> Tuple["np.ndarray", int]:
+    """Read a PCM WAV file into mono float32 samples"""
+    with wave.open(path, 'rb') as wav_file:
+        channels = wav_file.getnchannels()
+        sample_width = wav_file.getsampwidth()
+        sample_rate = wav_file.getframerate()
+        raw = wav_file.readframes(wav_file.getnframes())
+
+    if sample_width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif sample_width == 2:
+        samples = np.frombuffer(raw, dtype='<i2').astype(np.float32) / 32768.0
+    elif sample_width == 4:
+        samples = np.frombuffer(raw, dtype='<i4').astype(np.float32) / 2147483648.0
+    else:
+        raise ValueError(f"Unsupported WAV sample width: {sample_width} bytes")
+
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+
+    return samples, sample_rate
+
+
+def _read_with_ffmpeg(path: str, sample_rate: int) -> Tuple["np.ndarray", int]:
+    """Decode any FFmpeg-readable audio file into mono float32 samples"""
+    result = subprocess.run(
+        ['ffmpeg', '-v', 'error', '-i', path, '-f', 'f32le', '-ac', '1', '-ar', str(sample_rate), '-'],
+        capture_output=True,
+        check=True
+    )
+    return np.frombuffer(result.stdout, dtype='<f4').copy(), sample_rate
+
+
+def resample(samples: "np.ndarray", source_rate: int, target_rate: int) -> "np.ndarray":
+    """Resample mono audio by linear interpolation (adequate for speech)"""
+    if source_rate == target_rate or len(samples) == 0:
+        return samples
+    target_length = int(round(len(samples) * target_rate / source_rate))
+    positions = np.arange(target_length, dtype=np.float64) * (source_rate / target_rate)
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+
+def read_audio(path: str, sample_rate: Optional[int] = None) -> Optional[Tuple["np.ndarray", int]]:
+    """
+    Read an audio file as mono float32 PCM
+
+    Args:
+        path: Audio file to read (WAV is read natively, other formats via FFmpeg)
+        sample_rate: Target sample rate (default: the file's own rate for WAV, 24000 otherwise)
+
+    Returns:
+        Tuple of (samples, sample_rate), or None if the file could not be read
+    """
+    if not NUMPY_AVAILABLE:
+        print("Error: NumPy is not available. Please install it with: pip install numpy")
+        return None
+
+    try:
+        if path.lower().endswith('.wav'):
+            try:
+                samples, rate = _read_wav(path)
+                if sample_rate and rate != sample_rate:
+                    samples, rate = resample(samples, rate, sample_rate), sample_rate
+                return samples, rate
+            except (wave.Error, ValueError):
+                # Some engines write float or compressed WAV; let FFmpeg handle those
+                pass
+        return _read_with_ffmpeg(path, sample_rate or DEFAULT_SAMPLE_RATE)
+    except Exception as e:
+        print(f"Error reading audio file {path}: {str(e)}")
+        return None
+
+
+def write_audio(path: str, samples: "np.ndarray", sample_rate: int) -> bool:
+    """
+    Write mono float32 PCM to an audio file
+
+    Args:
+        path: Destination file (WAV is written natively, other formats via FFmpeg)
+        samples: Mono float32 samples in the range -1.0 to 1.0
+        sample_rate: Sample rate of the samples
+
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    if not NUMPY_AVAILABLE:
+        print("Error: NumPy is not available. Please install it with: pip install numpy")
+        return False
+
+    try:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        clipped = np.clip(samples, -1.0, 1.0)
+
+        if path.lower().endswith('.wav'):
+            pcm = (clipped * 32767.0).astype('<i2')
+            with wave.open(path, 'wb') as wav_file:
+                wav_file.setnchannels(1)
+                wav_file.setsampwidth(2)
+                wav_file.setframerate(sample_rate)
+                wav_file.writeframes(pcm.tobytes())
+        else:
+            subprocess.run(
+                ['ffmpeg', '-v', 'error', '-y', '-f', 'f32le', '-ar', str(sample_rate), '-ac', '1',
+                 '-i', '-', path],
+                input=clipped.astype('<f4').tobytes(),
+                capture_output=True,
+                check=True
+            )
+        return True
+    except Exception as e:
+        print(f"Error writing audio file {path}: {str(e)}")
+        return False
+
+
+def get_audio_duration(path: str) -> Optional[float]:
+    """
+    Measure the duration of an audio file in seconds
+
+    Args:
+        path: Audio file to measure
+
+    Returns:
+        Duration in seconds, or None if it could not be determined
+    """
+    try:
+        if path.lower().endswith('.wav'):
+            with wave.open(path, 'rb') as wav_file:
+                return wav_file.getnframes() / float(wav_file.getframerate())
+    except (wave.Error, EOFError, OSError):
+        pass
+
+    try:
+        result = subprocess.run(
+            ['ffprobe', '-v', 'error', '-show_entries', 'format=duration',
+             '-of', 'default=noprint_wrappers=1:nokey=1', path],
+            capture_output=True,
+            text=True,
+            timeout=10
+        )
+        if result.returncode == 0 and result.stdout.strip():
+            return float(result.stdout.strip())
+    except Exception:
+        pass
+
+    return None
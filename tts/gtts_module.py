@@ -3,6 +3,8 @@ import os
 import tempfile
 from typing import Optional, Dict, List
 
+from tracing import span
+
 try:
     from gtts import gTTS
     GTTS_AVAILABLE = True
@@ -72,7 +74,8 @@ def create_audio_gtts(text: str, output_path: str, language: str = 'en',
         # Save to temporary file first
         with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as tmp_file:
             temp_path = tmp_file.name
-            tts.save(temp_path)
+            with span('gtts.request', 'tts', characters=len(text)):
+                tts.save(temp_path)
         
         # Move to final destination
         if os.path.exists(temp_path):
@@ -3,6 +3,8 @@ import os
 import tempfile
 from typing import Optional, Dict, List
 
+from tracing import span
+
 try:
     import pyttsx3
     PYTTSX3_AVAILABLE = True
@@ -87,7 +89,8 @@ def create_audio_pyttsx3(text: str, output_path: str, voice_id: Optional[str] =
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
         
         # Initialize the TTS engine
-        engine = pyttsx3.init()
+        with span('pyttsx3.init', 'tts'):
+            engine = pyttsx3.init()
         
         # Set voice if specified
         if voice_id:
@@ -105,9 +108,10 @@ def create_audio_pyttsx3(text: str, output_path: str, voice_id: Optional[str] =
             temp_path = tmp_file.name
         
         # Save audio to temporary file
-        engine.save_to_file(text, temp_path)
-        engine.runAndWait()
-        engine.stop()
+        with span('pyttsx3.synthesize', 'tts', characters=len(text)):
+            engine.save_to_file(text, temp_path)
+            engine.runAndWait()
+            engine.stop()
         
         # Move to final destination
         if os.path.exists(temp_path) and os.path.getsize(temp_path) > 0:
@@ -0,0 +1,123 @@
+import os
+import shutil
+from typing import Optional
+
+from .audio_io import NUMPY_AVAILABLE, np, read_audio, write_audio
+
+
+# Speeds this close to 1.0 are treated as "unchanged" and the audio is copied as-is
+SPEED_EPSILON = 1e-3
+
+
+def time_stretch(samples: "np.ndarray", speed: float, sample_rate: int,
+                 frame_ms: float = 40.0, tolerance_ms: float = 10.0) -> "np.ndarray":
+    """
+    Change the tempo of speech without changing its pitch (WSOLA)
+
+    Each output frame is taken from around its nominal input position, shifted
+    by up to ``tolerance_ms`` to the offset whose waveform best continues the
+    previously chosen frame. The similarity search for a frame is a single
+    matrix-vector product over a strided view of the input, and the final
+    overlap-add is done for all frames at once.
+
+    Args:
+        samples: Mono float32 samples
+        speed: Playback speed factor (> 1.0 is faster, < 1.0 is slower)
+        sample_rate: Sample rate of the samples
+        frame_ms: Analysis frame length in milliseconds (default: 40)
+        tolerance_ms: Maximum search offset in milliseconds (default: 10)
+
+    Returns:
+        Stretched float32 samples, roughly ``len(samples) / speed`` long
+    """
+    samples = np.asarray(samples, dtype=np.float32)
+    if speed <= 0:
+        raise ValueError("speed must be positive")
+    if abs(speed - 1.0) < SPEED_EPSILON or len(samples) == 0:
+        return samples.copy()
+
+    frame = max(64, int(sample_rate * frame_ms / 1000.0)) // 2 * 2
+    hop_out = frame // 2
+    hop_in = hop_out * speed
+    tolerance = max(1, int(sample_rate * tolerance_ms / 1000.0))
+
+    # Periodic Hann windows at 50% overlap sum to exactly one
+    window = np.hanning(frame + 1)[:-1].astype(np.float32)
+
+    n_frames = max(1, int(np.ceil(len(samples) / hop_in)))
+    padded = np.pad(samples, (tolerance, int(n_frames * hop_in) + frame + 2 * tolerance + hop_out))
+    frames_view = np.lib.stride_tricks.sliding_window_view(padded, frame)
+
+    positions = np.empty(n_frames, dtype=np.int64)
+    positions[0] = tolerance
+    for k in range(1, n_frames):
+        nominal = int(round(k * hop_in)) + tolerance
+        lo = max(0, nominal - tolerance)
+        hi = min(len(frames_view), nominal + tolerance + 1)
+
+        # Only the first half of a frame overlaps the output written so far
+        natural = positions[k - 1] + hop_out
+        template = padded[natural:natural + hop_out]
+        scores = frames_view[lo:hi, :hop_out] @ template
+        positions[k] = lo + int(np.argmax(scores))
+
+    frames = frames_view[positions] * window
+    output = np.zeros((n_frames + 1, hop_out), dtype=np.float32)
+    output[:-1] += frames[:, :hop_out]
+    output[1:] += frames[:, hop_out:]
+
+    norm = np.zeros((n_frames + 1, hop_out), dtype=np.float32)
+    norm[:-1] += window[:hop_out]
+    norm[1:] += window[hop_out:]
+
+    output = output.ravel()
+    norm = norm.ravel()
+    output = np.where(norm > 1e-3, output / np.maximum(norm, 1e-3), output)
+
+    expected_length = int(round(len(samples) / speed))
+    return output[:expected_length]
+
+
+def stretch_audio_file(input_path: str, output_path: str, speed: float = 1.0,
+                       sample_rate: Optional[int] = None) -> bool:
+    """
+    Write a speed-adjusted copy of a synthesised audio file
+
+    Args:
+        input_path: Source audio file (typically a cached TTS render)
+        output_path: Path where to save the adjusted audio file
+        speed: Playback speed factor (default: 1.0, which copies the file)
+        sample_rate: Decode rate for compressed sources (optional)
+
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    if not os.path.exists(input_path):
+        print(f"Error: Source audio file not found: {input_path}")
+        return False
+
+    try:
+        directory = os.path.dirname(output_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        same_format = os.path.splitext(input_path)[1].lower() == os.path.splitext(output_path)[1].lower()
+        if abs(speed - 1.0) < SPEED_EPSILON and same_format:
+            shutil.copyfile(input_path, output_path)
+            return True
+
+        if not NUMPY_AVAILABLE:
+            print("Error: NumPy is not available. Please install it with: pip install numpy")
+            return False
+
+        audio = read_audio(input_path, sample_rate)
+        if audio is None:
+            return False
+
+        samples, rate = audio
+        stretched = time_stretch(samples, speed, rate)
+        return write_audio(output_path, stretched, rate)
+
+    except Exception as e:
+        print(f"Error adjusting audio speed: {str(e)}")
+        return False
@@ -1,6 +1,127 @@
 import os
 import sys
 
+try:
+    import msvcrt
+except ImportError:
+    # POSIX terminals are read through termios instead
+    msvcrt = None
+    import tty
+    import select
+    import termios
+
+# Common key codes returned by read_key (printable keys are returned as the character itself)
+KEY_UP = 'up'
+KEY_DOWN = 'down'
+KEY_LEFT = 'left'
+KEY_RIGHT = 'right'
+KEY_ENTER = 'enter'
+KEY_ESC = 'esc'
+KEY_BACKSPACE = 'backspace'
+KEY_TAB = 'tab'
+KEY_UNKNOWN = 'unknown'
+
+# Second byte after a Windows special-key prefix
+_WINDOWS_SPECIAL_KEYS = {'H': KEY_UP, 'P': KEY_DOWN, 'K': KEY_LEFT, 'M': KEY_RIGHT}
+
+# Final byte of a POSIX ANSI escape sequence (ESC [ X or ESC O X)
+_ANSI_SPECIAL_KEYS = {'A': KEY_UP, 'B': KEY_DOWN, 'D': KEY_LEFT, 'C': KEY_RIGHT}
+
+_CONTROL_KEYS = {
+    '\r': KEY_ENTER, '\n': KEY_ENTER, '\x1b': KEY_ESC,
+    '\x08': KEY_BACKSPACE, '\x7f': KEY_BACKSPACE, '\t': KEY_TAB
+}
+
+# Seconds to wait for the rest of an escape sequence before treating ESC as a key press
+_ESCAPE_SEQUENCE_TIMEOUT = 0.05
+
+def _read_key_windows():
+    """Read one key press with msvcrt"""
+    char = msvcrt.getwch()
+    if char in ('\x00', '\xe0'):  # Special key prefix (arrows, function keys)
+        return _WINDOWS_SPECIAL_KEYS.get(msvcrt.getwch(), KEY_UNKNOWN)
+    if char == '\x03':
+        raise KeyboardInterrupt
+    return _CONTROL_KEYS.get(char, char)
+
+def _read_char_posix(fd, timeout=None):
+    """Read one UTF-8 character from a terminal in cbreak mode, or None on timeout"""
+    if timeout is not None and not select.select([fd], [], [], timeout)[0]:
+        return None
+    data = os.read(fd, 1)
+    if not data:
+        return None
+    
+    # Read the continuation bytes of a multi-byte character
+    first = data[0]
+    extra = 3 if first >= 0xF0 else 2 if first >= 0xE0 else 1 if first >= 0xC0 else 0
+    # os.read may return fewer bytes than asked for, so keep reading until the character is complete
+    while len(data) < extra + 1:
+        more = os.read(fd, extra + 1 - len(data))
+        if not more:
+            break
+        data += more
+    return data.decode('utf-8', errors='replace')
+
+def _read_key_posix():
+    """Read one key press with termios, decoding arrow-key escape sequences"""
+    try:
+        fd = sys.stdin.fileno()
+        old_settings = termios.tcgetattr(fd)
+    except (termios.error, OSError, ValueError):
+        # Not a terminal (piped or redirected input): read characters as they come
+        char = sys.stdin.read(1)
+        if not char:
+            raise EOFError("No more keyboard input")
+        return _CONTROL_KEYS.get(char, char)
+    try:
+        tty.setcbreak(fd)
+        char = _read_char_posix(fd)
+        if char == '\x1b':
+            # A lone ESC is a key press; ESC [ A etc. is an arrow key
+            prefix = _read_char_posix(fd, _ESCAPE_SEQUENCE_TIMEOUT)
+            if prefix not in ('[', 'O'):
+                return KEY_ESC
+            code = _read_char_posix(fd, _ESCAPE_SEQUENCE_TIMEOUT)
+            # Swallow the rest of longer sequences such as ESC [ 1 ; 5 A
+            while code is not None and not code.isalpha() and code != '~':
+                code = _read_char_posix(fd, _ESCAPE_SEQUENCE_TIMEOUT)
+            return _ANSI_SPECIAL_KEYS.get(code, KEY_UNKNOWN)
+    finally:
+        termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
+    
+    if char is None:
+        raise EOFError("No more keyboard input")
+    return _CONTROL_KEYS.get(char, char)
+
+def read_key():
+    """
+    Wait for a key press and return it as a common key code
+    
+    Arrow keys, Enter, ESC, Backspace and Tab are returned as the KEY_*
+    constants on every platform; any other key is returned as the character
+    typed.
+    """
+    if msvcrt is not None:
+        return _read_key_windows()
+    return _read_key_posix()
+
+def key_available():
+    """Check without blocking whether a key press is waiting to be read"""
+    if msvcrt is not None:
+        return msvcrt.kbhit()
+    
+    fd = sys.stdin.fileno()
+    try:
+        old_settings = termios.tcgetattr(fd)
+    except termios.error:
+        return False  # Not a terminal
+    try:
+        tty.setcbreak(fd)
+        return bool(select.select([fd], [], [], 0)[0])
+    finally:
+        termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
+
 def clear_screen():
     """Clear the terminal screen"""
     os.system('cls' if os.name == 'nt' else 'clear')
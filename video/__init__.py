@@ -0,0 +1,104 @@
+# Video Module
+# Contains caption, compositing and rendering functions
+
+from .timeline import (
+    build_timeline,
+    get_timeline_duration
+)
+
+from .captions import (
+    build_caption_cues,
+    export_captions
+)
+
+from .cards import (
+    render_card,
+    get_card_image,
+    get_scaled_card_image,
+    test_pil_availability
+)
+
+from .frame_buffer import (
+    FrameCompositor,
+    premultiply_overlay
+)
+
+from .presets import (
+    ENCODER_PRESETS,
+    get_encoder_preset,
+    build_encoder_args
+)
+
+from .compositor import (
+    render_video,
+    render_video_aspects,
+    get_output_aspects,
+    get_timeline_frame_rate,
+    get_frame_size,
+    build_narration_track,
+    split_timeline,
+    render_chunk,
+    RENDER_PREEMPTED
+)
+
+from .backgrounds import (
+    ingest_background,
+    ensure_background_library,
+    pick_background_asset,
+    test_ytdlp_availability
+)
+
+from .keyframes import (
+    get_keyframe_index,
+    pick_clip_window,
+    cut_clip,
+    cut_background_window
+)
+
+__all__ = [
+    # Timeline functions
+    'build_timeline',
+    'get_timeline_duration',
+    
+    # Caption functions
+    'build_caption_cues',
+    'export_captions',
+    
+    # Card functions
+    'render_card',
+    'get_card_image',
+    'get_scaled_card_image',
+    'test_pil_availability',
+    
+    # Frame buffer compositing
+    'FrameCompositor',
+    'premultiply_overlay',
+    
+    # Encoder presets
+    'ENCODER_PRESETS',
+    'get_encoder_preset',
+    'build_encoder_args',
+    
+    # Compositor functions
+    'render_video',
+    'render_video_aspects',
+    'get_output_aspects',
+    'get_timeline_frame_rate',
+    'get_frame_size',
+    'build_narration_track',
+    'split_timeline',
+    'render_chunk',
+    'RENDER_PREEMPTED',
+    
+    # Background library functions
+    'ingest_background',
+    'ensure_background_library',
+    'pick_background_asset',
+    'test_ytdlp_availability',
+    
+    # Keyframe index and clip cutter
+    'get_keyframe_index',
+    'pick_clip_window',
+    'cut_clip',
+    'cut_background_window'
+]
@@ -0,0 +1,251 @@
+import os
+import json
+import time
+import random
+import hashlib
+import subprocess
+from pathlib import Path
+from typing import Optional, Dict, List, Tuple
+
+try:
+    import yt_dlp
+    YTDLP_AVAILABLE = True
+except ImportError:
+    YTDLP_AVAILABLE = False
+    yt_dlp = None
+
+from .compositor import get_frame_size
+from .keyframes import get_keyframe_index
+
+
+BACKGROUND_LIBRARY_DIRECTORY = Path("temp") / "backgrounds"
+BACKGROUND_INDEX_FILE = BACKGROUND_LIBRARY_DIRECTORY / "index.json"
+BACKGROUND_DOWNLOAD_DIRECTORY = BACKGROUND_LIBRARY_DIRECTORY / "downloads"
+
+# Seconds between forced keyframes in transcoded footage, so seeks land close to any start
+BACKGROUND_GOP_SECONDS = 2
+
+
+def test_ytdlp_availability() -> bool:
+    """Test if yt-dlp is available for downloading background footage"""
+    return YTDLP_AVAILABLE
+
+
+def load_background_index() -> Dict[str, Dict[str, any]]:
+    """Load the background library index from temp/backgrounds/index.json"""
+    try:
+        with open(BACKGROUND_INDEX_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_background_index(index: Dict[str, Dict[str, any]]) -> bool:
+    """Save the background library index atomically"""
+    try:
+        BACKGROUND_LIBRARY_DIRECTORY.mkdir(parents=True, exist_ok=True)
+        temp_path = BACKGROUND_INDEX_FILE.with_suffix('.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=2)
+        os.replace(temp_path, BACKGROUND_INDEX_FILE)
+        return True
+    except OSError as e:
+        print(f"Error saving background index: {str(e)}")
+        return False
+
+
+def get_background_profile(video_config: Dict[str, any], aspect: str = '16:9') -> str:
+    """Get the profile key (frame size and fps) footage is transcoded for"""
+    width, height = get_frame_size(video_config.get('resolution', '1080p'), aspect)
+    return f"{width}x{height}@{int(video_config.get('fps', 30))}"
+
+
+def get_background_id(source: str, profile: str) -> str:
+    """Get a stable library id for a source in a given profile"""
+    return hashlib.md5(f"{source}|{profile}".encode('utf-8')).hexdigest()[:16]
+
+
+def is_remote_source(source: str) -> bool:
+    """Check whether a background source is a URL rather than a local file"""
+    return source.startswith(('http://', 'https://'))
+
+
+def download_background(url: str) -> Optional[str]:
+    """Download background footage with yt-dlp, returning the local file path"""
+    if not YTDLP_AVAILABLE:
+        print("Error: yt-dlp is not available. Please install it with: pip install yt-dlp")
+        return None
+
+    options = {
+        'format': 'bestvideo[height<=1080][ext=mp4]/bestvideo[height<=1080]/best',
+        'outtmpl': str(BACKGROUND_DOWNLOAD_DIRECTORY / '%(id)s.%(ext)s'),
+        'noplaylist': True,
+        'quiet': True,
+        'no_warnings': True
+    }
+
+    try:
+        BACKGROUND_DOWNLOAD_DIRECTORY.mkdir(parents=True, exist_ok=True)
+        with yt_dlp.YoutubeDL(options) as ydl:
+            info = ydl.extract_info(url, download=True)
+            return ydl.prepare_filename(info)
+    except Exception as e:
+        print(f"Error downloading background footage: {str(e)}")
+        return None
+
+
+def probe_duration(path: str) -> Optional[float]:
+    """Get the duration of a video file in seconds using ffprobe"""
+    try:
+        result = subprocess.run(
+            ['ffprobe', '-v', 'error', '-show_entries', 'format=duration',
+             '-of', 'default=noprint_wrappers=1:nokey=1', path],
+            capture_output=True, text=True, timeout=30
+        )
+        if result.returncode == 0 and result.stdout.strip():
+            return float(result.stdout.strip())
+    except Exception:
+        pass
+    return None
+
+
+def transcode_background(source_path: str, output_path: str, frame_size: Tuple[int, int], fps: int) -> bool:
+    """Transcode footage once to the target frame size and fps with a fixed keyframe interval"""
+    width, height = frame_size
+    gop = fps * BACKGROUND_GOP_SECONDS
+    command = [
+        'ffmpeg', '-v', 'error', '-y', '-i', source_path, '-an',
+        '-vf', f"scale={width}:{height}:force_original_aspect_ratio=increase,crop={width}:{height},fps={fps}",
+        '-c:v', 'libx264', '-preset', 'veryfast', '-crf', '20', '-pix_fmt', 'yuv420p',
+        '-g', str(gop), '-keyint_min', str(gop), '-sc_threshold', '0',
+        '-movflags', '+faststart', output_path
+    ]
+    try:
+        result = subprocess.run(command, capture_output=True)
+        return result.returncode == 0 and os.path.exists(output_path)
+    except FileNotFoundError:
+        print("Error: FFmpeg not found in PATH")
+        return False
+
+
+def ingest_background(source: str, video_config: Dict[str, any], aspect: str = '16:9') -> Tuple[bool, any]:
+    """
+    Add footage to the background library, transcoding and indexing it once
+
+    Args:
+        source: Local video path or a URL that yt-dlp can download
+        video_config: The [video] section of config.toml
+        aspect: Aspect ratio the footage is prepared for (default: '16:9')
+
+    Returns:
+        Tuple of (success, library entry or error message)
+    """
+    profile = get_background_profile(video_config, aspect)
+    background_id = get_background_id(source, profile)
+    index = load_background_index()
+
+    entry = index.get(background_id)
+    if entry and os.path.exists(entry['path']):
+        return True, entry
+
+    if is_remote_source(source):
+        local_source = download_background(source)
+        if not local_source:
+            return False, f"Could not download {source}"
+    else:
+        local_source = source
+        if not os.path.exists(local_source):
+            return False, f"Background file not found: {source}"
+
+    fps = int(video_config.get('fps', 30))
+    frame_size = get_frame_size(video_config.get('resolution', '1080p'), aspect)
+    output_path = str(BACKGROUND_LIBRARY_DIRECTORY / f"{background_id}.mp4")
+
+    BACKGROUND_LIBRARY_DIRECTORY.mkdir(parents=True, exist_ok=True)
+    if not transcode_background(local_source, output_path, frame_size, fps):
+        return False, f"Failed to transcode {source}"
+
+    # Build the persistent keyframe index now so renders never have to scan
+    keyframe_index = get_keyframe_index(output_path)
+    duration = keyframe_index['duration'] if keyframe_index else probe_duration(output_path)
+    if not duration:
+        return False, f"Could not read duration of {source}"
+
+    entry = {
+        'id': background_id,
+        'source': source,
+        'path': output_path,
+        'profile': profile,
+        'width': frame_size[0],
+        'height': frame_size[1],
+        'fps': fps,
+        'duration': duration,
+        'keyframe_count': len(keyframe_index['keyframes']) if keyframe_index else 0,
+        'ingested_at': time.time()
+    }
+
+    # Re-read in case another process ingested something meanwhile
+    index = load_background_index()
+    index[background_id] = entry
+    save_background_index(index)
+    return True, entry
+
+
+def read_background_list(list_path: str) -> List[str]:
+    """Read background sources (paths or URLs, one per line, # for comments)"""
+    try:
+        with open(list_path, 'r', encoding='utf-8') as f:
+            return [line.strip() for line in f if line.strip() and not line.strip().startswith('#')]
+    except OSError:
+        return []
+
+
+def ensure_background_library(video_config: Dict[str, any], aspect: str = '16:9') -> List[Dict[str, any]]:
+    """
+    Ingest any new entries from the configured background list
+
+    Args:
+        video_config: The [video] section of config.toml
+        aspect: Aspect ratio the footage is prepared for (default: '16:9')
+
+    Returns:
+        Library entries available for the current profile
+    """
+    list_path = video_config.get('background_list', 'backgrounds.txt')
+    for source in read_background_list(list_path):
+        success, result = ingest_background(source, video_config, aspect)
+        if not success:
+            print(f"Warning: {result}")
+
+    return get_library_entries(video_config, aspect)
+
+
+def get_library_entries(video_config: Dict[str, any], aspect: str = '16:9') -> List[Dict[str, any]]:
+    """Get library entries transcoded for the current resolution, fps and aspect"""
+    profile = get_background_profile(video_config, aspect)
+    return [entry for entry in load_background_index().values()
+            if entry.get('profile') == profile and os.path.exists(entry.get('path', ''))]
+
+
+def pick_background_asset(duration: float, video_config: Dict[str, any],
+                           aspect: str = '16:9', seed: Optional[str] = None) -> Optional[str]:
+    """
+    Pick a random library asset for a render, preferring ones that need no looping
+
+    Args:
+        duration: Length of the narration in seconds
+        video_config: The [video] section of config.toml
+        aspect: Aspect ratio of the render (default: '16:9')
+        seed: Makes the pick repeatable for the same seed, e.g. a job name (optional)
+
+    Returns:
+        Path of the transcoded asset, or None if the library is empty
+    """
+    entries = get_library_entries(video_config, aspect)
+    if not entries:
+        return None
+
+    long_enough = [entry for entry in entries if entry['duration'] >= duration]
+    candidates = sorted(long_enough or entries, key=lambda entry: entry['id'])
+    chooser = random.Random(seed) if seed is not None else random
+    return chooser.choice(candidates)['path']
@@ -0,0 +1,218 @@
+import os
+from typing import Dict, Iterator, List, Optional
+
+from .timeline import build_timeline
+
+
+# Shorts/Reels overlay the right edge and bottom fifth of a 9:16 frame, so captions
+# stay short enough to fit the central column at a legible size
+CAPTION_MAX_LINE_CHARS = 28
+CAPTION_MAX_LINES = 2
+CAPTION_MAX_CUE_MS = 3000
+
+# ASS layout for a 1080x1920 canvas, clear of the platform UI
+ASS_PLAY_RES = (1080, 1920)
+ASS_MARGINS = {'left': 90, 'right': 160, 'vertical': 420}
+
+SENTENCE_ENDINGS = ('.', '!', '?', ':', ';')
+
+
+def _fallback_word_timing(text: str, duration_ms: int) -> Dict[str, List]:
+    """Spread words over a segment by character count when no alignment exists"""
+    words = text.split()
+    total = sum(len(word) + 1 for word in words) or 1
+
+    starts, ends = [], []
+    position = 0
+    for word in words:
+        starts.append(position * duration_ms // total)
+        position += len(word) + 1
+        ends.append(position * duration_ms // total)
+
+    return {'words': words, 'starts_ms': starts, 'ends_ms': ends}
+
+
+def break_caption_lines(words: List[str], max_line_chars: int = CAPTION_MAX_LINE_CHARS,
+                        max_lines: int = CAPTION_MAX_LINES) -> List[str]:
+    """
+    Break caption words into as few lines no longer than max_line_chars as
+    possible (at most max_lines), as evenly long as possible
+
+    Returns the words as a single line when they do not fit.
+    """
+    text = " ".join(words)
+    if len(text) <= max_line_chars or len(words) < 2:
+        return [text]
+
+    # For each line count, the most even way (least sum of squared lengths)
+    # to put the first n words on that many lines, keyed by n
+    previous = {0: (0, [])}
+    for count in range(1, max_lines + 1):
+        layer = {}
+        for end in range(1, len(words) + 1):
+            for start, (cost, lines) in previous.items():
+                if start >= end:
+                    continue
+                line = " ".join(words[start:end])
+                if len(line) > max_line_chars:
+                    continue
+                if end not in layer or cost + len(line) ** 2 < layer[end][0]:
+                    layer[end] = (cost + len(line) ** 2, lines + [line])
+        if len(words) in layer:
+            return layer[len(words)][1]
+        previous = layer
+
+    return [text]
+
+
+def _fits(words: List[str], max_line_chars: int, max_lines: int) -> bool:
+    """Check whether words fit in a cue without exceeding the line limits"""
+    lines = break_caption_lines(words, max_line_chars, max_lines)
+    return all(len(line) <= max_line_chars for line in lines)
+
+
+def build_caption_cues(files: List[Dict[str, any]], max_line_chars: int = CAPTION_MAX_LINE_CHARS,
+                       max_lines: int = CAPTION_MAX_LINES,
+                       max_cue_ms: int = CAPTION_MAX_CUE_MS,
+                       timeline: Optional[List[Dict[str, any]]] = None) -> Iterator[Dict[str, any]]:
+    """
+    Generate caption cues for the narrated segments in timeline order
+
+    Args:
+        files: The 'files' list returned by generate_tts_audio
+        max_line_chars: Maximum characters per caption line (default: 28)
+        max_lines: Maximum lines per cue (default: 2)
+        max_cue_ms: Maximum duration of a single cue in ms (default: 3000)
+        timeline: Precomputed timeline for the files (optional)
+
+    Yields:
+        Dicts with 'start_ms', 'end_ms' and 'lines'
+    """
+    if timeline is None:
+        timeline = build_timeline(files)
+
+    for entry in timeline:
+        offset_ms = int(entry['start'] * 1000)
+        timing = entry['timing']
+        if not timing or not timing.get('words'):
+            text = entry['file'].get('text') or entry['file'].get('text_preview', '')
+            timing = _fallback_word_timing(text, int(entry['duration'] * 1000))
+
+        words = timing['words']
+        starts = timing['starts_ms']
+        ends = timing['ends_ms']
+
+        cue_start = 0
+        for i in range(len(words)):
+            is_last = i == len(words) - 1
+            next_overflows = not is_last and (
+                not _fits(words[cue_start:i + 2], max_line_chars, max_lines) or
+                ends[i + 1] - starts[cue_start] > max_cue_ms
+            )
+            if is_last or next_overflows or words[i].endswith(SENTENCE_ENDINGS):
+                yield {
+                    'start_ms': offset_ms + starts[cue_start],
+                    'end_ms': offset_ms + max(ends[i], starts[cue_start] + 1),
+                    'lines': break_caption_lines(words[cue_start:i + 1], max_line_chars, max_lines)
+                }
+                cue_start = i + 1
+
+
+def _format_timestamp(ms: int, separator: str) -> str:
+    """Format milliseconds as HH:MM:SS<separator>mmm for SRT and WebVTT"""
+    hours, ms = divmod(ms, 3600000)
+    minutes, ms = divmod(ms, 60000)
+    seconds, ms = divmod(ms, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}{separator}{ms:03d}"
+
+
+def _format_ass_timestamp(ms: int) -> str:
+    """Format milliseconds as H:MM:SS.cc for ASS"""
+    hours, ms = divmod(ms, 3600000)
+    minutes, ms = divmod(ms, 60000)
+    seconds, ms = divmod(ms, 1000)
+    return f"{hours:d}:{minutes:02d}:{seconds:02d}.{ms // 10:02d}"
+
+
+def _ass_header(play_res) -> str:
+    """Build the ASS script header with a safe-area caption style"""
+    width, height = play_res
+    font_size = height // 24
+    return (
+        "[Script Info]\n"
+        "ScriptType: v4.00+\n"
+        f"PlayResX: {width}\n"
+        f"PlayResY: {height}\n"
+        "WrapStyle: 2\n"
+        "\n"
+        "[V4+ Styles]\n"
+        "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, "
+        "Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, "
+        "Shadow, Alignment, MarginL, MarginR, MarginV, Encoding\n"
+        f"Style: Default,Arial,{font_size},&H00FFFFFF,&H00FFFFFF,&H00000000,&H80000000,"
+        f"-1,0,0,0,100,100,0,0,1,{max(2, font_size // 16)},0,2,"
+        f"{ASS_MARGINS['left']},{ASS_MARGINS['right']},{ASS_MARGINS['vertical']},1\n"
+        "\n"
+        "[Events]\n"
+        "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text\n"
+    )
+
+
+def _ass_escape(line: str) -> str:
+    """Neutralise override braces and backslashes, which ASS cannot escape"""
+    return line.replace('\\', '/').replace('{', '(').replace('}', ')')
+
+
+def export_captions(files: List[Dict[str, any]], output_base: str,
+                    formats=('srt', 'vtt', 'ass'), play_res=ASS_PLAY_RES,
+                    timeline: Optional[List[Dict[str, any]]] = None) -> Dict[str, str]:
+    """
+    Write sidecar caption files for a job in a single pass over its cues
+
+    Args:
+        files: The 'files' list returned by generate_tts_audio
+        output_base: Output path without extension (e.g. output/audio_1234abcd)
+        formats: Caption formats to write (default: srt, vtt and ass)
+        play_res: ASS canvas size (default: 1080x1920)
+        timeline: Precomputed timeline for the files (optional)
+
+    Returns:
+        Dict mapping each format to the path that was written
+    """
+    directory = os.path.dirname(output_base)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    paths = {fmt: f"{output_base}.{fmt}" for fmt in formats}
+    handles = {fmt: open(path, 'w', encoding='utf-8') for fmt, path in paths.items()}
+
+    try:
+        if 'vtt' in handles:
+            handles['vtt'].write("WEBVTT\n\n")
+        if 'ass' in handles:
+            handles['ass'].write(_ass_header(play_res))
+
+        for number, cue in enumerate(build_caption_cues(files, timeline=timeline), 1):
+            start, end, lines = cue['start_ms'], cue['end_ms'], cue['lines']
+
+            if 'srt' in handles:
+                handles['srt'].write(
+                    f"{number}\n{_format_timestamp(start, ',')} --> {_format_timestamp(end, ',')}\n"
+                    + "\n".join(lines) + "\n\n"
+                )
+            if 'vtt' in handles:
+                handles['vtt'].write(
+                    f"{_format_timestamp(start, '.')} --> {_format_timestamp(end, '.')} line:80% align:center\n"
+                    + "\n".join(lines) + "\n\n"
+                )
+            if 'ass' in handles:
+                text = "\\N".join(_ass_escape(line) for line in lines)
+                handles['ass'].write(
+                    f"Dialogue: 0,{_format_ass_timestamp(start)},{_format_ass_timestamp(end)},"
+                    f"Default,,0,0,0,,{text}\n"
+                )
+    finally:
+        for handle in handles.values():
+            handle.close()
+
+    return paths
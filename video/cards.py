@@ -0,0 +1,308 @@
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Dict, List, Tuple
+
+try:
+    from PIL import Image, ImageDraw, ImageFont
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+    Image = ImageDraw = ImageFont = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Reddit dark theme colours
+CARD_BACKGROUND = (26, 26, 27, 235)
+CARD_TEXT = (215, 218, 220, 255)
+CARD_MUTED = (129, 131, 132, 255)
+CARD_ACCENT = (255, 69, 0, 255)
+
+# Longest body text shown on a card; narration still covers the full text
+CARD_MAX_BODY_CHARS = 600
+
+# Bump when the card design changes so cached card images are re-rendered
+CARD_STYLE_VERSION = 2
+
+# Rendered text lines kept in memory for reuse across cards
+LINE_CACHE_SIZE = 256
+
+# Memory the in-process card cache may use before evicting the least recently used cards
+CARD_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+CARD_CACHE_DIRECTORY = Path("temp") / "cards"
+
+# Font files tried in order (Windows, then common Linux/macOS names)
+FONT_CANDIDATES = {
+    False: ["arial.ttf", "segoeui.ttf", "DejaVuSans.ttf", "LiberationSans-Regular.ttf", "Helvetica.ttc"],
+    True: ["arialbd.ttf", "segoeuib.ttf", "DejaVuSans-Bold.ttf", "LiberationSans-Bold.ttf", "Helvetica.ttc"]
+}
+
+
+def test_pil_availability() -> bool:
+    """Test if Pillow is available for card rendering"""
+    return PIL_AVAILABLE
+
+
+@lru_cache(maxsize=None)
+def load_font(size: int, bold: bool = False):
+    """Load the first available TrueType font at the given size (shared per size and weight)"""
+    for name in FONT_CANDIDATES[bold]:
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        return ImageFont.load_default()
+
+
+@lru_cache(maxsize=4096)
+def measure_text(text: str, size: int, bold: bool = False) -> float:
+    """Measure the advance width of text as laid out by the font, kerning included"""
+    return load_font(size, bold).getlength(text)
+
+
+@lru_cache(maxsize=LINE_CACHE_SIZE)
+def get_line_mask(text: str, size: int, bold: bool = False) -> Tuple[any, int, int]:
+    """
+    Get a rasterised mask of a whole text line, rendering it on first use
+
+    Whole lines are shaped by the font at once, so kerning, ligatures,
+    combining marks and complex scripts come out as ImageDraw.text draws
+    them; repeated lines (author and score rows, recurring phrases) are
+    stamped from the cache.
+
+    Returns:
+        Tuple of (mask, x offset, y offset)
+    """
+    font = load_font(size, bold)
+    left, top, right, bottom = font.getbbox(text)
+    mask = Image.new('L', (max(1, right - left), max(1, bottom - top)), 0)
+    ImageDraw.Draw(mask).text((-left, -top), text, font=font, fill=255)
+    return mask, left, top
+
+
+def draw_text_line(image, position: Tuple[int, int], text: str, size: int, bold: bool, colour):
+    """Draw a line of text by stamping its cached mask"""
+    if not text.strip():
+        return
+    x, y = position
+    mask, left, top = get_line_mask(text, size, bold)
+    image.paste(colour, (x + left, y + top), mask)
+
+
+@lru_cache(maxsize=4096)
+def wrap_text(text: str, size: int, bold: bool, max_width: int) -> Tuple[str, ...]:
+    """Greedily wrap text into lines that fit within max_width pixels (cached layout)"""
+    lines = []
+    current = ""
+    for word in text.split():
+        candidate = f"{current} {word}" if current else word
+        if current and measure_text(candidate, size, bold) > max_width:
+            lines.append(current)
+            current = word
+        else:
+            current = candidate
+    if current:
+        lines.append(current)
+    return tuple(lines)
+
+
+def truncate_card_text(text: str, max_chars: int = CARD_MAX_BODY_CHARS) -> str:
+    """Shorten long card text at a word boundary"""
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars].rsplit(' ', 1)[0] + "..."
+
+
+def get_card_lines(card: Dict[str, any]) -> List[Dict[str, any]]:
+    """Describe the text lines of a card as (text, style) pairs before layout"""
+    kind = card.get('kind')
+    if kind == 'title':
+        return [
+            {'text': f"r/{card.get('subreddit', '')} • u/{card.get('author', '')}", 'style': 'meta'},
+            {'text': card.get('title', ''), 'style': 'heading'}
+        ]
+    if kind == 'comment':
+        return [
+            {'text': f"u/{card.get('author', '')} • {card.get('score', 0)} points", 'style': 'meta'},
+            {'text': truncate_card_text(card.get('text', '')), 'style': 'body'}
+        ]
+    return [
+        {'text': card.get('title', ''), 'style': 'heading'},
+        {'text': truncate_card_text(card.get('text', '')), 'style': 'body'}
+    ]
+
+
+def render_card(card: Dict[str, any], width: int) -> Optional["np.ndarray"]:
+    """
+    Rasterise a title or comment card
+
+    Args:
+        card: Card description ('kind' plus post/comment fields)
+        width: Card width in pixels
+
+    Returns:
+        RGBA uint8 array of shape (height, width, 4), or None if Pillow is missing
+    """
+    if not PIL_AVAILABLE:
+        print("Error: Pillow is not available. Please install it with: pip install pillow")
+        return None
+
+    padding = width // 20
+    text_width = width - 2 * padding
+    styles = {
+        'meta': (max(12, width // 36), False, CARD_MUTED),
+        'heading': (max(16, width // 22), True, CARD_TEXT),
+        'body': (max(14, width // 28), False, CARD_TEXT)
+    }
+
+    # Lay out every line first so the card can be sized to its content
+    laid_out = []
+    height = padding
+    for block in get_card_lines(card):
+        size, bold, colour = styles[block['style']]
+        for line in wrap_text(block['text'], size, bold, text_width):
+            laid_out.append((height, line, size, bold, colour))
+            height += int(size * 1.3)
+        height += padding // 2
+    height += padding // 2
+
+    image = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(image)
+    draw.rounded_rectangle((0, 0, width - 1, height - 1), radius=padding // 2, fill=CARD_BACKGROUND)
+    draw.rectangle((0, padding // 2, padding // 6, height - padding // 2), fill=CARD_ACCENT)
+
+    for y, line, size, bold, colour in laid_out:
+        draw_text_line(image, (padding, y), line, size, bold, colour)
+
+    return np.asarray(image, dtype=np.uint8)
+
+
+def get_card_hash(card: Dict[str, any], width: int) -> str:
+    """Hash a card's content, width and style version for caching"""
+    identifier = json.dumps({'card': card, 'width': width, 'style': CARD_STYLE_VERSION},
+                            sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.md5(identifier.encode('utf-8')).hexdigest()
+
+
+# Rendered cards by content hash, shared by every frame and render in this process,
+# least recently used first; bounded by CARD_CACHE_MAX_BYTES for long-running workers
+_card_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+_card_cache_bytes = 0
+_card_cache_lock = threading.Lock()
+
+
+def _get_cached_card(card_hash: str) -> Optional["np.ndarray"]:
+    with _card_cache_lock:
+        image = _card_cache.get(card_hash)
+        if image is not None:
+            _card_cache.move_to_end(card_hash)
+        return image
+
+
+def _cache_card(card_hash: str, image: "np.ndarray"):
+    """Keep a card in memory, evicting the least recently used cards over the size limit"""
+    global _card_cache_bytes
+    with _card_cache_lock:
+        if card_hash in _card_cache:
+            return
+        _card_cache[card_hash] = image
+        _card_cache_bytes += image.nbytes
+        while _card_cache_bytes > CARD_CACHE_MAX_BYTES and len(_card_cache) > 1:
+            _, evicted = _card_cache.popitem(last=False)
+            _card_cache_bytes -= evicted.nbytes
+
+
+def get_card_image(card: Dict[str, any], width: int, use_disk_cache: bool = True) -> Optional["np.ndarray"]:
+    """
+    Get a card as an RGBA array, rasterising it only if no cached copy exists
+
+    Cards are looked up in memory first, then as PNGs under temp/cards/, so
+    a card is rendered once no matter how many frames or renders use it.
+
+    Args:
+        card: Card description ('kind' plus post/comment fields)
+        width: Card width in pixels
+        use_disk_cache: Whether to read and write temp/cards/ (default: True)
+
+    Returns:
+        RGBA uint8 array of shape (height, width, 4), or None if Pillow is missing
+    """
+    card_hash = get_card_hash(card, width)
+    cached = _get_cached_card(card_hash)
+    if cached is not None:
+        return cached
+
+    if not PIL_AVAILABLE:
+        print("Error: Pillow is not available. Please install it with: pip install pillow")
+        return None
+
+    cache_path = CARD_CACHE_DIRECTORY / f"{card_hash}.png"
+    image = None
+
+    if use_disk_cache and cache_path.exists():
+        try:
+            with Image.open(cache_path) as png:
+                image = np.asarray(png.convert('RGBA'), dtype=np.uint8)
+        except OSError:
+            image = None
+
+    if image is None:
+        image = render_card(card, width)
+        if image is not None and use_disk_cache:
+            try:
+                os.makedirs(CARD_CACHE_DIRECTORY, exist_ok=True)
+                Image.fromarray(image, 'RGBA').save(cache_path)
+            except OSError as e:
+                print(f"Warning: Could not cache card image: {str(e)}")
+
+    if image is not None:
+        image.setflags(write=False)
+        _cache_card(card_hash, image)
+    return image
+
+
+def get_scaled_card_image(card: Dict[str, any], width: int, source_width: int) -> Optional["np.ndarray"]:
+    """
+    Get a card downscaled from its cached full-size rendering
+
+    Proxy renders use this so they share the full render's card cache
+    instead of rasterising their own small cards.
+
+    Args:
+        card: Card description ('kind' plus post/comment fields)
+        width: Width of the card in the proxy frame
+        source_width: Width the card is rendered at for the full-size video
+
+    Returns:
+        RGBA uint8 array of shape (height, width, 4), or None if Pillow is missing
+    """
+    if width >= source_width:
+        return get_card_image(card, width)
+
+    card_hash = f"{get_card_hash(card, source_width)}@{width}"
+    cached = _get_cached_card(card_hash)
+    if cached is not None:
+        return cached
+
+    source = get_card_image(card, source_width)
+    if source is None:
+        return None
+
+    height = max(1, round(source.shape[0] * width / source_width))
+    resized = Image.fromarray(source, 'RGBA').resize((width, height), Image.LANCZOS)
+    image = np.asarray(resized, dtype=np.uint8)
+    image.setflags(write=False)
+    _cache_card(card_hash, image)
+    return image
@@ -0,0 +1,820 @@
+import os
+import json
+import shutil
+import hashlib
+import subprocess
+from concurrent.futures import ProcessPoolExecutor, Future, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Optional, Dict, List, Tuple, Callable
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    np = None
+
+from tts import read_audio, write_audio
+from tracing import span
+from .timeline import build_timeline, get_timeline_duration
+from .cards import get_scaled_card_image, get_card_hash, test_pil_availability
+from .frame_buffer import FrameCompositor, premultiply_overlay, read_frame_into
+from .presets import get_encoder_preset, get_preset_fps, build_encoder_args
+
+
+# Short side of the frame for each resolution setting
+RESOLUTIONS = {
+    '720p': 720,
+    '1080p': 1080
+}
+
+ASPECT_RATIOS = {
+    '16:9': (16, 9),
+    '9:16': (9, 16),
+    '1:1': (1, 1)
+}
+
+NARRATION_SAMPLE_RATE = 24000
+
+# Solid colour used when no background footage is configured
+FALLBACK_BACKGROUND_COLOR = '0x101014'
+
+CHUNK_DIRECTORY = Path("temp") / "chunks"
+
+# Error returned when a render stops early because should_yield asked it to
+RENDER_PREEMPTED = "Render preempted by a more urgent job"
+NARRATION_DIRECTORY = Path("temp") / "narration"
+
+
+def get_frame_size(resolution: str = '1080p', aspect: str = '16:9') -> Tuple[int, int]:
+    """Get the (width, height) of a frame for a resolution setting and aspect ratio"""
+    short_side = RESOLUTIONS.get(str(resolution), 1080)
+    ratio_w, ratio_h = ASPECT_RATIOS.get(aspect, ASPECT_RATIOS['16:9'])
+
+    if ratio_w >= ratio_h:
+        width, height = short_side * ratio_w / ratio_h, short_side
+    else:
+        width, height = short_side, short_side * ratio_h / ratio_w
+
+    # Encoders need even dimensions for yuv420p
+    return int(width) // 2 * 2, int(height) // 2 * 2
+
+
+def scale_frame_size(frame_size: Tuple[int, int], scale: float) -> Tuple[int, int]:
+    """Scale a frame size, keeping both dimensions even"""
+    if scale == 1.0:
+        return frame_size
+    width, height = frame_size
+    return max(2, int(width * scale) // 2 * 2), max(2, int(height * scale) // 2 * 2)
+
+
+# Per-aspect card layout: card width as a share of the frame width, capped at
+# 'max_height' of the frame height, and the card's vertical centre as a share
+# of the frame height (portrait frames sit cards above the caption area)
+CARD_LAYOUTS = {
+    '16:9': {'width': 0.88, 'max_height': 1.0, 'center': 0.5},
+    '9:16': {'width': 0.92, 'max_height': 1.0, 'center': 0.42},
+    '1:1': {'width': 0.9, 'max_height': 0.9, 'center': 0.5}
+}
+
+
+def get_card_width(frame_size: Tuple[int, int], aspect: str = '16:9') -> int:
+    """Get the card width that suits a frame, narrow on landscape and wide on portrait"""
+    width, height = frame_size
+    layout = CARD_LAYOUTS.get(aspect, CARD_LAYOUTS['16:9'])
+    return int(min(width * layout['width'], height * layout['max_height'])) // 2 * 2
+
+
+def get_card_position(card_shape, frame_size: Tuple[int, int], aspect: str = '16:9') -> Tuple[int, int]:
+    """Get the top-left position of a card, centred horizontally at the layout's height"""
+    card_height, card_width = card_shape[:2]
+    width, height = frame_size
+    center = CARD_LAYOUTS.get(aspect, CARD_LAYOUTS['16:9'])['center']
+    top = int(height * center - card_height / 2)
+    return (width - card_width) // 2, max(0, min(top, height - card_height))
+
+
+def get_narration_path(timeline: List[Dict[str, any]], sample_rate: int = NARRATION_SAMPLE_RATE) -> str:
+    """Get the cache path of a mixed narration track, keyed by its segments and their positions"""
+    segments = []
+    for entry in timeline:
+        filename = entry['file']['filename']
+        signature = entry['file'].get('audio_key')
+        if not signature:
+            try:
+                stat = os.stat(filename)
+                signature = [stat.st_size, stat.st_mtime]
+            except OSError:
+                signature = None
+        segments.append([os.path.abspath(filename), signature, round(entry['start'], 4)])
+
+    identifier = json.dumps({'segments': segments, 'sample_rate': sample_rate})
+    return str(NARRATION_DIRECTORY / f"{hashlib.md5(identifier.encode('utf-8')).hexdigest()}.wav")
+
+
+def build_narration_track(timeline: List[Dict[str, any]], output_path: str,
+                          sample_rate: int = NARRATION_SAMPLE_RATE) -> bool:
+    """
+    Mix every narration segment into a single WAV at its timeline position
+
+    Args:
+        timeline: Timeline from build_timeline
+        output_path: Path of the WAV file to write
+        sample_rate: Sample rate of the mixed track (default: 24000)
+
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    if not NUMPY_AVAILABLE:
+        print("Error: NumPy is not available. Please install it with: pip install numpy")
+        return False
+
+    total_samples = int(np.ceil(get_timeline_duration(timeline) * sample_rate))
+    track = np.zeros(total_samples, dtype=np.float32)
+
+    for entry in timeline:
+        audio = read_audio(entry['file']['filename'], sample_rate)
+        if audio is None:
+            return False
+        samples = audio[0]
+        start = int(round(entry['start'] * sample_rate))
+        end = min(total_samples, start + len(samples))
+        track[start:end] += samples[:end - start]
+
+    return write_audio(output_path, track, sample_rate)
+
+
+def get_packed_size(frame_sizes: List[Tuple[int, int]]) -> Tuple[int, int]:
+    """Get the size of a frame holding every output size side by side"""
+    return sum(width for width, _ in frame_sizes), max(height for _, height in frame_sizes)
+
+
+def open_background_decoder(background_path: Optional[str], frame_sizes: List[Tuple[int, int]],
+                            fps: int, start_time: float = 0.0) -> subprocess.Popen:
+    """
+    Start an FFmpeg process that streams scaled, cropped RGB background frames
+
+    The footage is decoded once; with several output sizes each is scaled and
+    cropped from the same decoded frame and the results are packed side by
+    side (top-aligned) into one raw frame of get_packed_size(frame_sizes).
+    """
+    packed_width, packed_height = get_packed_size(frame_sizes)
+
+    if not background_path:
+        command = [
+            'ffmpeg', '-v', 'error', '-f', 'lavfi',
+            '-i', f"color=c={FALLBACK_BACKGROUND_COLOR}:s={packed_width}x{packed_height}:r={fps}"
+        ]
+    elif len(frame_sizes) == 1:
+        width, height = frame_sizes[0]
+        command = [
+            'ffmpeg', '-v', 'error', '-ss', f"{start_time:.3f}", '-stream_loop', '-1',
+            '-i', background_path, '-an',
+            '-vf', f"scale={width}:{height}:force_original_aspect_ratio=increase,"
+                   f"crop={width}:{height},fps={fps}"
+        ]
+    else:
+        labels = [f"[s{number}]" for number in range(len(frame_sizes))]
+        graph = [f"[0:v]fps={fps},split={len(frame_sizes)}{''.join(labels)}"]
+        for number, (width, height) in enumerate(frame_sizes):
+            graph.append(f"[s{number}]scale={width}:{height}:force_original_aspect_ratio=increase,"
+                         f"crop={width}:{height},pad={width}:{packed_height}:0:0[o{number}]")
+        outputs = ''.join(f"[o{number}]" for number in range(len(frame_sizes)))
+        graph.append(f"{outputs}hstack=inputs={len(frame_sizes)}")
+        command = [
+            'ffmpeg', '-v', 'error', '-ss', f"{start_time:.3f}", '-stream_loop', '-1',
+            '-i', background_path, '-an', '-filter_complex', ';'.join(graph)
+        ]
+
+    command += ['-f', 'rawvideo', '-pix_fmt', 'rgb24', '-']
+    return subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+
+
+def open_encoder(output_path: str, frame_size: Tuple[int, int], fps: int,
+                 audio_path: Optional[str] = None,
+                 encoder_args: Optional[List[str]] = None) -> subprocess.Popen:
+    """Start an FFmpeg process that encodes raw RGB frames written to its stdin"""
+    width, height = frame_size
+    command = [
+        'ffmpeg', '-v', 'error', '-y',
+        '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-s', f"{width}x{height}", '-r', str(fps), '-i', '-'
+    ]
+    if audio_path:
+        command += ['-i', audio_path, '-c:a', 'aac', '-b:a', '192k', '-shortest']
+
+    if encoder_args is None:
+        encoder_args = build_encoder_args(get_encoder_preset({}), fps)
+    command += list(encoder_args)
+    command += ['-movflags', '+faststart', output_path]
+    return subprocess.Popen(command, stdin=subprocess.PIPE, stderr=subprocess.DEVNULL)
+
+
+def get_render_workers(video_config: Dict[str, any]) -> int:
+    """Get the number of render processes from the config ('auto' uses every core)"""
+    try:
+        workers = int(video_config.get('render_workers', 0))
+    except (TypeError, ValueError):
+        workers = 0
+    return workers if workers > 0 else (os.cpu_count() or 1)
+
+
+def split_timeline(timeline: List[Dict[str, any]], chunk_count: int) -> List[Tuple[int, int]]:
+    """
+    Split a timeline at segment boundaries into chunks of roughly equal duration
+
+    Args:
+        timeline: Timeline from build_timeline
+        chunk_count: Maximum number of chunks
+
+    Returns:
+        List of (first entry index, end entry index) pairs covering the timeline
+    """
+    chunk_count = max(1, min(chunk_count, len(timeline)))
+    target = get_timeline_duration(timeline) / chunk_count
+
+    chunks = []
+    first = 0
+    for index, entry in enumerate(timeline):
+        remaining_entries = len(timeline) - index - 1
+        remaining_chunks = chunk_count - len(chunks) - 1
+        if remaining_chunks and (entry['end'] >= target * (len(chunks) + 1)
+                                 or remaining_entries <= remaining_chunks):
+            chunks.append((first, index + 1))
+            first = index + 1
+
+    if first < len(timeline):
+        chunks.append((first, len(timeline)))
+    return chunks
+
+
+def render_chunk(job: Dict[str, any]) -> Tuple[bool, str]:
+    """
+    Render a run of frames for a slice of the timeline into one file per output
+
+    Runs in a worker process, so the job holds only plain, picklable values.
+    Every output shares one background decoder.
+
+    Args:
+        job: Dict with 'entries', 'start_frame', 'end_frame', 'fps',
+            'background_path', 'background_start', 'encoder_args' and
+            'outputs', a list of dicts with 'aspect', 'frame_size',
+            'card_width', 'card_source_width', 'output_path' and 'audio_path'
+
+    Returns:
+        Tuple of (success, error message or None)
+    """
+    entries = job['entries']
+    fps = job['fps']
+    background_path = job['background_path']
+    outputs = job['outputs']
+    frame_sizes = [tuple(output['frame_size']) for output in outputs]
+
+    decoder = None
+    encoders = []
+    try:
+        decoder = open_background_decoder(background_path, frame_sizes, fps, job['background_start'])
+        for output, frame_size in zip(outputs, frame_sizes):
+            encoders.append(open_encoder(output['output_path'], frame_size, fps,
+                                         output['audio_path'], job['encoder_args']))
+    except FileNotFoundError:
+        for process in [decoder] + encoders:
+            if process is not None:
+                process.kill()
+        return False, "FFmpeg not found in PATH"
+
+    # Without footage the background never changes, so unchanged frames are reused as-is
+    compositors = [FrameCompositor(frame_size, static_background=not background_path)
+                   for frame_size in frame_sizes]
+
+    # With several outputs the decoder packs them side by side into one frame
+    packed = None
+    if len(outputs) > 1:
+        packed_width, packed_height = get_packed_size(frame_sizes)
+        packed = np.empty((packed_height, packed_width, 3), dtype=np.uint8)
+    offsets = np.cumsum([0] + [width for width, _ in frame_sizes]).tolist()
+
+    overlays = [{} for _ in outputs]
+    entry_index = 0
+
+    try:
+        for frame_number in range(job['start_frame'], job['end_frame']):
+            time_position = frame_number / fps
+            while entry_index < len(entries) - 1 and time_position >= entries[entry_index]['end']:
+                entry_index += 1
+
+            if compositors[0].needs_background():
+                if packed is None:
+                    loaded = compositors[0].load_background(decoder.stdout)
+                else:
+                    loaded = read_frame_into(decoder.stdout, packed)
+                if not loaded:
+                    return False, "Background footage ended unexpectedly"
+                if packed is not None:
+                    for compositor, (width, height), x in zip(compositors, frame_sizes, offsets):
+                        compositor.set_background(packed[:height, x:x + width])
+                if compositors[0].static_background:
+                    decoder.kill()
+
+            for output, compositor, frame_size, cache, encoder in zip(
+                    outputs, compositors, frame_sizes, overlays, encoders):
+                if entry_index not in cache:
+                    cache[entry_index] = None
+                    card_info = entries[entry_index]['file'].get('card')
+                    card = get_scaled_card_image(card_info, output['card_width'],
+                                                 output['card_source_width']) if card_info else None
+                    if card is not None:
+                        x, y = get_card_position(card.shape, frame_size, output['aspect'])
+                        cache[entry_index] = (premultiply_overlay(card), x, y)
+
+                overlay = cache[entry_index]
+                if overlay is None:
+                    compositor.set_overlay(None)
+                else:
+                    compositor.set_overlay(*overlay)
+
+                encoder.stdin.write(compositor.compose().data)
+
+        for encoder in encoders:
+            encoder.stdin.close()
+        for encoder in encoders:
+            if encoder.wait() != 0:
+                return False, "FFmpeg failed to encode the video"
+
+    except (BrokenPipeError, OSError) as e:
+        return False, f"Error while rendering video: {str(e)}"
+    finally:
+        decoder.kill()
+        decoder.wait()
+        for encoder in encoders:
+            if encoder.poll() is None:
+                encoder.kill()
+                encoder.wait()
+
+    return True, None
+
+
+def get_chunk_outcome(future: Future) -> Tuple[bool, str]:
+    """Get a pooled render_chunk's result, turning a crash in the worker into an error tuple"""
+    try:
+        return future.result()
+    except BrokenProcessPool:
+        return False, "A render worker process stopped unexpectedly (it may have run out of memory)"
+    except Exception as e:
+        return False, f"Error rendering chunk: {str(e)}"
+
+
+def concat_chunks(chunk_paths: List[str], audio_path: str, output_path: str) -> bool:
+    """Join rendered chunks with the concat demuxer and mux the narration, without re-encoding video"""
+    list_path = Path(chunk_paths[0]).parent / "chunks.txt"
+    with open(list_path, 'w', encoding='utf-8') as f:
+        for path in chunk_paths:
+            escaped = os.path.abspath(path).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+
+    command = [
+        'ffmpeg', '-v', 'error', '-y', '-f', 'concat', '-safe', '0', '-i', str(list_path),
+        '-i', audio_path, '-map', '0:v:0', '-map', '1:a:0',
+        '-c:v', 'copy', '-c:a', 'aac', '-b:a', '192k', '-shortest',
+        '-movflags', '+faststart', output_path
+    ]
+    try:
+        result = subprocess.run(command, capture_output=True)
+    except FileNotFoundError:
+        print("Error: FFmpeg not found in PATH")
+        return False
+    return result.returncode == 0 and os.path.exists(output_path)
+
+
+def is_incremental(video_config: Dict[str, any]) -> bool:
+    """Whether renders reuse cached per-segment chunks (the 'incremental' setting, on by default)"""
+    return str(video_config.get('incremental', True)).lower() not in ('false', '0', 'no', 'off')
+
+
+def get_timeline_frame_rate(video_config: Dict[str, any]) -> Optional[int]:
+    """
+    Get the frame rate a render lays its timeline out at, or None if unrounded
+
+    Incremental renders round every segment up to whole frames and place
+    the narration on those rounded starts; captions for the video must use
+    the same timeline to stay in sync with it.
+    """
+    if not is_incremental(video_config):
+        return None
+    return get_preset_fps(get_encoder_preset(video_config), int(video_config.get('fps', 30)))
+
+
+def get_background_identity(background_path: Optional[str]) -> Optional[Dict[str, any]]:
+    """Identify background footage by path, size and mtime for build keys"""
+    if not background_path:
+        return None
+    try:
+        stat = os.stat(background_path)
+    except OSError:
+        return {'path': os.path.abspath(background_path)}
+    return {'path': os.path.abspath(background_path), 'size': stat.st_size, 'mtime': stat.st_mtime}
+
+
+def render_incremental(timeline: List[Dict[str, any]], output_specs: List[Dict[str, any]],
+                       output_paths: Dict[str, str], fps: int, encoder_args: List[str],
+                       background_path: Optional[str], background_start: float, narration_path: str,
+                       workers: int, should_yield: Optional[Callable[[], bool]] = None) -> Tuple[bool, any]:
+    """
+    Render one cached chunk per timeline segment and mux the outputs from them
+
+    Each chunk is a build graph artifact keyed by its frame count, encoder
+    settings, card hashes and background window, so only segments whose
+    inputs changed are rendered again; the final outputs are re-muxed from
+    the cached chunks and the narration track without re-encoding. Every
+    chunk seeks the background to the job's start plus its own place on the
+    timeline, so the footage runs on continuously across segments.
+
+    Args:
+        timeline: Frame-aligned timeline from build_timeline
+        output_specs: Per-output 'aspect', 'frame_size', 'card_width' and 'card_source_width'
+        output_paths: Output video path for each aspect ratio
+        fps: Frame rate
+        encoder_args: Video encoder arguments shared by every chunk
+        background_path: Background footage, or None for a solid colour
+        background_start: Offset into the background where the first segment starts
+        narration_path: Mixed narration track muxed into every output
+        workers: Maximum number of render processes
+        should_yield: Checked after every finished chunk; when it returns
+            True the render stops with RENDER_PREEMPTED, keeping the
+            finished chunks for the next attempt (optional)
+
+    Returns:
+        Tuple of (success, build summary or error message)
+    """
+    from pipeline.build_graph import BuildGraph
+
+    graph = BuildGraph()
+    background = get_background_identity(background_path)
+    background_duration = None
+    if background_path:
+        from .keyframes import get_keyframe_index
+        index = get_keyframe_index(background_path)
+        background_duration = index['duration'] if index else None
+
+    chunk_paths = {spec['aspect']: [] for spec in output_specs}
+    pending = []
+
+    for entry in timeline:
+        card = entry['file'].get('card')
+        card_keys = [get_card_hash(card, spec['card_source_width']) if card else None for spec in output_specs]
+        frames = int(round(entry['duration'] * fps))
+        # Looped footage wraps at its own length, as in a non-incremental render
+        segment_start = background_start + entry['start']
+        if background_duration:
+            segment_start %= background_duration
+        segment_start = round(segment_start, 3)
+
+        key = graph.key('chunk', {
+            'frames': frames,
+            'fps': fps,
+            'encoder_args': encoder_args,
+            'outputs': [[spec['aspect'], list(spec['frame_size']), spec['card_width']] for spec in output_specs],
+            'background': dict(background, start=segment_start) if background else None
+        }, [card_key for card_key in card_keys if card_key])
+
+        paths = [graph.path('chunk', f"{key}_{spec['aspect'].replace(':', 'x')}", '.mp4')
+                 for spec in output_specs]
+        for spec, path in zip(output_specs, paths):
+            chunk_paths[spec['aspect']].append(str(path))
+
+        if all(path.exists() for path in paths):
+            graph.record('chunk', key, str(paths[0]), card_keys, built=False)
+            continue
+        # Identical segments share one chunk
+        if any(key == pending_key for pending_key, _, _, _ in pending):
+            continue
+
+        outputs = []
+        for spec, path in zip(output_specs, paths):
+            outputs.append(dict(spec, output_path=str(path.with_name(path.stem + '.part.mp4')),
+                                audio_path=None))
+        pending.append((key, card_keys, paths, {
+            'entries': [dict(entry, start=0.0, end=entry['duration'])],
+            'start_frame': 0,
+            'end_frame': frames,
+            'fps': fps,
+            'background_path': background_path,
+            'background_start': segment_start,
+            'encoder_args': encoder_args,
+            'outputs': outputs
+        }))
+
+    def store_chunk(item, outcome) -> Optional[str]:
+        """Move a rendered chunk into the build graph, or clean it up and return the error"""
+        key, card_keys, paths, job = item
+        success, error = outcome
+        if not success:
+            for output in job['outputs']:
+                if os.path.exists(output['output_path']):
+                    os.remove(output['output_path'])
+            return error
+        for output, path in zip(job['outputs'], paths):
+            os.replace(output['output_path'], path)
+        graph.record('chunk', key, str(paths[0]), card_keys, built=True)
+        return None
+
+    if pending:
+        with span('render.encode', 'render', chunks=len(pending), reused=len(timeline) - len(pending)):
+            (graph.directory / 'chunk').mkdir(parents=True, exist_ok=True)
+            if len(pending) == 1:
+                error = store_chunk(pending[0], render_chunk(pending[0][3]))
+                if not error and should_yield and should_yield():
+                    error = RENDER_PREEMPTED
+                if error:
+                    graph.save()
+                    return False, error
+            else:
+                error = None
+                stored = set()
+                with ProcessPoolExecutor(max_workers=max(1, min(workers, len(pending)))) as pool:
+                    futures = {pool.submit(render_chunk, item[3]): item for item in pending}
+                    # Chunks are stored as they finish, so a failed or preempted render keeps them
+                    for future in as_completed(futures):
+                        stored.add(future)
+                        error = store_chunk(futures[future], get_chunk_outcome(future))
+                        if not error and should_yield and should_yield():
+                            error = RENDER_PREEMPTED
+                        if error:
+                            for other in futures:
+                                other.cancel()
+                            break
+
+                if error:
+                    # Chunks that were already encoding when the render stopped are kept as well
+                    for future, item in futures.items():
+                        if future not in stored and not future.cancelled():
+                            store_chunk(item, get_chunk_outcome(future))
+                    graph.save()
+                    return False, error
+
+    with span('render.concat', 'render', outputs=len(chunk_paths)):
+        for aspect, paths in chunk_paths.items():
+            if not concat_chunks(paths, narration_path, output_paths[aspect]):
+                return False, "FFmpeg failed to join the rendered chunks"
+
+    graph.save()
+    return True, graph.summary()
+
+
+def get_output_aspects(video_config: Dict[str, any]) -> List[str]:
+    """Get the aspect ratios to render from the 'aspect_ratios' setting (comma separated)"""
+    aspects = []
+    for aspect in str(video_config.get('aspect_ratios', '16:9')).split(','):
+        aspect = aspect.strip()
+        if aspect in ASPECT_RATIOS and aspect not in aspects:
+            aspects.append(aspect)
+    return aspects or ['16:9']
+
+
+def render_video_aspects(files: List[Dict[str, any]], video_config: Dict[str, any],
+                         output_paths: Dict[str, str], background_path: Optional[str] = None,
+                         background_start: Optional[float] = None,
+                         should_yield: Optional[Callable[[], bool]] = None) -> Tuple[bool, any]:
+    """
+    Composite narration cards over background footage and encode one video per aspect ratio
+
+    Frames are decoded, composited and encoded one at a time through FFmpeg
+    pipes, so memory use does not grow with the length of the video. The
+    background is decoded and the narration mixed once for every aspect
+    ratio; only card layout and encoding are done per output. The
+    'encoder_preset' setting picks the codec settings and may lower the
+    frame size and rate (see video.presets). With the 'incremental' setting
+    on (the default), every segment is its own cached chunk so a re-render
+    only encodes the segments that changed, and the changed chunks are
+    rendered in a process pool (see render_incremental and the
+    'render_workers' setting). With it off, long videos are split into
+    evenly sized runs of segments that are rendered in the pool instead.
+    Either way the chunks are joined without re-encoding.
+
+    Args:
+        files: The 'files' list returned by generate_tts_audio
+        video_config: The [video] section of config.toml
+        output_paths: Output video path for each aspect ratio, e.g. {'9:16': 'out.mp4'};
+            the first aspect ratio decides which background library footage is used
+        background_path: Background footage to loop behind the cards (optional,
+            defaults to the configured background, then a random library clip)
+        background_start: Offset into the background footage in seconds (optional,
+            defaults to a random narration-length window cut from it)
+        should_yield: Lets an incremental render stop between chunks with
+            RENDER_PREEMPTED (optional, see render_incremental)
+
+    Returns:
+        Tuple of (success, result dict or error message). The result's
+        'background_path' and 'background_start' can be passed back in to
+        render again over exactly the same footage.
+    """
+    if not NUMPY_AVAILABLE:
+        return False, "NumPy is not available. Please install it with: pip install numpy"
+    if not test_pil_availability():
+        return False, "Pillow is not available. Please install it with: pip install pillow"
+    if not files:
+        return False, "No audio segments to render"
+    if not output_paths:
+        return False, "No outputs to render"
+
+    aspects = list(output_paths)
+    preset = get_encoder_preset(video_config)
+    fps = get_preset_fps(preset, int(video_config.get('fps', 30)))
+    frame_sizes = {
+        aspect: scale_frame_size(get_frame_size(video_config.get('resolution', '1080p'), aspect),
+                                 preset['scale'])
+        for aspect in aspects
+    }
+    card_widths = {aspect: get_card_width(frame_sizes[aspect], aspect) for aspect in aspects}
+    # Cards are rasterised at full size and scaled down for proxy presets, sharing one card cache
+    card_source_widths = {
+        aspect: get_card_width(get_frame_size(video_config.get('resolution', '1080p'), aspect), aspect)
+        for aspect in aspects
+    }
+    background_path = background_path or video_config.get('background') or None
+    incremental = is_incremental(video_config)
+    base_name = Path(output_paths[aspects[0]]).stem
+
+    # Incremental chunks start on whole frames so their lengths never depend on earlier segments
+    timeline = build_timeline(files, frame_rate=get_timeline_frame_rate(video_config))
+    duration = get_timeline_duration(timeline)
+    total_frames = int(np.ceil(duration * fps))
+
+    if not background_path:
+        from .backgrounds import pick_background_asset
+        # The same job keeps the same footage so its cached chunks stay valid
+        with span('render.pick_background', 'render'):
+            background_path = pick_background_asset(duration, video_config, aspects[0],
+                                                    seed=base_name if incremental else None)
+
+    # Only decode a window as long as the narration, not the whole source; incremental
+    # renders seek per segment instead, since a cut depends on the total duration
+    if background_path and background_start is None:
+        if incremental:
+            from .keyframes import pick_clip_window
+            window = pick_clip_window(background_path, duration, seed=base_name)
+            background_start = window[0] if window else 0.0
+        else:
+            from .keyframes import cut_background_window
+            with span('render.cut_background', 'render'):
+                background_path, background_start = cut_background_window(background_path, duration, seed=base_name)
+    background_start = background_start or 0.0
+
+    for path in output_paths.values():
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+    # The mixed narration is reused by every render of the same segments
+    narration_path = get_narration_path(timeline)
+    if not os.path.exists(narration_path):
+        os.makedirs(NARRATION_DIRECTORY, exist_ok=True)
+        temp_path = narration_path[:-len('.wav')] + '.part.wav'
+        with span('render.narration', 'render', segments=len(timeline)):
+            narrated = build_narration_track(timeline, temp_path)
+        if not narrated:
+            return False, "Failed to assemble narration audio"
+        os.replace(temp_path, narration_path)
+
+    workers = get_render_workers(video_config)
+    chunks = [(index, index + 1) for index in range(len(timeline))] if incremental \
+        else split_timeline(timeline, workers)
+
+    # Rasterise every card once up front so worker processes load them from temp/cards/
+    with span('render.cards', 'render'):
+        for entry in timeline:
+            if entry['file'].get('card'):
+                for aspect in aspects:
+                    get_scaled_card_image(entry['file']['card'], card_widths[aspect], card_source_widths[aspect])
+
+    # Chunks seek the background themselves; looped footage wraps at its own length
+    background_duration = None
+    if background_path and len(chunks) > 1 and not incremental:
+        from .keyframes import get_keyframe_index
+        index = get_keyframe_index(background_path)
+        background_duration = index['duration'] if index else None
+
+    threads = None
+    if len(chunks) > 1 and not preset['threads']:
+        # Share the cores between chunk encoders instead of oversubscribing them
+        threads = max(1, (os.cpu_count() or 1) // (min(len(chunks), workers) * len(aspects)))
+    encoder_args = build_encoder_args(preset, fps, threads)
+
+    output_specs = [{'aspect': aspect, 'frame_size': frame_sizes[aspect], 'card_width': card_widths[aspect],
+                     'card_source_width': card_source_widths[aspect]} for aspect in aspects]
+
+    result = {
+        'outputs': dict(output_paths),
+        'duration': duration,
+        'frames': total_frames,
+        'resolutions': {aspect: f"{width}x{height}" for aspect, (width, height) in frame_sizes.items()},
+        'fps': fps,
+        'preset': preset['name'],
+        'chunks': len(chunks),
+        'background_path': background_path,
+        'background_start': background_start
+    }
+
+    if incremental:
+        success, build = render_incremental(timeline, output_specs, output_paths, fps, encoder_args,
+                                            background_path, background_start, narration_path, workers,
+                                            should_yield)
+        if not success:
+            return False, build
+        result['build'] = build
+        return True, result
+
+    chunk_directory = CHUNK_DIRECTORY / base_name
+    jobs = []
+    for number, (first, end) in enumerate(chunks):
+        start_frame = 0 if first == 0 else min(total_frames, int(round(timeline[first]['start'] * fps)))
+        end_frame = total_frames if end == len(timeline) else int(round(timeline[end]['start'] * fps))
+        chunk_start = background_start + start_frame / fps
+        if background_duration:
+            chunk_start %= background_duration
+
+        if len(chunks) == 1:
+            # A single chunk is encoded straight to the outputs with their audio
+            outputs = [{'output_path': output_paths[aspect], 'audio_path': narration_path}
+                       for aspect in aspects]
+        else:
+            outputs = [{'output_path': str(chunk_directory / f"chunk_{number:03d}_{aspect.replace(':', 'x')}.mp4"),
+                        'audio_path': None}
+                       for aspect in aspects]
+        for output, spec in zip(outputs, output_specs):
+            output.update(spec)
+
+        jobs.append({
+            'entries': timeline[first:end],
+            'start_frame': start_frame,
+            'end_frame': end_frame,
+            'fps': fps,
+            'background_path': background_path,
+            'background_start': chunk_start,
+            'encoder_args': encoder_args,
+            'outputs': outputs
+        })
+
+    if len(jobs) == 1:
+        with span('render.encode', 'render', chunks=1, frames=total_frames):
+            success, error = render_chunk(jobs[0])
+        if not success:
+            return False, error
+    else:
+        chunk_directory.mkdir(parents=True, exist_ok=True)
+        try:
+            with span('render.encode', 'render', chunks=len(jobs), frames=total_frames):
+                with ProcessPoolExecutor(max_workers=len(jobs)) as pool:
+                    futures = [pool.submit(render_chunk, job) for job in jobs]
+                    results = [get_chunk_outcome(future) for future in futures]
+
+            for success, error in results:
+                if not success:
+                    return False, error
+
+            with span('render.concat', 'render', outputs=len(aspects)):
+                for number, aspect in enumerate(aspects):
+                    chunk_paths = [job['outputs'][number]['output_path'] for job in jobs]
+                    if not concat_chunks(chunk_paths, narration_path, output_paths[aspect]):
+                        return False, "FFmpeg failed to join the rendered chunks"
+        finally:
+            shutil.rmtree(chunk_directory, ignore_errors=True)
+
+    return True, result
+
+
+def render_video(files: List[Dict[str, any]], video_config: Dict[str, any], output_path: str,
+                 background_path: Optional[str] = None, aspect: str = '16:9',
+                 background_start: Optional[float] = None) -> Tuple[bool, any]:
+    """
+    Composite narration cards over background footage and encode the final video
+
+    Single-aspect form of render_video_aspects.
+
+    Args:
+        files: The 'files' list returned by generate_tts_audio
+        video_config: The [video] section of config.toml
+        output_path: Path of the video file to write
+        background_path: Background footage to loop behind the cards (optional,
+            defaults to the configured background, then a random library clip)
+        aspect: Output aspect ratio (default: '16:9')
+        background_start: Offset into the background footage in seconds (optional,
+            defaults to a random narration-length window cut from it)
+
+    Returns:
+        Tuple of (success, result dict or error message)
+    """
+    success, result = render_video_aspects(files, video_config, {aspect: output_path},
+                                           background_path, background_start)
+    if not success:
+        return False, result
+
+    return True, {
+        'output_path': output_path,
+        'duration': result['duration'],
+        'frames': result['frames'],
+        'resolution': result['resolutions'][aspect],
+        'fps': result['fps'],
+        'preset': result['preset'],
+        'chunks': result['chunks'],
+        'background_path': result['background_path'],
+        'background_start': result['background_start']
+    }
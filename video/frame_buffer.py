@@ -0,0 +1,136 @@
+from typing import Optional, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    np = None
+
+
+def read_frame_into(stream, buffer: "np.ndarray") -> bool:
+    """Fill a preallocated frame buffer from a raw video pipe"""
+    view = memoryview(buffer).cast('B')
+    filled = 0
+    while filled < len(view):
+        count = stream.readinto(view[filled:])
+        if not count:
+            return False
+        filled += count
+    return True
+
+
+def premultiply_overlay(card: "np.ndarray") -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    Convert an RGBA card into a fixed-point premultiplied overlay
+
+    The blend used by FrameCompositor is ``(background * inverse + colour) >> 8``
+    with alpha rescaled to 0-256, which stays within uint16 and needs no
+    division per pixel.
+
+    Args:
+        card: RGBA uint8 array of shape (height, width, 4)
+
+    Returns:
+        Tuple of (premultiplied colour uint16 (h, w, 3), inverse alpha uint16 (h, w, 1))
+    """
+    # Alpha rescaled to 0-256 so the two weights always sum to exactly 256
+    alpha = (card[..., 3:4].astype(np.uint32) * 256 + 127) // 255
+    colour = card[..., :3].astype(np.uint32) * alpha + 128
+    inverse = 256 - alpha
+    return colour.astype(np.uint16), inverse.astype(np.uint16)
+
+
+class FrameCompositor:
+    """
+    Composites a static overlay onto frames held in one preallocated buffer
+
+    Background frames are read straight into the output buffer and the
+    overlay is blended into it in place, so steady-state compositing
+    allocates nothing. With a static background, frames whose overlay has
+    not changed are returned untouched, and a changed overlay only re-blends
+    the rectangles it covered before and covers now.
+    """
+
+    def __init__(self, frame_size: Tuple[int, int], static_background: bool = False):
+        width, height = frame_size
+        self.frame = np.zeros((height, width, 3), dtype=np.uint8)
+        self._scratch = np.empty((height, width, 3), dtype=np.uint16)
+        self.static_background = static_background
+        self._clean_background = None
+        self._background_loaded = False
+
+        self._overlay = None
+        self._overlay_rect = None
+        self._applied_rect = None
+        self._dirty = True
+
+    def needs_background(self) -> bool:
+        """Whether a new background frame must be read before composing"""
+        return not (self.static_background and self._background_loaded)
+
+    def load_background(self, stream) -> bool:
+        """Read the next background frame from a raw RGB pipe into the frame buffer"""
+        if not read_frame_into(stream, self.frame):
+            return False
+        self._background_changed()
+        return True
+
+    def set_background(self, frame: "np.ndarray"):
+        """Copy a background frame (e.g. a view into a shared decode buffer) into the frame buffer"""
+        np.copyto(self.frame, frame)
+        self._background_changed()
+
+    def _background_changed(self):
+        """Reset dirty tracking after the frame buffer received a new background"""
+        if self.static_background:
+            self._clean_background = self.frame.copy()
+        self._background_loaded = True
+        self._applied_rect = None
+        self._dirty = True
+
+    def set_overlay(self, overlay: Optional[Tuple["np.ndarray", "np.ndarray"]], x: int = 0, y: int = 0):
+        """Set the premultiplied overlay (from premultiply_overlay) and its position"""
+        if overlay is self._overlay and (overlay is None or self._overlay_rect[:2] == (x, y)):
+            return
+
+        self._overlay = overlay
+        if overlay is None:
+            self._overlay_rect = None
+        else:
+            height = min(overlay[0].shape[0], self.frame.shape[0] - y)
+            width = min(overlay[0].shape[1], self.frame.shape[1] - x)
+            self._overlay_rect = (x, y, width, height) if width > 0 and height > 0 else None
+        self._dirty = True
+
+    def _restore(self, rect):
+        """Copy the clean static background back over a rectangle"""
+        x, y, width, height = rect
+        self.frame[y:y + height, x:x + width] = self._clean_background[y:y + height, x:x + width]
+
+    def _blend(self):
+        """Blend the current overlay into the frame buffer in place"""
+        x, y, width, height = self._overlay_rect
+        colour, inverse = self._overlay
+        region = self.frame[y:y + height, x:x + width]
+        scratch = self._scratch[:height, :width]
+
+        np.multiply(region, inverse[:height, :width], out=scratch)
+        np.add(scratch, colour[:height, :width], out=scratch)
+        np.right_shift(scratch, 8, out=scratch)
+        np.copyto(region, scratch, casting='unsafe')
+
+    def compose(self) -> "np.ndarray":
+        """Apply the overlay and return the frame buffer, ready to be encoded"""
+        if not self._dirty:
+            return self.frame
+
+        if self._applied_rect is not None:
+            self._restore(self._applied_rect)
+        if self._overlay_rect is not None:
+            self._blend()
+
+        # A moving background replaces the whole buffer, so only static ones are tracked
+        self._applied_rect = self._overlay_rect if self.static_background else None
+        self._dirty = not self.static_background
+        return self.frame
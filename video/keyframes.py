@@ -0,0 +1,240 @@
+import os
+import json
+import random
+import bisect
+import hashlib
+import subprocess
+from pathlib import Path
+from typing import Optional, Dict, List, Tuple
+
+
+KEYFRAME_INDEX_DIRECTORY = Path("temp") / "keyframes"
+CLIP_CACHE_DIRECTORY = Path("temp") / "clips"
+
+# Bump when the index layout changes so stale index files are rebuilt
+KEYFRAME_INDEX_VERSION = 1
+
+# Cut clips beyond this total size are removed, least recently used first
+CLIP_CACHE_MAX_BYTES = 2 * 1024 ** 3
+
+
+def _path_hash(path: str) -> str:
+    """Hash an absolute path into a cache file name"""
+    return hashlib.md5(os.path.abspath(path).encode('utf-8')).hexdigest()
+
+
+def scan_keyframes(path: str) -> Tuple[List[float], Optional[float]]:
+    """
+    Scan a video's packets for keyframes without decoding any frames
+
+    Args:
+        path: Video file to scan
+
+    Returns:
+        Tuple of (sorted keyframe timestamps, container duration or None)
+    """
+    keyframes = []
+    duration = None
+
+    try:
+        result = subprocess.run(
+            ['ffprobe', '-v', 'error', '-select_streams', 'v:0',
+             '-show_entries', 'packet=pts_time,flags:format=duration', '-of', 'csv=p=0', path],
+            capture_output=True, text=True, timeout=600
+        )
+    except (FileNotFoundError, subprocess.TimeoutExpired):
+        return [], None
+
+    if result.returncode != 0:
+        return [], None
+
+    for line in result.stdout.splitlines():
+        fields = line.strip().split(',')
+        try:
+            if len(fields) >= 2 and 'K' in fields[1]:
+                keyframes.append(round(float(fields[0]), 3))
+            elif len(fields) == 1 and fields[0]:
+                duration = float(fields[0])
+        except ValueError:
+            continue
+
+    return sorted(set(keyframes)), duration
+
+
+def get_keyframe_index(path: str) -> Optional[Dict[str, any]]:
+    """
+    Get the persistent keyframe index for a video, scanning it only when it changed
+
+    Index files live under temp/keyframes/ and are keyed by the video's
+    absolute path; they are rebuilt when the file's size or mtime changes.
+
+    Args:
+        path: Video file to index
+
+    Returns:
+        Dict with 'keyframes' and 'duration', or None if the video could not be read
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+
+    source = {'path': os.path.abspath(path), 'size': stat.st_size, 'mtime': stat.st_mtime}
+    index_path = KEYFRAME_INDEX_DIRECTORY / f"{_path_hash(path)}.json"
+
+    try:
+        with open(index_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        if index.get('version') == KEYFRAME_INDEX_VERSION and index.get('source') == source:
+            return index
+    except (OSError, ValueError):
+        pass
+
+    keyframes, duration = scan_keyframes(path)
+    if not keyframes or not duration:
+        return None
+
+    index = {
+        'version': KEYFRAME_INDEX_VERSION,
+        'source': source,
+        'duration': duration,
+        'keyframes': keyframes
+    }
+
+    try:
+        KEYFRAME_INDEX_DIRECTORY.mkdir(parents=True, exist_ok=True)
+        with open(index_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, separators=(',', ':'))
+    except OSError as e:
+        print(f"Warning: Could not save keyframe index: {str(e)}")
+
+    return index
+
+
+def keyframe_at_or_before(keyframes: List[float], time_position: float) -> float:
+    """Get the last keyframe at or before a time position"""
+    position = bisect.bisect_right(keyframes, time_position)
+    return keyframes[position - 1] if position else 0.0
+
+
+def pick_clip_window(path: str, duration: float,
+                     seed: Optional[str] = None) -> Optional[Tuple[float, Dict[str, any]]]:
+    """
+    Pick a random keyframe-aligned window long enough for the narration
+
+    Args:
+        path: Background video
+        duration: Window length in seconds
+        seed: Makes the pick repeatable for the same seed, e.g. a job name,
+            so re-renders reuse the same cut clip (optional)
+
+    Returns:
+        Tuple of (start time, keyframe index), or None if the video has no index
+    """
+    index = get_keyframe_index(path)
+    if not index:
+        return None
+
+    latest_start = max(0.0, index['duration'] - duration)
+    last_candidate = bisect.bisect_right(index['keyframes'], latest_start)
+    candidates = index['keyframes'][:last_candidate] or [0.0]
+    chooser = random.Random(seed) if seed is not None else random
+    return chooser.choice(candidates), index
+
+
+def prune_clip_cache(max_bytes: int = CLIP_CACHE_MAX_BYTES):
+    """Remove the least recently used cut clips until the cache fits in max_bytes"""
+    try:
+        clips = [(path, path.stat()) for path in CLIP_CACHE_DIRECTORY.glob('*.mp4')
+                 if not path.name.endswith('.part.mp4')]
+    except OSError:
+        return
+
+    total = sum(stat.st_size for _, stat in clips)
+    for path, stat in sorted(clips, key=lambda clip: clip[1].st_mtime):
+        if total <= max_bytes:
+            break
+        try:
+            path.unlink()
+            total -= stat.st_size
+        except OSError:
+            pass
+
+
+def cut_clip(path: str, start: float, duration: float) -> Optional[str]:
+    """
+    Cut a window out of a background video without re-encoding
+
+    The input is seeked before opening (so FFmpeg jumps straight to the
+    keyframe instead of decoding from the start) and the packets are
+    stream-copied. Cut clips are cached under temp/clips/, which is kept
+    under CLIP_CACHE_MAX_BYTES by removing the least recently used clips.
+
+    Args:
+        path: Background video
+        start: Window start; should be a keyframe timestamp for an exact cut
+        duration: Window length in seconds
+
+    Returns:
+        Path of the cut clip, or None on failure
+    """
+    identifier = f"{os.path.abspath(path)}|{start:.3f}|{duration:.3f}"
+    clip_path = CLIP_CACHE_DIRECTORY / f"{hashlib.md5(identifier.encode('utf-8')).hexdigest()}.mp4"
+    if clip_path.exists():
+        # Reuse counts as use for pruning
+        try:
+            os.utime(clip_path)
+        except OSError:
+            pass
+        return str(clip_path)
+
+    CLIP_CACHE_DIRECTORY.mkdir(parents=True, exist_ok=True)
+    temp_path = clip_path.with_suffix('.part.mp4')
+    command = [
+        'ffmpeg', '-v', 'error', '-y', '-ss', f"{start:.3f}", '-i', path,
+        '-t', f"{duration:.3f}", '-map', '0:v:0', '-c', 'copy', '-an',
+        '-avoid_negative_ts', 'make_zero', str(temp_path)
+    ]
+
+    try:
+        result = subprocess.run(command, capture_output=True)
+    except FileNotFoundError:
+        print("Error: FFmpeg not found in PATH")
+        return None
+
+    if result.returncode != 0 or not temp_path.exists():
+        if temp_path.exists():
+            temp_path.unlink()
+        return None
+
+    os.replace(temp_path, clip_path)
+    prune_clip_cache()
+    return str(clip_path)
+
+
+def cut_background_window(path: str, duration: float, seed: Optional[str] = None) -> Tuple[str, float]:
+    """
+    Get a background source and start offset covering the narration length
+
+    Args:
+        path: Background video
+        duration: Narration length in seconds
+        seed: Makes the window repeatable, see pick_clip_window (optional)
+
+    Returns:
+        Tuple of (video to decode, start offset within it). Falls back to the
+        original video with a seek offset when it cannot be cut.
+    """
+    window = pick_clip_window(path, duration, seed)
+    if not window:
+        return path, 0.0
+
+    start, index = window
+    # Assets shorter than the narration are looped by the decoder instead of cut
+    if index['duration'] <= duration:
+        return path, 0.0
+
+    clip_path = cut_clip(path, start, duration)
+    if clip_path:
+        return clip_path, 0.0
+    return path, start
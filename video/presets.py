@@ -0,0 +1,84 @@
+from typing import Optional, Dict, List
+
+
+# Named encoding profiles selectable with the 'encoder_preset' setting.
+# 'gop' is in seconds (None leaves keyframe placement to the encoder);
+# 'threads' of 0 lets the encoder use every core.
+# 'scale' and 'fps' override the frame size and frame rate from the config.
+ENCODER_PRESETS = {
+    # The encoder settings used before presets existed
+    'standard': {
+        'codec': 'libx264', 'preset': 'medium', 'crf': 20, 'tune': None,
+        'gop': None, 'threads': 0, 'scale': 1.0, 'fps': None
+    },
+    'shorts': {
+        'codec': 'libx264', 'preset': 'slow', 'crf': 18, 'tune': 'film',
+        'gop': 1, 'threads': 0, 'scale': 1.0, 'fps': None
+    },
+    'reels': {
+        'codec': 'libx264', 'preset': 'medium', 'crf': 21, 'tune': 'film',
+        'gop': 2, 'threads': 0, 'scale': 1.0, 'fps': 30
+    },
+    'hevc': {
+        'codec': 'libx265', 'preset': 'medium', 'crf': 24, 'tune': None,
+        'gop': 2, 'threads': 0, 'scale': 1.0, 'fps': None
+    },
+    # Quick review renders: a quarter of the pixels at a low frame rate
+    'draft': {
+        'codec': 'libx264', 'preset': 'ultrafast', 'crf': 30, 'tune': 'fastdecode',
+        'gop': 4, 'threads': 0, 'scale': 0.5, 'fps': 15
+    },
+    # Throwaway proxy for checking pacing and layout before a full render
+    'preview': {
+        'codec': 'libx264', 'preset': 'ultrafast', 'crf': 32, 'tune': 'zerolatency',
+        'gop': 4, 'threads': 0, 'scale': 1 / 3, 'fps': 12
+    }
+}
+
+DEFAULT_ENCODER_PRESET = 'standard'
+
+
+def get_encoder_preset(video_config: Dict[str, any]) -> Dict[str, any]:
+    """Get the encoder preset named by the 'encoder_preset' setting, falling back to standard"""
+    name = str(video_config.get('encoder_preset', DEFAULT_ENCODER_PRESET)).lower()
+    preset = dict(ENCODER_PRESETS.get(name, ENCODER_PRESETS[DEFAULT_ENCODER_PRESET]))
+    preset['name'] = name if name in ENCODER_PRESETS else DEFAULT_ENCODER_PRESET
+    return preset
+
+
+def get_preset_fps(preset: Dict[str, any], fps: int) -> int:
+    """Get the frame rate a preset renders at, never above the configured one"""
+    return min(fps, preset['fps']) if preset.get('fps') else fps
+
+
+def build_encoder_args(preset: Dict[str, any], fps: int, threads: Optional[int] = None) -> List[str]:
+    """
+    Build FFmpeg video encoder arguments for a preset
+
+    Args:
+        preset: Preset from get_encoder_preset
+        fps: Output frame rate, used to turn the GOP length into frames
+        threads: Thread count overriding the preset's (optional)
+
+    Returns:
+        List of FFmpeg arguments
+    """
+    args = ['-c:v', preset['codec'], '-preset', preset['preset'], '-crf', str(preset['crf'])]
+    if preset.get('gop'):
+        gop = max(1, int(round(preset['gop'] * fps)))
+        args += ['-g', str(gop), '-keyint_min', str(gop), '-sc_threshold', '0']
+    args += ['-pix_fmt', 'yuv420p']
+    if preset.get('tune'):
+        args += ['-tune', preset['tune']]
+
+    threads = preset['threads'] if threads is None else threads
+    if threads:
+        if preset['codec'] == 'libx265':
+            args += ['-x265-params', f"pools={threads}:log-level=error"]
+        else:
+            args += ['-threads', str(threads)]
+
+    if preset['codec'] == 'libx265':
+        # Lets Apple players recognise HEVC in MP4
+        args += ['-tag:v', 'hvc1']
+    return args
@@ -0,0 +1,72 @@
+import json
+import math
+from typing import Optional, Dict, List
+
+
+# Narration speed used when a segment's duration could not be measured
+FALLBACK_CHARS_PER_SECOND = 15.0
+
+
+def load_segment_timing(file_info: Dict[str, any]) -> Optional[Dict[str, any]]:
+    """Load the cached word timing for a generated audio segment, if any"""
+    timing_file = file_info.get('timing_file')
+    if not timing_file:
+        return None
+
+    try:
+        with open(timing_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def get_segment_duration(file_info: Dict[str, any], timing: Optional[Dict[str, any]] = None) -> float:
+    """Get the duration of an audio segment in seconds, measured where possible"""
+    if file_info.get('duration'):
+        return float(file_info['duration'])
+    if timing and timing.get('duration_ms'):
+        return timing['duration_ms'] / 1000.0
+    text = file_info.get('text') or file_info.get('text_preview', '')
+    return max(1.0, len(text) / FALLBACK_CHARS_PER_SECOND)
+
+
+def build_timeline(files: List[Dict[str, any]], gap_seconds: float = 0.0,
+                   frame_rate: Optional[int] = None) -> List[Dict[str, any]]:
+    """
+    Lay out generated audio segments back to back on a single timeline
+
+    Args:
+        files: The 'files' list returned by generate_tts_audio
+        gap_seconds: Silence inserted between consecutive segments (default: 0)
+        frame_rate: Round each segment up to whole frames at this rate, so
+            every segment starts exactly on a frame (optional)
+
+    Returns:
+        List of timeline entries with 'index', 'start', 'end', 'duration',
+        'file' (the original file info) and 'timing' (word timing or None)
+    """
+    timeline = []
+    cursor = 0.0
+
+    for index, file_info in enumerate(files):
+        timing = load_segment_timing(file_info)
+        duration = get_segment_duration(file_info, timing)
+        if frame_rate:
+            duration = math.ceil(round(duration * frame_rate, 6)) / frame_rate
+
+        timeline.append({
+            'index': index,
+            'start': cursor,
+            'end': cursor + duration,
+            'duration': duration,
+            'file': file_info,
+            'timing': timing
+        })
+        cursor += duration + gap_seconds
+
+    return timeline
+
+
+def get_timeline_duration(timeline: List[Dict[str, any]]) -> float:
+    """Get the total duration of a timeline in seconds"""
+    return timeline[-1]['end'] if timeline else 0.0